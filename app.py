@@ -5,17 +5,22 @@ A complete conversion of the PHP project to Python using Flask
 
 import os
 import secrets
-from flask import Flask, render_template, request, redirect, url_for, session
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify
 from flask_wtf.csrf import CSRFProtect
-import random
-from bson.objectid import ObjectId
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+# Load environment variables (once, before the modules below read their configuration)
+from utils.settings import get_settings
+settings = get_settings()
 
 # Import our utility modules
-from utils.database import get_db_connection, get_collection, find_documents
+from utils.database import get_db_connection
+from utils.user_cache import get_user_by_email, get_user_by_id
+from utils.sessions import init_sessions
+from utils.catalog import COURSE_LIST, get_course
+from utils.http_cache import render_cached
+from utils.assets import init_assets
+from utils.compression import init_compression
+from utils.template_cache import init_template_cache
 
 # Test MongoDB connection on startup
 def test_mongo_connection():
@@ -37,21 +42,38 @@ def test_mongo_connection():
 
 # Initialize Flask app
 app = Flask(__name__)
-app.secret_key = os.environ.get('SECRET_KEY', secrets.token_hex(16))
+app.secret_key = settings.secret_key or secrets.token_hex(16)
 csrf = CSRFProtect(app)
 
+# Keep session data server-side when SESSION_BACKEND is memory or mongo
+init_sessions(app)
+
+# Serve fingerprinted static assets built by build_assets.py
+init_assets(app)
+
+# Compress text responses with brotli or gzip as the client accepts
+init_compression(app)
+
+# Load compiled templates from the bytecode cache filled by precompile_templates.py
+init_template_cache(app)
+
 # Test MongoDB connection when app starts (only in main process, not reloader)
 if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
     print("🔍 Testing MongoDB connection at startup...")
     test_mongo_connection()
     print("🚀 Starting Flask application...")
 
+# Optionally apply pending index migrations on startup
+if settings.run_migrations_on_startup:
+    from utils.migrations import run_startup_migrations
+    run_startup_migrations()
+
 # Routes
 @app.route('/')
 def index():
     """Main landing page"""
     is_logged_in = 'user_id' in session
-    return render_template('index.html', is_logged_in=is_logged_in)
+    return render_cached('index.html', (is_logged_in,), is_logged_in=is_logged_in)
 
 @app.route('/signup-user', methods=['GET', 'POST'])
 def signup_user():
@@ -224,25 +246,23 @@ def home():
         return redirect(url_for('login_user'))
     
     try:
-        db = get_db_connection()
-        if db is not None:
-            collection = get_collection(db, 'usertable')
-            users = find_documents(collection, {'email': session['email']})
-            
-            if users:
-                user = users[0]
-                # Check verification status
-                if user['status'] != "verified":
-                    return redirect(url_for('user_otp'))
-                elif user['code'] != 0:
-                    return redirect(url_for('reset_code'))
-            else:
-                return redirect(url_for('login_user'))
+        # Served from the user cache on the steady-state path
+        user = get_user_by_email(session['email'])
+        
+        if user:
+            # Check verification status
+            if not user.is_verified:
+                return redirect(url_for('user_otp'))
+            elif user.has_pending_code:
+                return redirect(url_for('reset_code'))
+        else:
+            return redirect(url_for('login_user'))
     except Exception as e:
         print(f"Database error: {str(e)}")
         return redirect(url_for('login_user'))
     
-    return render_template('home.html', name=session.get('name', 'User'))
+    name = session.get('name', 'User')
+    return render_cached('home.html', (name,), name=name)
 
 @app.route('/logout-user')
 def logout_user():
@@ -263,7 +283,8 @@ def course_agent():
     if 'user_id' not in session:
         return redirect(url_for('login_user'))
     
-    return render_template('course-agent.html', name=session.get('name', 'User'))
+    name = session.get('name', 'User')
+    return render_cached('course-agent.html', (name,), csrf=True, name=name, courses=COURSE_LIST)
 
 @app.route('/course-agent/schedule/<course_id>')
 def course_schedule(course_id):
@@ -272,44 +293,13 @@ def course_schedule(course_id):
     if 'user_id' not in session:
         return redirect(url_for('login_user'))
     
-    # Course icons mapping
-    course_icons = {
-        'python': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/python/python-original.svg',
-        'java': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/java/java-original.svg',
-        'javascript': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/javascript/javascript-original.svg',
-        'fullstack': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/html5/html5-original.svg',
-        'react': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/react/react-original.svg',
-        'datascience': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/numpy/numpy-original.svg',
-        'mobile': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/react/react-original.svg',
-        'cloud': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/amazonwebservices/amazonwebservices-original-wordmark.svg',
-        'cybersecurity': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/linux/linux-original.svg',
-        'uiux': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/figma/figma-original.svg',
-        'ai': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/tensorflow/tensorflow-original.svg',
-        'blockchain': 'https://cdn.jsdelivr.net/gh/devicons/devicon@latest/icons/ethereum/ethereum-original.svg'
-    }
-    
-    # Course names mapping
-    course_names = {
-        'python': 'Python Programming',
-        'java': 'Java Development',
-        'javascript': 'JavaScript Mastery',
-        'fullstack': 'Full-Stack Web Development',
-        'react': 'React Framework',
-        'datascience': 'Data Science Fundamentals',
-        'mobile': 'Mobile App Development',
-        'cloud': 'Cloud Computing & DevOps',
-        'cybersecurity': 'Cybersecurity Essentials',
-        'uiux': 'UI/UX Design',
-        'ai': 'AI & Machine Learning',
-        'blockchain': 'Blockchain Development'
-    }
-    
-    # Get course name and icon
-    selected_course_name = course_names.get(course_id, 'Unknown Course')
-    selected_course_icon = course_icons.get(course_id, '')
+    course = get_course(course_id)
+    selected_course_name = course.name if course else 'Unknown Course'
+    selected_course_icon = course.icon if course else ''
     
-    return render_template('schedule.html', 
-                         name=session.get('name', 'User'),
+    name = session.get('name', 'User')
+    return render_cached('schedule.html', (name, course_id), csrf=True,
+                         name=name,
                          course_id=course_id,
                          selected_course_name=selected_course_name,
                          selected_course_icon=selected_course_icon)
@@ -357,26 +347,11 @@ def save_schedule():
             # Get user information for the email
             user = get_user_info(session['user_id'])
             if user:
-                user_email = user['email']
-                user_name = user['name']
+                user_email = user.email
+                user_name = user.name
                 
-                # Course names mapping (same as in course_schedule function)
-                course_names = {
-                    'python': 'Python Programming',
-                    'java': 'Java Development',
-                    'javascript': 'JavaScript Mastery',
-                    'fullstack': 'Full-Stack Web Development',
-                    'react': 'React Framework',
-                    'datascience': 'Data Science Fundamentals',
-                    'mobile': 'Mobile App Development',
-                    'cloud': 'Cloud Computing & DevOps',
-                    'cybersecurity': 'Cybersecurity Essentials',
-                    'uiux': 'UI/UX Design',
-                    'ai': 'AI & Machine Learning',
-                    'blockchain': 'Blockchain Development'
-                }
-                
-                selected_course_name = course_names.get(course_id, 'Unknown Course')
+                course = get_course(course_id)
+                selected_course_name = course.name if course else 'Unknown Course'
                 
                 # Send confirmation email
                 send_schedule_confirmation_email(user_email, user_name, selected_course_name, schedule)
@@ -414,6 +389,45 @@ def course_agent_success():
     
     return render_template('course-agent-success.html', name=session.get('name', 'User'))
 
+def api_error(status: int, code: str, message: str):
+    """JSON error response in the format of Docs/API_SPECS.md"""
+    return jsonify({'error': {'code': code, 'message': message}}), status
+
+@app.route('/api/v1/enrollments/bulk', methods=['POST'])
+def bulk_enroll():
+    """Enroll many users in courses in one JSON request"""
+    from utils.course_controller import BULK_ENROLLMENT_MAX_ROWS, bulk_select_courses, can_bulk_enroll
+
+    # Check if user is logged in and allowed to enroll others
+    if 'user_id' not in session:
+        return api_error(401, 'unauthorized', "Please sign in to use the enrollment API.")
+    if not can_bulk_enroll(session['user_id']):
+        return api_error(403, 'forbidden', "Your account is not allowed to enroll other users.")
+    
+    payload = request.get_json(silent=True)
+    entries = payload.get('enrollments') if isinstance(payload, dict) else None
+    if not isinstance(entries, list) or not entries:
+        return api_error(400, 'invalid_request', "Send a JSON object with a non-empty 'enrollments' list.")
+    if len(entries) > BULK_ENROLLMENT_MAX_ROWS:
+        return api_error(413, 'too_many_rows', f"Send at most {BULK_ENROLLMENT_MAX_ROWS} enrollments per request.")
+    
+    results = bulk_select_courses(entries, notify=payload.get('notify') is True)
+    enrolled = sum(1 for result in results if result['success'])
+    return jsonify({'enrolled': enrolled, 'failed': len(results) - enrolled, 'results': results})
+
+@app.route('/api/v1/users/me/enrollments')
+def my_enrollments():
+    """The signed-in user's courses, from their course summary"""
+    from utils.course_summary import get_user_course_summary
+
+    if 'user_id' not in session:
+        return api_error(401, 'unauthorized', "Please sign in to see your courses.")
+    
+    courses = get_user_course_summary(session['user_id'])
+    if courses is None:
+        return api_error(503, 'unavailable', "Your courses could not be loaded. Please try again in a few moments.")
+    return jsonify({'courses': [course.to_dict() for course in courses]})
+
 @app.route('/profile')
 def user_profile():
     """User profile page"""
@@ -422,23 +436,17 @@ def user_profile():
         return redirect(url_for('login_user'))
     
     try:
-        db = get_db_connection()
-        if db is not None:
-            collection = get_collection(db, 'usertable')
-            users = find_documents(collection, {'_id': ObjectId(session['user_id'])})
-            
-            if users:
-                user = users[0]
-                # Remove sensitive information
-                user_data = {
-                    'name': user.get('name', 'N/A'),
-                    'email': user.get('email', 'N/A'),
-                    'status': user.get('status', 'N/A'),
-                    'member_since': user.get('_id').generation_time.strftime('%B %d, %Y') if '_id' in user else 'N/A'
-                }
-                return render_template('profile.html', user=user_data, name=session.get('name', 'User'))
-            else:
-                return redirect(url_for('login_user'))
+        user = get_user_by_id(session['user_id'])
+        
+        if user:
+            # Only non-sensitive fields are cached
+            user_data = {
+                'name': user.name or 'N/A',
+                'email': user.email or 'N/A',
+                'status': user.status or 'N/A',
+                'member_since': user.member_since
+            }
+            return render_template('profile.html', user=user_data, name=session.get('name', 'User'))
         else:
             return redirect(url_for('login_user'))
     except Exception as e:
@@ -446,7 +454,7 @@ def user_profile():
         return redirect(url_for('home'))
 
 if __name__ == '__main__':
-    port = int(os.environ.get('PORT', 5000))
+    port = settings.port
     print(f"✅ Application startup successful!")
     print(f"   Flask app running on port {port}")
     print(f"   MongoDB connection confirmed")
@@ -0,0 +1,12 @@
+"""
+ASGI entry point for the AI Agent System
+Serves the auth and enrollment routes asynchronously (Motor and httpx) and every other route through the
+Flask app in app.py. Requires the packages in requirements-async.txt; run with:
+
+    hypercorn asgi:app --bind 0.0.0.0:5000
+"""
+
+from app import app as flask_app
+from utils.async_app import create_asgi_app
+
+app = create_asgi_app(flask_app)
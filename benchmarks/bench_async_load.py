@@ -0,0 +1,158 @@
+"""
+Load comparison of the WSGI and async (ASGI) execution modes
+
+Sends concurrent login POSTs to /login-user in both modes. The usertable
+lookup is replaced by an in-memory stand-in that waits db_latency_ms per
+query, a time.sleep() for pymongo and an asyncio.sleep() for Motor, so the
+comparison measures how each mode copes with I/O waits rather than the
+speed of a local database.
+
+- WSGI: app.py's Flask app served by a fixed number of worker threads, like
+  a threaded WSGI server (default 2 x cores + 1, gunicorn's usual sizing).
+- ASGI: asgi.py's app on a single event loop, as one hypercorn worker.
+
+Password hashing uses cheap parameters so the KDF does not dominate.
+Reports requests per second and latency percentiles per concurrency level.
+
+Usage:
+    python benchmarks/bench_async_load.py [requests] [db_latency_ms] [wsgi_workers]
+"""
+
+import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from werkzeug.security import generate_password_hash
+
+import utils.passwords as passwords
+from utils import async_user_controller, user_controller
+
+CONCURRENCY = [1, 10, 50, 200]
+FAST_METHOD = 'pbkdf2:sha256:1000'
+USER = {'_id': 'user123', 'email': 'ada@example.com', 'name': 'Ada', 'status': 'verified',
+        'password': generate_password_hash('s3cret!', FAST_METHOD)}
+FORM = {'email': 'ada@example.com', 'password': 's3cret!'}
+
+class BlockingUsers:
+    """usertable stand-in for pymongo: each query blocks the calling thread"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def __getitem__(self, name):
+        return self
+
+    def find_one(self, query, projection=None, **kwargs):
+        time.sleep(self.latency)
+        return dict(USER)
+
+class AsyncUsers(BlockingUsers):
+    """usertable stand-in for Motor: each query yields to the event loop"""
+
+    async def find_one(self, query, projection=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        return dict(USER)
+
+def percentile(latencies, fraction):
+    ordered = sorted(latencies)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+def run_wsgi(flask_app, requests, concurrency, workers):
+    """Send requests login POSTs from concurrency clients to a server with workers threads"""
+    latencies = []
+    remaining = iter(range(requests))
+    lock = threading.Lock()
+    # Requests wait in a FIFO queue for a free worker thread, as in a threaded WSGI server
+    accept_queue = queue.Queue()
+
+    def worker():
+        test_client = flask_app.test_client(use_cookies=False)
+        while True:
+            done = accept_queue.get()
+            if done is None:
+                return
+            assert test_client.post('/login-user', data=FORM).status_code == 302
+            done.set()
+
+    def client():
+        while True:
+            with lock:
+                if next(remaining, None) is None:
+                    return
+            started = time.perf_counter()
+            done = threading.Event()
+            accept_queue.put(done)
+            done.wait()
+            latencies.append(time.perf_counter() - started)
+
+    server = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in server:
+        thread.start()
+    start = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    for thread in server:
+        accept_queue.put(None)
+    for thread in server:
+        thread.join()
+    return requests / elapsed, latencies
+
+async def run_asgi(asgi_app, requests, concurrency):
+    """Send requests login POSTs from concurrency clients to one event loop"""
+    latencies = []
+    remaining = iter(range(requests))
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=asgi_app), base_url='http://bench') as client:
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.post('/login-user', data=FORM)
+                assert response.status_code == 302
+                client.cookies.clear()
+                latencies.append(time.perf_counter() - started)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    return requests / elapsed, latencies
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 400
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else 2 * (os.cpu_count() or 1) + 1
+
+    os.environ.setdefault('MAIL_ASYNC', 'true')
+    from app import app as flask_app
+    from utils.async_app import create_asgi_app
+
+    flask_app.config['WTF_CSRF_ENABLED'] = False
+    asgi_app = create_asgi_app(flask_app)
+    passwords.PASSWORD_HASH_METHOD = FAST_METHOD
+    passwords.PASSWORD_HASH_WORKERS = 0
+    user_controller.get_db_connection = lambda: BlockingUsers(latency)
+    async_user_controller.get_async_db = lambda: AsyncUsers(latency)
+
+    print(f"{requests} logins, {latency * 1000:.0f} ms per database query, "
+          f"{workers} WSGI worker threads, 1 ASGI event loop")
+    print(f"{'mode':<6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8}")
+    for concurrency in CONCURRENCY:
+        rate, latencies = run_wsgi(flask_app, requests, concurrency, workers)
+        print(f"{'wsgi':<6} {concurrency:>7} {rate:>8.1f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.1f}")
+        rate, latencies = asyncio.run(run_asgi(asgi_app, requests, concurrency))
+        print(f"{'asgi':<6} {concurrency:>7} {rate:>8.1f} {percentile(latencies, 0.5) * 1000:>8.1f} "
+              f"{percentile(latencies, 0.95) * 1000:>8.1f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark for response compression
+
+Renders the largest pages through the Flask test client, then reports for each
+encoding and level the bytes on the wire and the CPU time the middleware adds
+per request. Levels are overridden per run, the way COMPRESSION_LEVELS sets
+them per content type. brotli rows appear only when the brotli package is
+installed.
+
+Usage:
+    python benchmarks/bench_compression.py [iterations]
+"""
+
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson.objectid import ObjectId
+from app import app
+from utils.compression import CompressionMiddleware, available_encodings
+from utils.models import User
+
+PAGES = [
+    ('/', 'index'),
+    ('/login-user', 'login/signup'),
+    ('/home', 'home'),
+    ('/course-agent', 'course agent'),
+]
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 11)}
+
+def render_pages():
+    """
+    HTML of each page, rendered without compression
+    """
+    user = User(ObjectId(), 'Benchmark User', 'bench@example.com', 'verified', 0)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update({'user_id': str(user.id), 'name': user.name, 'email': user.email})
+    with patch('app.get_user_by_email', return_value=user), patch('app.get_user_by_id', return_value=user):
+        return [(name, client.get(path).data) for path, name in PAGES]
+
+def measure(html, encoding, level, iterations):
+    """
+    Bytes on the wire and CPU milliseconds per request for one page through the middleware
+    """
+    def page(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/html; charset=utf-8'), ('Content-Length', str(len(html)))])
+        return [html]
+
+    levels = {'text/html': {encoding: level}} if encoding else {}
+    middleware = CompressionMiddleware(page, levels=levels)
+    environ = {'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': encoding or ''}
+
+    size = 0
+    start = time.process_time()
+    for _ in range(iterations):
+        size = sum(len(chunk) for chunk in middleware(environ, lambda *args: None))
+    return size, (time.process_time() - start) * 1000 / iterations
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    pages = render_pages()
+    runs = [(None, 0)] + [(encoding, level) for encoding in available_encodings() for level in LEVELS[encoding]]
+
+    print(f"{'page':<14} {'encoding':<9} {'level':>5} {'bytes':>8} {'ratio':>6} {'cpu ms/req':>10}")
+    for name, html in pages:
+        for encoding, level in runs:
+            size, cpu = measure(html, encoding, level, iterations)
+            print(f"{name:<14} {encoding or 'identity':<9} {level or '':>5} {size:>8} "
+                  f"{size / len(html):>6.1%} {cpu:>10.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+"""
+Benchmark for the Jinja email templates
+
+Compares renders per second of the cached Jinja email templates with the
+original f-string functions they replaced (kept below as the baseline).
+The schedule confirmation baseline includes building the detail rows by
+string concatenation, as send_schedule_confirmation_email used to.
+
+Usage:
+    python benchmarks/bench_email_templates.py [iterations]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.mail import get_otp_email_template, render_schedule_confirmation_email
+
+SCHEDULE = {
+    'preferred_time': '2:00 PM',
+    'notification_method': 'email_and_whatsapp',
+    'fullname': 'John Doe',
+    'whatsapp': '+1234567890',
+    'duration': '45',
+}
+
+def legacy_otp_email_template(otp_code, type='verification'):
+    """
+    The f-string OTP template this benchmark compares against
+    """
+    if type == 'reset':
+        title = "Password Reset Code"
+        message = "Your password reset code for AI Agent System"
+    else:
+        title = "Email Verification Code"
+        message = "Your verification code for AI Agent System"
+    
+    return f'''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; background: #0c0c17; color: #fff; margin: 0; padding: 20px; }}
+            .container {{ max-width: 600px; margin: 0 auto; background: rgba(12, 12, 23, 0.9); border: 1px solid #00ff9d; border-radius: 10px; padding: 30px; }}
+            .header {{ text-align: center; margin-bottom: 30px; }}
+            .logo {{ font-size: 2.5rem; color: #00ff9d; margin-bottom: 10px; }}
+            .title {{ font-size: 1.5rem; color: #00ff9d; margin-bottom: 10px; }}
+            .otp-code {{ background: rgba(0, 255, 157, 0.1); border: 2px solid #00ff9d; border-radius: 8px; padding: 20px; text-align: center; font-size: 2rem; font-weight: bold; letter-spacing: 5px; margin: 20px 0; color: #00ff9d; }}
+            .footer {{ margin-top: 30px; text-align: center; font-size: 0.8rem; color: #888; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <div class="logo">🤖 AI AGENT SYSTEM</div>
+                <h1 class="title">{title}</h1>
+            </div>
+            <p>Hello,</p>
+            <p>{message}</p>
+            <div class="otp-code">{otp_code}</div>
+            <p>This code will expire in 10 minutes. Please do not share this code with anyone.</p>
+            <div class="footer">
+                <p>If you didn't request this code, please ignore this email.</p>
+                <p>&copy; 2024 AI Agent System. All rights reserved.</p>
+            </div>
+        </div>
+    </body>
+    </html>'''
+
+def legacy_schedule_confirmation_email_template(user_name, course_name, schedule_details):
+    """
+    The f-string schedule confirmation template this benchmark compares against
+    """
+    return f'''
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; background: #0c0c17; color: #fff; margin: 0; padding: 20px; }}
+            .container {{ max-width: 600px; margin: 0 auto; background: rgba(12, 12, 23, 0.9); border: 1px solid #00ff9d; border-radius: 10px; padding: 30px; }}
+            .header {{ text-align: center; margin-bottom: 30px; }}
+            .logo {{ font-size: 2.5rem; color: #00ff9d; margin-bottom: 10px; }}
+            .title {{ font-size: 1.5rem; color: #00ff9d; margin-bottom: 10px; }}
+            .course-info {{ background: rgba(0, 255, 157, 0.1); border: 2px solid #00ff9d; border-radius: 8px; padding: 20px; margin: 20px 0; }}
+            .schedule-details {{ background: rgba(0, 255, 157, 0.05); border-radius: 8px; padding: 15px; margin: 15px 0; }}
+            .detail-item {{ margin: 10px 0; }}
+            .detail-label {{ font-weight: bold; color: #00ff9d; }}
+            .footer {{ margin-top: 30px; text-align: center; font-size: 0.8rem; color: #888; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <div class="logo">🤖 AI AGENT SYSTEM</div>
+                <h1 class="title">Learning Schedule Confirmation</h1>
+            </div>
+            <p>Hello {user_name},</p>
+            <p>Congratulations! Your learning schedule has been successfully set up.</p>
+            
+            <div class="course-info">
+                <h2>{course_name}</h2>
+                <p>Your personalized learning journey is about to begin!</p>
+            </div>
+            
+            <div class="schedule-details">
+                <h3>Schedule Details:</h3>
+                {schedule_details}
+            </div>
+            
+            <p>You'll receive your first lesson according to your schedule. Make sure to check your email (and spam folder) for your lessons.</p>
+            <p>If you have any questions or need to modify your schedule, please visit your dashboard.</p>
+            
+            <div class="footer">
+                <p>&copy; 2025 AI Agent System. All rights reserved.</p>
+            </div>
+        </div>
+    </body>
+    </html>'''
+
+def legacy_schedule_confirmation(user_name, course_name, schedule):
+    """The concatenation loop formerly in send_schedule_confirmation_email, plus the template"""
+    schedule_details = ""
+    if 'fullname' in schedule:
+        schedule_details += f"<div class='detail-item'><span class='detail-label'>Full Name:</span> {schedule['fullname']}</div>"
+    if 'duration' in schedule:
+        schedule_details += f"<div class='detail-item'><span class='detail-label'>Learning Duration:</span> {schedule['duration']} days</div>"
+    if 'preferred_time' in schedule:
+        schedule_details += f"<div class='detail-item'><span class='detail-label'>Preferred Time:</span> {schedule['preferred_time']}</div>"
+    if 'notification_method' in schedule:
+        method = schedule['notification_method'].replace('_', ' ').title()
+        schedule_details += f"<div class='detail-item'><span class='detail-label'>Notification Method:</span> {method}</div>"
+    if 'whatsapp' in schedule:
+        schedule_details += f"<div class='detail-item'><span class='detail-label'>WhatsApp:</span> {schedule['whatsapp']}</div>"
+    return legacy_schedule_confirmation_email_template(user_name, course_name, schedule_details)
+
+def renders_per_second(render, iterations: int) -> float:
+    """Time iterations calls of render and return the rate"""
+    render()  # compile and warm caches outside the timed loop
+    start = time.perf_counter()
+    for _ in range(iterations):
+        render()
+    return iterations / (time.perf_counter() - start)
+
+def main(iterations: int = 20000) -> None:
+    cases = [
+        ('otp (f-string)', lambda: legacy_otp_email_template(123456, 'reset')),
+        ('otp (jinja)', lambda: get_otp_email_template(123456, 'reset')),
+        ('schedule (f-string)', lambda: legacy_schedule_confirmation('John Doe', 'Python Programming', SCHEDULE)),
+        ('schedule (jinja)', lambda: render_schedule_confirmation_email('John Doe', 'Python Programming', SCHEDULE)),
+    ]
+
+    print(f"{'case':<22} {'renders/s':>12} {'us/render':>10}")
+    for name, render in cases:
+        rate = renders_per_second(render, iterations)
+        print(f"{name:<22} {rate:>12.0f} {1e6 / rate:>10.2f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
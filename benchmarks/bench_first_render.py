@@ -0,0 +1,107 @@
+"""
+Benchmark for time-to-first-render on a new instance
+
+Starts a fresh interpreter per run, imports the app and times the first request
+to each page, which includes loading (and, without bytecode, compiling) its
+template. Three setups are compared:
+
+- no cache:     TEMPLATE_CACHE_ENABLED=false, every template is compiled
+- cold cache:   an empty bytecode cache, the instance compiles and fills it
+- precompiled:  a cache filled by precompile_templates.py, as after a build
+
+Usage:
+    python benchmarks/bench_first_render.py [runs]
+"""
+
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+PAGES = [
+    ('/', 'index'),
+    ('/login-user', 'login/signup'),
+    ('/home', 'home'),
+    ('/course-agent', 'course agent'),
+    ('/course-agent/schedule/python', 'schedule'),
+    ('/course-agent/success', 'success'),
+]
+
+def first_renders():
+    """
+    Child process: milliseconds taken by the first request to each page
+    """
+    import time
+    from unittest.mock import patch
+    from bson.objectid import ObjectId
+    from app import app
+    from utils.models import User
+
+    user = User(ObjectId(), 'Benchmark User', 'bench@example.com', 'verified', 0)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update({'user_id': str(user.id), 'name': user.name, 'email': user.email})
+
+    timings = {}
+    with patch('app.get_user_by_email', return_value=user), patch('app.get_user_by_id', return_value=user):
+        for path, name in PAGES:
+            start = time.perf_counter()
+            client.get(path)
+            timings[name] = (time.perf_counter() - start) * 1000
+    print(json.dumps(timings))
+
+def run(env):
+    """Time the first renders in a new interpreter"""
+    result = subprocess.run([sys.executable, __file__, '--child'], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cache_dir = tempfile.mkdtemp(prefix='jinja-bench-')
+    base = dict(os.environ, HTTP_CACHE_ENABLED='false', TEMPLATE_CACHE_DIR=cache_dir)
+
+    def clear():
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    def precompile():
+        clear()
+        subprocess.run([sys.executable, 'precompile_templates.py'], cwd=ROOT,
+                       env=dict(base, TEMPLATE_CACHE_ENABLED='true'), capture_output=True, check=True)
+
+    # (label, TEMPLATE_CACHE_ENABLED, preparation before each fresh instance)
+    setups = [
+        ('no cache', 'false', clear),
+        ('cold cache', 'true', clear),
+        ('precompiled', 'true', precompile),
+    ]
+    results = {}
+    try:
+        for label, enabled, prepare in setups:
+            samples = []
+            for _ in range(runs):
+                prepare()
+                samples.append(run(dict(base, TEMPLATE_CACHE_ENABLED=enabled)))
+            results[label] = {name: statistics.median(sample[name] for sample in samples) for _, name in PAGES}
+    finally:
+        clear()
+
+    labels = [label for label, _, _ in setups]
+    print(f"first request, median of {runs} fresh instances (ms)")
+    print(f"{'page':<14}" + ''.join(f"{label:>13}" for label in labels))
+    for _, name in PAGES:
+        print(f"{name:<14}" + ''.join(f"{results[label][name]:>13.1f}" for label in labels))
+    print(f"{'total':<14}" + ''.join(f"{sum(results[label].values()):>13.1f}" for label in labels))
+
+if __name__ == '__main__':
+    if '--child' in sys.argv:
+        first_renders()
+    else:
+        main()
@@ -0,0 +1,73 @@
+"""
+Microbenchmark for projected, slotted user models
+
+Compares the per-request cost of the old path (fetch the whole usertable
+document and keep it as a dict) with the new one (fetch a projection and
+keep a slotted User). Decode time is measured on the BSON bytes the server
+would send back, total time adds building the request object, and memory
+is the size retained per object as measured with tracemalloc.
+
+Usage:
+    python benchmarks/bench_models.py [iterations]
+"""
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import bson
+from bson.objectid import ObjectId
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.models import User, USER_PROFILE_PROJECTION
+
+FULL_DOCUMENT = {
+    '_id': ObjectId(),
+    'name': 'John Doe',
+    'email': 'john.doe@example.com',
+    'password': 'pbkdf2:sha256:600000$' + 'x' * 16 + '$' + 'f' * 64,
+    'code': 0,
+    'status': 'verified',
+}
+PROJECTED_DOCUMENT = {key: FULL_DOCUMENT[key] for key in ('_id', *USER_PROFILE_PROJECTION)}
+
+def time_decode(payload: bytes, build, iterations: int) -> float:
+    """Return the mean microseconds to decode a payload and build the request object"""
+    decode = bson.decode
+    start = time.perf_counter()
+    for _ in range(iterations):
+        build(decode(payload))
+    return (time.perf_counter() - start) / iterations * 1e6
+
+def identity(document):
+    """Keep the decoded document as is"""
+    return document
+
+def measure_memory(payload: bytes, build, count: int) -> float:
+    """Return the mean bytes retained per object for count decoded objects"""
+    tracemalloc.start()
+    objects = [build(bson.decode(payload)) for _ in range(count)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    return current / count
+
+def main(iterations: int = 100000) -> None:
+    full_payload = bson.encode(FULL_DOCUMENT)
+    projected_payload = bson.encode(PROJECTED_DOCUMENT)
+    cases = [
+        ('full document as dict', full_payload, dict),
+        ('projection as User', projected_payload, User.from_document),
+    ]
+
+    print(f"{'case':<24} {'wire bytes':>10} {'decode us':>10} {'total us':>10} {'bytes/obj':>10}")
+    for name, payload, build in cases:
+        decode_us = time_decode(payload, identity, iterations)
+        total_us = time_decode(payload, build, iterations)
+        memory = measure_memory(payload, build, min(iterations, 10000))
+        print(f"{name:<24} {len(payload):>10} {decode_us:>10.2f} {total_us:>10.2f} {memory:>10.0f}")
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
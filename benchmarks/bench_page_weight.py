@@ -0,0 +1,84 @@
+"""
+Benchmark for per-page transfer size
+
+Renders every page through the Flask test client and reports what a browser
+downloads from this app: the HTML, plus the first-party CSS and JS it links
+to. Sizes are raw and gzipped. A repeat view only re-downloads the HTML,
+since linked assets are cached. Third-party stylesheets and scripts (CDNs)
+are counted but not fetched.
+
+Run `python build_assets.py` first to measure the minified, fingerprinted assets.
+
+Usage:
+    python benchmarks/bench_page_weight.py
+"""
+
+import gzip
+import re
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bson.objectid import ObjectId
+from app import app
+from utils.models import User
+
+PAGES = [
+    ('/', 'index'),
+    ('/login-user', 'login/signup'),
+    ('/home', 'home'),
+    ('/course-agent', 'course agent'),
+    ('/course-agent/schedule/python', 'schedule'),
+    ('/course-agent/success', 'success'),
+    ('/profile', 'profile'),
+]
+
+ASSET_PATTERN = re.compile(r'<(?:link[^>]+href|script[^>]+src)=["\']([^"\']+)["\']')
+
+def gzipped_size(content: bytes) -> int:
+    return len(gzip.compress(content, compresslevel=6))
+
+def measure(client, path):
+    """
+    Sizes of a page and of the first-party assets it links to
+    """
+    html = client.get(path).data
+    first_party, third_party = [], []
+    for url in ASSET_PATTERN.findall(html.decode('utf-8')):
+        if url.startswith(('/static/', '/assets/')):
+            first_party.append(client.get(url).data)
+        elif url.endswith(('.css', '.js')):
+            third_party.append(url)
+    assets = b''.join(first_party)
+    return {
+        'html': len(html),
+        'html_gz': gzipped_size(html),
+        'assets': len(assets),
+        'assets_gz': sum(gzipped_size(content) for content in first_party),
+        'files': len(first_party),
+        'third_party': len(third_party),
+    }
+
+def main():
+    user = User(ObjectId(), 'Benchmark User', 'bench@example.com', 'verified', 0)
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update({'user_id': str(user.id), 'name': user.name, 'email': user.email})
+
+    print(f"{'page':<14} {'html':>8} {'html gz':>8} {'assets':>8} {'assets gz':>9} {'files':>5} {'3rd':>4} "
+          f"{'first gz':>9} {'repeat gz':>9}")
+    totals = {'first': 0, 'repeat': 0}
+    with patch('app.get_user_by_email', return_value=user), patch('app.get_user_by_id', return_value=user):
+        for path, name in PAGES:
+            sizes = measure(client, path)
+            first = sizes['html_gz'] + sizes['assets_gz']
+            totals['first'] += first
+            totals['repeat'] += sizes['html_gz']
+            print(f"{name:<14} {sizes['html']:>8} {sizes['html_gz']:>8} {sizes['assets']:>8} {sizes['assets_gz']:>9} "
+                  f"{sizes['files']:>5} {sizes['third_party']:>4} {first:>9} {sizes['html_gz']:>9}")
+    print(f"{'total':<14} {'':>8} {'':>8} {'':>8} {'':>9} {'':>5} {'':>4} {totals['first']:>9} {totals['repeat']:>9}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Benchmark for password hashing throughput
+
+Simulates a login burst: request threads verify passwords through
+utils.passwords, either inline on the request threads or in the worker
+process pool. This is done for several algorithms and iteration counts.
+Reports logins per second, per core, and the mean latency per login.
+
+Usage:
+    python benchmarks/bench_passwords.py [logins] [request_threads]
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from werkzeug.security import generate_password_hash
+import utils.passwords as passwords
+
+SETTINGS = [
+    ('pbkdf2:sha256', 600000),
+    ('pbkdf2:sha256', 260000),
+    ('scrypt', 32768),
+    ('scrypt', 16384),
+]
+
+def logins_per_second(password_hash, logins, request_threads):
+    """Verify the password logins times from request_threads threads; returns rate and mean latency"""
+    latencies = []
+
+    def login(_):
+        start = time.perf_counter()
+        assert passwords.verify_password(password_hash, 'correct horse battery staple')
+        latencies.append(time.perf_counter() - start)
+
+    # Warm up, so starting the worker processes is not counted
+    login(None)
+    latencies.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=request_threads) as executor:
+        list(executor.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    return logins / elapsed, sum(latencies) / len(latencies)
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    request_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    cores = os.cpu_count() or 1
+    modes = [('inline', 0), ('pool', cores)]
+
+    print(f"{logins} logins from {request_threads} request threads on {cores} core(s)")
+    print(f"{'method':<22} {'mode':<10} {'logins/s':>9} {'per core':>9} {'mean ms':>8}")
+    for algorithm, iterations in SETTINGS:
+        method = passwords.hash_method(algorithm, iterations)
+        password_hash = generate_password_hash('correct horse battery staple', method)
+        for mode, workers in modes:
+            passwords.shutdown_pool()
+            passwords.PASSWORD_HASH_WORKERS = workers
+            rate, latency = logins_per_second(password_hash, logins, request_threads)
+            label = mode if not workers else f"{mode} x{workers}"
+            print(f"{method:<22} {label:<10} {rate:>9.1f} {rate / cores:>9.1f} {latency * 1000:>8.0f}")
+    passwords.shutdown_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,11 @@
+"""
+Script to build fingerprinted, precompressed copies of static/ into static/dist
+
+Usage:
+    python build_assets.py
+"""
+
+from utils.assets import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
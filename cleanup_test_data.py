@@ -2,7 +2,8 @@
 Script to clean up test data from MongoDB
 """
 import os
-from utils.database import get_db_connection, get_collection, find_documents, delete_document
+from utils.database import get_db_connection, get_collection, iter_documents, delete_document
+from utils.course_summary import rebuild_course_summaries
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -17,25 +18,32 @@ def cleanup_test_data():
             print("Failed to connect to database")
             return False
             
-        # Find test enrollment (with Test User fullname)
+        # Find test enrollments (with Test User fullname), streaming only their ids and users
         collection = get_collection(db, 'course_enrollments')
-        enrollments = find_documents(collection, {
+        enrollments = iter_documents(collection, {
             'schedule.fullname': 'Test User'
-        })
+        }, projection={'_id': 1, 'user_id': 1})
         
-        if enrollments:
+        deleted_any = False
+        user_ids = set()
+        for enrollment in enrollments:
             # Delete the test enrollment
-            for enrollment in enrollments:
-                enrollment_id = enrollment['_id']
-                result = collection.delete_one({'_id': enrollment_id})
-                if result.deleted_count > 0:
-                    print(f"✓ Deleted test enrollment: {enrollment_id}")
-                else:
-                    print(f"✗ Failed to delete test enrollment: {enrollment_id}")
-            return True
-        else:
+            deleted_any = True
+            user_ids.add(enrollment.get('user_id'))
+            enrollment_id = enrollment['_id']
+            result = collection.delete_one({'_id': enrollment_id})
+            if result.deleted_count > 0:
+                print(f"✓ Deleted test enrollment: {enrollment_id}")
+            else:
+                print(f"✗ Failed to delete test enrollment: {enrollment_id}")
+        
+        # Drop the deleted enrollments from their users' course summaries
+        for user_id in user_ids:
+            rebuild_course_summaries(db, user_id)
+        
+        if not deleted_any:
             print("No test data found to clean up")
-            return True
+        return True
             
     except Exception as e:
         print(f"Error during cleanup: {str(e)}")
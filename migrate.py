@@ -0,0 +1,17 @@
+"""
+Script to apply database migrations and indexes in MongoDB
+
+Usage:
+    python migrate.py migrate [--target VERSION]
+    python migrate.py status
+    python migrate.py explain
+"""
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from utils.migrations import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,11 @@
+"""
+Script to precompile the Jinja templates into the bytecode cache
+
+Run it at build or deploy time so new instances skip template compilation:
+    python precompile_templates.py [--clear]
+"""
+
+from utils.template_cache import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
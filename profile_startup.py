@@ -0,0 +1,13 @@
+"""
+Script to profile the cold import of the application, as a serverless cold start runs it
+
+Usage:
+    python profile_startup.py [--module app] [--top 25]
+
+Exits with status 1 when the import takes longer than COLD_IMPORT_BUDGET_MS.
+"""
+
+from utils.startup import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
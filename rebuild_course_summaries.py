@@ -0,0 +1,15 @@
+"""
+Script to rebuild the per-user course summaries from the course enrollments
+
+Usage:
+    python rebuild_course_summaries.py [--user USER_ID]
+"""
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from utils.course_summary import main
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,71 @@
+"""
+Script to send an announcement email to all verified users
+
+The HTML file may use Brevo placeholders such as {{ params.name }}, which are
+filled in per recipient. Recipients are streamed from MongoDB and sent in
+Brevo multi-version batches of BREVO_BATCH_SIZE.
+
+Usage:
+    python send_announcement.py "Subject line" announcement.html
+"""
+import sys
+from html import escape
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+from utils.database import get_db_connection, get_collection, iter_documents
+from utils.mail import send_batch_email_brevo, BREVO_BATCH_SIZE
+from utils.user_controller import BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME
+
+def send_announcement(subject, html_content):
+    """Send the announcement to every verified user, one batch at a time"""
+    try:
+        # Connect to database
+        db = get_db_connection()
+        if db is None:
+            print("Failed to connect to database")
+            return False
+            
+        collection = get_collection(db, 'usertable')
+        users = iter_documents(collection, {'status': 'verified'}, projection={'name': 1, 'email': 1},
+                               batch_size=BREVO_BATCH_SIZE)
+        
+        sent = failed = 0
+        batch = []
+        
+        def flush():
+            nonlocal sent, failed
+            for result in send_batch_email_brevo(batch, subject, html_content, BREVO_API_KEY,
+                                                 BREVO_SENDER_EMAIL, BREVO_SENDER_NAME):
+                if result['success']:
+                    sent += 1
+                else:
+                    failed += 1
+                    print(f"✗ {result['email']}: {result['error']}")
+            batch.clear()
+        
+        for user in users:
+            # Brevo substitutes {{ params.name }} into the HTML as is, so the name is escaped here
+            batch.append({'email': user['email'], 'name': user.get('name'),
+                          'params': {'name': escape(user.get('name') or '')}})
+            if len(batch) >= BREVO_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+        
+        print(f"✓ Sent: {sent}, ✗ Failed: {failed}")
+        return failed == 0
+        
+    except Exception as e:
+        print(f"Error sending announcement: {str(e)}")
+        return False
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+    with open(sys.argv[2], 'r') as f:
+        content = f.read()
+    sys.exit(0 if send_announcement(sys.argv[1], content) else 1)
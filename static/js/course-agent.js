@@ -0,0 +1,88 @@
+// Course selection functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const getStartedBtn = document.getElementById('getStartedBtn');
+    const courseSelection = document.getElementById('course-selection');
+    const scheduleSelection = document.getElementById('schedule-selection');
+    const confirmation = document.getElementById('confirmation');
+    const heroSection = document.querySelector('.hero');
+    const backToCoursesBtn = document.getElementById('back-to-courses');
+    const scheduleForm = document.getElementById('schedule-form');
+    const selectAnotherBtn = document.getElementById('select-another');
+    const step1 = document.getElementById('step1');
+    const step2 = document.getElementById('step2');
+    const step3 = document.getElementById('step3');
+    let selectedCourse = null;
+
+    // Get Started button click
+    getStartedBtn.addEventListener('click', function() {
+        heroSection.style.display = 'none';
+        courseSelection.style.display = 'block';
+    });
+
+    // Back to courses
+    backToCoursesBtn.addEventListener('click', function() {
+        // Update step indicator
+        step2.classList.remove('active');
+        step1.classList.add('active');
+        step1.classList.remove('completed');
+
+        scheduleSelection.style.display = 'none';
+        courseSelection.style.display = 'block';
+    });
+
+    // Select another course
+    selectAnotherBtn.addEventListener('click', function() {
+        // Reset step indicator
+        step3.classList.remove('active', 'completed');
+        step2.classList.remove('active', 'completed');
+        step1.classList.add('active');
+
+        confirmation.style.display = 'none';
+        courseSelection.style.display = 'block';
+    });
+
+    // Form submission
+    scheduleForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+
+        // Update step indicator
+        step2.classList.remove('active');
+        step2.classList.add('completed');
+        step3.classList.add('active');
+
+        // Get form values
+        const preferredTime = document.getElementById('preferred-time').value;
+        const notificationMethod = document.getElementById('notification-method').value;
+
+        // Update confirmation section
+        document.getElementById('selected-course-name').textContent = selectedCourse ? selectedCourse.name : 'Unknown Course';
+        document.getElementById('selected-time').textContent = document.querySelector('#preferred-time option:checked').text;
+        document.getElementById('selected-notification').textContent = document.querySelector('#notification-method option:checked').text;
+
+        scheduleSelection.style.display = 'none';
+        confirmation.style.display = 'block';
+    });
+
+    // Footer link detail functionality
+    const footerLinks = document.querySelectorAll('.footer-link');
+    const detailModal = document.getElementById('footer-detail-modal');
+    const detailTitle = document.getElementById('footer-detail-title');
+    const detailContent = document.getElementById('footer-detail-content');
+
+    footerLinks.forEach(link => {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+
+            const title = this.getAttribute('data-title');
+            const content = this.getAttribute('data-content');
+
+            detailTitle.textContent = title;
+            detailContent.textContent = content;
+
+            // Show the modal using Bootstrap's modal API
+            const modal = new bootstrap.Modal(detailModal);
+            modal.show();
+        });
+    });
+
+});
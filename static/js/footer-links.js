@@ -0,0 +1,23 @@
+// Footer link detail functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const footerLinks = document.querySelectorAll('.footer-link');
+    const detailModal = document.getElementById('footer-detail-modal');
+    const detailTitle = document.getElementById('footer-detail-title');
+    const detailContent = document.getElementById('footer-detail-content');
+
+    footerLinks.forEach(link => {
+        link.addEventListener('click', function(e) {
+            e.preventDefault();
+
+            const title = this.getAttribute('data-title');
+            const content = this.getAttribute('data-content');
+
+            detailTitle.textContent = title;
+            detailContent.textContent = content;
+
+            // Show the modal using Bootstrap's modal API
+            const modal = new bootstrap.Modal(detailModal);
+            modal.show();
+        });
+    });
+});
@@ -0,0 +1,59 @@
+document.addEventListener('DOMContentLoaded', function() {
+  const fanStack = document.getElementById('fanStack');
+  let animating = false;
+
+  fanStack.addEventListener('click', function() {
+    if (animating) return;
+    const cards = Array.from(fanStack.children);
+    if (cards.length < 2) return;
+    animating = true;
+
+    // Cards may be wrapped in <picture>; the classes belong on the image itself
+    const image = card => card.querySelector('img') || card;
+    const topCard = cards[0];
+    image(topCard).classList.add('to-back');
+    // Wait for animation to finish (match transition duration)
+    setTimeout(function() {
+      // Remove .to-back, move to back, re-assign classes
+      image(topCard).classList.remove('to-back');
+      fanStack.appendChild(topCard);
+      Array.from(fanStack.children).forEach((card, i) => {
+        image(card).className = 'card card' + (i+1);
+      });
+      animating = false;
+    }, 500); // 0.5s = CSS transition time
+  });
+});
+
+// Stats counters: one animation frame per repaint over a fixed duration,
+// instead of a timer firing as fast as the browser allows
+const COUNTER_DURATION_MS = 1500;
+const TYPE_INTERVAL_MS = 200;
+
+function animateCounter(element) {
+  const target = parseInt(element.dataset.countTo, 10);
+  const suffix = element.dataset.suffix || '';
+  let start = null;
+
+  function step(timestamp) {
+    if (start === null) start = timestamp;
+    const progress = Math.min((timestamp - start) / COUNTER_DURATION_MS, 1);
+    element.textContent = Math.round(progress * target) + suffix;
+    if (progress < 1) requestAnimationFrame(step);
+  }
+  requestAnimationFrame(step);
+}
+
+function typeText(element) {
+  const text = element.dataset.typeText;
+  let length = 0;
+
+  function step() {
+    element.textContent = text.slice(0, ++length);
+    if (length < text.length) setTimeout(step, TYPE_INTERVAL_MS);
+  }
+  setTimeout(step, TYPE_INTERVAL_MS);
+}
+
+document.querySelectorAll('[data-count-to]').forEach(animateCounter);
+document.querySelectorAll('[data-type-text]').forEach(typeText);
@@ -0,0 +1,129 @@
+const container = document.querySelector('.container');
+const registerBtn = document.querySelector('.register-btn');
+const loginBtn = document.querySelector('.login-btn');
+const forgotPasswordLink = document.getElementById('forgotPasswordLink');
+const backToLoginLink = document.getElementById('backToLogin');
+const signupLink = document.getElementById('signupLink');
+const loginLink = document.getElementById('loginLink');
+const backToLoginFromReset = document.getElementById('backToLoginFromReset');
+const backToLoginFromNewPassword = document.getElementById('backToLoginFromNewPassword');
+const togglePassword = document.querySelector('#togglePassword');
+const password = document.querySelector('#password');
+const toggleCPassword = document.querySelector('#toggleCPassword');
+const cpassword = document.querySelector('#cpassword');
+
+// Check if we should show the signup form by default
+document.addEventListener('DOMContentLoaded', function() {
+    // Check if the form parameter indicates we should show signup, forgot password, or OTP verification
+    const formType = document.body.dataset.form;
+    if (formType === 'signup') {
+        container.classList.add('active');
+    } else if (formType === 'forgot') {
+        container.classList.add('forgot-active');
+    } else if (formType === 'otp') {
+        container.classList.add('otp-active');
+    } else if (formType === 'reset') {
+        container.classList.add('reset-active');
+    } else if (formType === 'new-password') {
+        container.classList.add('new-password-active');
+    } else if (formType === 'password-changed') {
+        container.classList.add('password-changed-active');
+    }
+});
+
+registerBtn.addEventListener('click', () => {
+    container.classList.add('active');
+    container.classList.remove('forgot-active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+loginBtn.addEventListener('click', () => {
+    container.classList.remove('active');
+    container.classList.remove('forgot-active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+forgotPasswordLink.addEventListener('click', (e) => {
+    e.preventDefault();
+    container.classList.add('forgot-active');
+    container.classList.remove('active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+backToLoginLink.addEventListener('click', (e) => {
+    e.preventDefault();
+    container.classList.remove('forgot-active');
+    container.classList.remove('active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+backToLoginFromReset.addEventListener('click', (e) => {
+    e.preventDefault();
+    container.classList.remove('forgot-active');
+    container.classList.remove('active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+backToLoginFromNewPassword.addEventListener('click', (e) => {
+    e.preventDefault();
+    container.classList.remove('forgot-active');
+    container.classList.remove('active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+signupLink.addEventListener('click', (e) => {
+    e.preventDefault();
+    container.classList.add('active');
+    container.classList.remove('forgot-active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+loginLink.addEventListener('click', (e) => {
+    e.preventDefault();
+    container.classList.remove('active');
+    container.classList.remove('forgot-active');
+    container.classList.remove('otp-active');
+    container.classList.remove('reset-active');
+    container.classList.remove('new-password-active');
+    container.classList.remove('password-changed-active');
+});
+
+// Toggle password visibility
+if (togglePassword) {
+    togglePassword.addEventListener('click', function() {
+        const type = password.getAttribute('type') === 'password' ? 'text' : 'password';
+        password.setAttribute('type', type);
+        this.classList.toggle('bxs-lock-alt');
+        this.classList.toggle('bxs-lock-open-alt');
+    });
+}
+
+if (toggleCPassword) {
+    toggleCPassword.addEventListener('click', function() {
+        const type = cpassword.getAttribute('type') === 'password' ? 'text' : 'password';
+        cpassword.setAttribute('type', type);
+        this.classList.toggle('bxs-lock-alt');
+        this.classList.toggle('bxs-lock-open-alt');
+    });
+}
@@ -0,0 +1,19 @@
+const form = document.getElementById('learnForm');
+const errorMsg = document.getElementById('error-msg');
+
+form.addEventListener('submit', function(e) {
+    e.preventDefault();
+    const name = document.getElementById('fullname').value.trim();
+    const whatsapp = document.getElementById('whatsapp').value.trim();
+    const duration = document.getElementById('duration').value.trim();
+    const time = document.getElementById('time').value.trim();
+    const notificationMethod = document.getElementById('notification_method').value.trim();
+
+    if (!name || !whatsapp || !duration || !time || !notificationMethod) {
+        errorMsg.style.display = 'block';
+    } else {
+        errorMsg.style.display = 'none';
+        // Submit the form
+        form.submit();
+    }
+});
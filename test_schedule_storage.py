@@ -2,7 +2,7 @@
 Test script to verify schedule data storage in MongoDB
 """
 import os
-from utils.database import get_db_connection, get_collection, find_documents, insert_document
+from utils.database import get_db_connection, get_collection, find_one
 from utils.course_controller import select_course
 from bson.objectid import ObjectId
 
@@ -41,14 +41,10 @@ def test_schedule_storage():
             
             # Verify the data was stored
             collection = get_collection(db, 'course_enrollments')
-            enrollments = find_documents(collection, {
-                'user_id': test_user_id,
-                'course_id': test_course_id
-            })
+            query = {'user_id': test_user_id, 'course_id': test_course_id}
+            enrollment = find_one(collection, query)
             
-            if enrollments:
-                # Get the most recent enrollment (should be the one we just created)
-                enrollment = enrollments[-1]  # Last one should be the newest
+            if enrollment:
                 print("\nStored Enrollment Data:")
                 print(f"User ID: {enrollment.get('user_id')}")
                 print(f"Course ID: {enrollment.get('course_id')}")
@@ -66,12 +62,22 @@ def test_schedule_storage():
                                  'fullname', 'whatsapp', 'duration']
                 missing_fields = [field for field in expected_fields if field not in stored_schedule]
                 
-                if not missing_fields:
-                    print("\n✓ All schedule fields stored correctly")
-                    return True
-                else:
+                if missing_fields:
                     print(f"\n✗ Missing fields: {missing_fields}")
                     return False
+                print("\n✓ All schedule fields stored correctly")
+
+                # Saving again must update the same enrollment rather than add another
+                select_course(test_user_id, test_course_id, dict(test_schedule, duration='60'))
+                resaved = find_one(collection, query)
+                if collection.count_documents(query) != 1:
+                    print("✗ Saving the schedule again created a duplicate enrollment")
+                    return False
+                if resaved.get('created_at') != enrollment.get('created_at') or resaved['schedule']['duration'] != '60':
+                    print("✗ Saving the schedule again did not update the enrollment in place")
+                    return False
+                print("✓ Saving again updated the existing enrollment")
+                return True
             else:
                 print("✗ Failed to find stored enrollment")
                 return False
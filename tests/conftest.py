@@ -2,11 +2,162 @@
 pytest configuration file
 """
 
+import base64
+import json
+import socketserver
 import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 
+import pytest
+
 # Add the project root to the path so we can import our modules
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-# pytest fixtures can be defined here
\ No newline at end of file
+# pytest fixtures can be defined here
+
+class BrevoStub:
+    """A local HTTP server standing in for the Brevo transactional email API"""
+
+    def __init__(self):
+        self.requests = []
+        self.responses = []
+        self.delay = 0.0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                with stub._lock:
+                    stub.requests.append({'path': self.path, 'headers': dict(self.headers), 'json': json.loads(body or b'{}'),
+                                          'client': self.client_address})
+                    status, headers, payload = stub.responses.pop(0) if stub.responses else (201, {}, {'messageId': '<stub@brevo>'})
+                if stub.delay:
+                    threading.Event().wait(stub.delay)
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def brevo_stub(monkeypatch):
+    """Run a Brevo stand-in and point the shared Brevo transport at it"""
+    from utils.brevo import BrevoTransport
+
+    stub = BrevoStub()
+    transport = BrevoTransport(base_url=f"{stub.url}/v3", backoff_base=0.01, backoff_max=1)
+    monkeypatch.setattr('utils.brevo._transport', transport)
+    yield stub
+    transport.close()
+    stub.close()
+
+
+class SMTPStub:
+    """A local SMTP server standing in for a real mail relay (aiosmtpd-style, standard library only)"""
+
+    def __init__(self, max_recipients=100, drop_after=None):
+        self.max_recipients = max_recipients
+        self.drop_after = drop_after  # close each session after this many messages
+        self.messages = []
+        self.connections = 0
+        self.logins = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line):
+                self.wfile.write(line.encode() + b"\r\n")
+                self.wfile.flush()
+
+            def handle(self):
+                with stub._lock:
+                    stub.connections += 1
+                self.reply("220 stub ESMTP")
+                mail_from, rcpts, sent = None, [], 0
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    command = line.decode().strip()
+                    verb = command.split(' ', 1)[0].upper()
+                    if verb == 'EHLO':
+                        self.reply("250-stub")
+                        self.reply("250 AUTH PLAIN")
+                    elif verb == 'HELO':
+                        self.reply("250 stub")
+                    elif verb == 'AUTH':
+                        credentials = base64.b64decode(command.split()[2]).split(b"\0")
+                        with stub._lock:
+                            stub.logins.append(credentials[1].decode())
+                        self.reply("235 authenticated")
+                    elif verb == 'MAIL':
+                        mail_from, rcpts = command[10:].strip('<>'), []
+                        self.reply("250 ok")
+                    elif verb == 'RCPT':
+                        if len(rcpts) >= stub.max_recipients:
+                            self.reply("452 too many recipients")
+                        else:
+                            rcpts.append(command[8:].strip('<>'))
+                            self.reply("250 ok")
+                    elif verb == 'DATA':
+                        self.reply("354 go ahead")
+                        data = []
+                        while True:
+                            data_line = self.rfile.readline()
+                            if data_line in (b".\r\n", b""):
+                                break
+                            data.append(data_line)
+                        with stub._lock:
+                            stub.messages.append({'from': mail_from, 'to': rcpts, 'data': b"".join(data)})
+                        self.reply("250 queued")
+                        sent += 1
+                        if stub.drop_after and sent >= stub.drop_after:
+                            return
+                    elif verb in ('RSET', 'NOOP'):
+                        self.reply("250 ok")
+                    elif verb == 'QUIT':
+                        self.reply("221 bye")
+                        return
+                    else:
+                        self.reply("502 not implemented")
+
+        class Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+            allow_reuse_address = True
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.host, self.port = self.server.server_address
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+@pytest.fixture
+def smtp_stub():
+    """Run a local SMTP stand-in"""
+    stub = SMTPStub()
+    yield stub
+    stub.close()
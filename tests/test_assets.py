@@ -0,0 +1,115 @@
+"""
+Unit tests for the fingerprinted static asset pipeline
+"""
+
+import gzip
+import pytest
+from flask import Flask, render_template_string
+import utils.assets as assets
+from utils.assets import build_assets, fingerprint, init_assets, reset_manifest
+from utils.minify import minify_css
+
+CSS = b"body { color: #333; }\n" * 200
+MINIFIED_CSS = minify_css(CSS.decode('utf-8')).encode('utf-8')
+
+
+@pytest.fixture
+def static_dir(tmp_path):
+    static = tmp_path / 'static'
+    (static / 'images').mkdir(parents=True)
+    (static / 'app.css').write_bytes(CSS)
+    (static / 'images' / 'logo.png').write_bytes(b'\x89PNG' + bytes(range(256)) * 4)
+    return static
+
+
+@pytest.fixture
+def built(static_dir, monkeypatch):
+    dist = static_dir / 'dist'
+    monkeypatch.setattr(assets, 'DIST_DIR', str(dist))
+    manifest = build_assets(str(static_dir), str(dist))
+    reset_manifest()
+    yield manifest
+    reset_manifest()
+
+
+@pytest.fixture
+def client(built):
+    app = Flask(__name__)
+    init_assets(app)
+
+    @app.route('/page')
+    def page():
+        return render_template_string("{{ asset_url('app.css') }} {{ asset_url('missing.js') }}")
+
+    return app.test_client()
+
+
+class TestBuildAssets:
+    """Test cases for the build step"""
+
+    def test_copies_are_fingerprinted(self, built, static_dir):
+        """Test that each file is copied under a name derived from its built content"""
+        assert built['app.css']['path'] == fingerprint('app.css', MINIFIED_CSS)
+        assert (static_dir / 'dist' / built['app.css']['path']).read_bytes() == MINIFIED_CSS
+        assert built['images/logo.png']['path'].startswith('images/logo.')
+
+    def test_only_text_formats_are_precompressed(self, built, static_dir):
+        """Test that gzip variants exist for CSS but not for images"""
+        assert 'gzip' in built['app.css']['encodings']
+        assert gzip.decompress((static_dir / 'dist' / (built['app.css']['path'] + '.gz')).read_bytes()) == MINIFIED_CSS
+        assert built['images/logo.png']['encodings'] == []
+
+    def test_rebuild_skips_previous_output(self, built, static_dir):
+        """Test that a second build does not fingerprint the first build's files"""
+        manifest = build_assets(str(static_dir), str(static_dir / 'dist'))
+
+        assert sorted(manifest) == ['app.css', 'images/logo.png']
+
+    def test_stylesheets_are_minified(self, built):
+        """Test that CSS is minified before it is fingerprinted"""
+        assert built['app.css']['size'] == len(MINIFIED_CSS) < len(CSS)
+
+
+class TestServeAssets:
+    """Test cases for asset_url() and the /assets route"""
+
+    def test_asset_url_points_at_the_fingerprinted_copy(self, client, built):
+        """Test that templates link to hashed URLs and fall back to /static"""
+        body = client.get('/page').data.decode()
+
+        assert f"/assets/{built['app.css']['path']}" in body
+        assert '/static/missing.js' in body
+
+    def test_gzip_variant_for_gzip_clients(self, client, built):
+        """Test that the precompressed file is served when accepted"""
+        response = client.get(f"/assets/{built['app.css']['path']}", headers={'Accept-Encoding': 'gzip, deflate'})
+
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.mimetype == 'text/css'
+        assert gzip.decompress(response.data) == MINIFIED_CSS
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+    def test_identity_for_other_clients(self, client, built):
+        """Test that clients without gzip get the original bytes"""
+        response = client.get(f"/assets/{built['app.css']['path']}")
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.data == MINIFIED_CSS
+
+    def test_immutable_cache_headers(self, client, built):
+        """Test that fingerprinted files are cacheable for a year"""
+        response = client.get(f"/assets/{built['images/logo.png']['path']}")
+
+        assert response.cache_control.public
+        assert response.cache_control.immutable
+        assert response.cache_control.max_age == 31536000
+
+    def test_unknown_files_are_not_served(self, client):
+        """Test that only files listed in the manifest are reachable"""
+        assert client.get('/assets/manifest.json').status_code == 404
+        assert client.get('/assets/app.css').status_code == 404
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
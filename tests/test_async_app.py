@@ -0,0 +1,271 @@
+"""
+Unit tests for the async (ASGI) execution mode
+"""
+
+import asyncio
+import re
+from pathlib import Path
+import pytest
+
+pytest.importorskip('quart')
+pytest.importorskip('motor')
+httpx = pytest.importorskip('httpx')
+
+from flask import Flask, session as flask_session
+from flask_wtf.csrf import CSRFProtect, generate_csrf as flask_generate_csrf
+from werkzeug.security import generate_password_hash
+import utils.async_mail as async_mail
+import utils.passwords as passwords
+from utils.async_app import create_asgi_app
+from utils.async_mail import AsyncBrevoTransport, queue_email_brevo_async, drain_mail_tasks
+from utils.sessions import MemorySessionStore, ServerSideSessionInterface
+
+CSRF_PATTERN = re.compile(r'name="csrf_token" value="([^"]+)"')
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def flask_app():
+    app = Flask('app', root_path=str(Path(__file__).parent.parent))
+    app.secret_key = 'test'
+    CSRFProtect(app)
+
+    @app.route('/')
+    def index():
+        return 'flask index'
+
+    @app.route('/home')
+    def home():
+        return f"home of {flask_session.get('name')}"
+
+    @app.route('/token')
+    def token():
+        return flask_generate_csrf()
+
+    @app.route('/echo', methods=['POST'])
+    def echo():
+        return 'accepted'
+
+    for rule, endpoint in [('/course-agent', 'course_agent'), ('/course-agent/success', 'course_agent_success'),
+                           ('/course-agent/schedule/<course_id>', 'course_schedule')]:
+        app.add_url_rule(rule, endpoint, lambda **kwargs: 'ok')
+    return app
+
+
+@pytest.fixture
+def users(mocker, monkeypatch):
+    """An in-memory usertable behind the Motor helpers"""
+    from utils import async_user_controller
+    monkeypatch.setattr(passwords, 'PASSWORD_HASH_METHOD', 'pbkdf2:sha256:1000')
+    monkeypatch.setattr(passwords, 'PASSWORD_HASH_WORKERS', 0)
+    user = {'_id': 'user123', 'email': 'ada@example.com', 'name': 'Ada', 'status': 'verified',
+            'password': generate_password_hash('s3cret!', 'pbkdf2:sha256:1000')}
+    mocker.patch.object(async_user_controller, 'get_async_db', return_value=mocker.MagicMock())
+    mocker.patch.object(async_user_controller, 'find_one_async',
+                        side_effect=lambda collection, query, projection=None: user if query['email'] == user['email'] else None)
+    mocker.patch.object(async_user_controller, 'update_document_async', return_value=True)
+    return user
+
+
+async def client_for(flask_app, callback):
+    transport = httpx.ASGITransport(app=create_asgi_app(flask_app))
+    async with httpx.AsyncClient(transport=transport, base_url='http://testserver') as client:
+        return await callback(client)
+
+
+async def login(client, password='s3cret!'):
+    page = await client.get('/login-user')
+    token = CSRF_PATTERN.search(page.text).group(1)
+    return await client.post('/login-user', data={'email': 'ada@example.com', 'password': password, 'csrf_token': token})
+
+
+class TestAsyncRoutes:
+    """Test cases for the routes served by the Quart app"""
+
+    def test_dispatch(self, flask_app):
+        """Test that the async routes go to Quart and every other path to the Flask app"""
+        async def requests(client):
+            return (await client.get('/')).text, (await client.get('/login-user')).text
+
+        index, login_page = run(client_for(flask_app, requests))
+
+        assert index == 'flask index'
+        assert 'action="/login-user"' in login_page
+        assert CSRF_PATTERN.search(login_page)
+
+    def test_login_session_is_shared_with_flask(self, flask_app, users):
+        """Test that a login on the async path is visible to the Flask routes"""
+        async def requests(client):
+            response = await login(client)
+            return response, (await client.get('/home')).text
+
+        response, home = run(client_for(flask_app, requests))
+
+        assert response.status_code == 302
+        assert response.headers['Location'] == '/home'
+        assert home == 'home of Ada'
+
+    def test_login_rotates_server_side_session_id(self, flask_app, users):
+        """Test that an async login moves a server-side session to a new id and retires the old one"""
+        store = MemorySessionStore()
+        flask_app.session_interface = ServerSideSessionInterface(store)
+
+        async def requests(client):
+            page = await client.get('/login-user')
+            planted = client.cookies['session']
+            token = CSRF_PATTERN.search(page.text).group(1)
+            await client.post('/login-user', data={'email': 'ada@example.com', 'password': 's3cret!', 'csrf_token': token})
+            return planted, client.cookies['session'], (await client.get('/home')).text
+
+        planted, sid, home = run(client_for(flask_app, requests))
+
+        assert sid != planted
+        assert store.load(planted) is None
+        assert store.load(sid)['user_id'] == 'user123'
+        assert home == 'home of Ada'
+
+    def test_wrong_password(self, flask_app, users):
+        """Test that the login form is shown again with the controller's error"""
+        response = run(client_for(flask_app, lambda client: login(client, 'wrong')))
+
+        assert response.status_code == 200
+        assert 'Invalid email or password' in response.text
+
+    def test_post_without_csrf_token_is_rejected(self, flask_app, users):
+        """Test that the async routes are CSRF protected like the Flask ones"""
+        async def requests(client):
+            return await client.post('/login-user', data={'email': 'ada@example.com', 'password': 's3cret!'})
+
+        assert run(client_for(flask_app, requests)).status_code == 400
+
+    def test_flask_csrf_token_is_accepted(self, flask_app, users):
+        """Test that a token issued by a Flask page works on an async route, e.g. the schedule form"""
+        async def requests(client):
+            token = (await client.get('/token')).text
+            return await client.post('/login-user', data={'email': 'ada@example.com', 'password': 's3cret!',
+                                                          'csrf_token': token})
+
+        assert run(client_for(flask_app, requests)).status_code == 302
+
+    def test_async_csrf_token_is_accepted_by_flask(self, flask_app):
+        """Test that a token issued on an async page passes Flask-WTF's check on a Flask route"""
+        async def requests(client):
+            token = CSRF_PATTERN.search((await client.get('/login-user')).text).group(1)
+            rejected = await client.post('/echo', data={'csrf_token': 'forged'})
+            accepted = await client.post('/echo', data={'csrf_token': token})
+            by_header = await client.post('/echo', headers={'X-CSRFToken': token})
+            return rejected.status_code, accepted.text, by_header.text
+
+        assert run(client_for(flask_app, requests)) == (400, 'accepted', 'accepted')
+
+    def test_https_requires_matching_referrer(self, flask_app, users):
+        """Test that Flask-WTF's strict referrer check applies to the async routes over HTTPS"""
+        async def requests(client):
+            token = (await client.get('/token')).text
+            form = {'email': 'ada@example.com', 'password': 's3cret!', 'csrf_token': token}
+            missing = await client.post('/login-user', data=form)
+            foreign = await client.post('/login-user', data=form, headers={'Referer': 'https://evil.example/'})
+            same = await client.post('/login-user', data=form, headers={'Referer': 'https://testserver/login-user'})
+            return missing.status_code, foreign.status_code, same.status_code
+
+        transport = httpx.ASGITransport(app=create_asgi_app(flask_app))
+
+        async def over_https():
+            async with httpx.AsyncClient(transport=transport, base_url='https://testserver') as client:
+                return await requests(client)
+
+        assert run(over_https()) == (400, 400, 302)
+
+    def test_save_schedule(self, flask_app, users, mocker):
+        """Test that an enrollment is written and confirmed through the async controller"""
+        from utils import async_course_controller
+        upsert = mocker.patch.object(async_course_controller, 'upsert_document_async', return_value=True)
+        mocker.patch.object(async_course_controller, 'get_async_db', return_value=mocker.MagicMock())
+        mocker.patch.object(async_course_controller, 'get_user_info', return_value=mocker.MagicMock(email='ada@example.com', name='Ada'))
+        send = mocker.patch.object(async_course_controller, 'queue_email_brevo_async', return_value=True)
+
+        async def requests(client):
+            await login(client)
+            token = (await client.get('/token')).text
+            return await client.post('/course-agent/schedule/save', data={
+                'course_id': 'python', 'fullname': 'Ada', 'duration': '4 weeks', 'csrf_token': token})
+
+        response = run(client_for(flask_app, requests))
+
+        assert response.headers['Location'] == '/course-agent/success'
+        (enrollment_query, enrollment), (summary_query, summary) = [call.args[1:] for call in upsert.call_args_list]
+        assert enrollment_query == {'user_id': 'user123', 'course_id': 'python'}
+        assert enrollment['$set']['schedule']['duration'] == '4 weeks'
+        assert summary_query == {'_id': 'user123'}
+        assert 'courses.python' in summary['$set']
+        assert send.call_args[0][0] == 'ada@example.com'
+
+
+class TestAsyncMail:
+    """Test cases for the httpx Brevo transport and background sends"""
+
+    @pytest.fixture
+    def transport(self, brevo_stub, monkeypatch):
+        transports = []
+
+        def get_transport():
+            if not transports:
+                transports.append(AsyncBrevoTransport(base_url=f"{brevo_stub.url}/v3", backoff_base=0.01, backoff_max=1))
+            return transports[0]
+
+        monkeypatch.setattr(async_mail, 'get_async_brevo_transport', get_transport)
+        return brevo_stub
+
+    def test_background_send_with_retry(self, transport):
+        """Test that a queued email is delivered after a retried 503"""
+        transport.responses.append((503, {}, {'message': 'busy'}))
+
+        async def send():
+            queued = await queue_email_brevo_async('ada@example.com', 'Hi', '<p>Hi</p>', 'key', 'noreply@example.com', 'AI Agent')
+            return queued, await drain_mail_tasks(5)
+
+        assert run(send()) == (True, True)
+        assert len(transport.requests) == 2
+        assert transport.requests[-1]['json']['to'] == [{'email': 'ada@example.com', 'name': 'ada'}]
+        assert transport.requests[-1]['headers']['api-key'] == 'key'
+
+    @pytest.mark.parametrize('error, attempts', [(httpx.ConnectError('refused'), 2),
+                                                 (httpx.ConnectTimeout('connect timed out'), 2),
+                                                 (httpx.ReadTimeout('read timed out'), 1),
+                                                 (httpx.RemoteProtocolError('disconnected'), 1)])
+    def test_only_unsent_requests_are_retried(self, error, attempts):
+        """Test that connection failures are retried but errors after sending are not"""
+        requests = []
+
+        def handler(request):
+            requests.append(request)
+            if len(requests) == 1:
+                raise error
+            return httpx.Response(201, json={'messageId': '<stub@brevo>'})
+
+        async def post():
+            transport = AsyncBrevoTransport(base_url='http://brevo.test/v3', backoff_base=0.01, backoff_max=0.01)
+            transport.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            try:
+                return await transport.post('/smtp/email', {}, 'key')
+            finally:
+                await transport.close()
+
+        response = run(post())
+
+        assert len(requests) == attempts
+        assert (response is not None) == (attempts == 2)
+
+    def test_inline_when_mail_async_is_off(self, transport, monkeypatch):
+        """Test that MAIL_ASYNC=false sends before returning and reports failures"""
+        monkeypatch.setattr(async_mail, 'MAIL_ASYNC', False)
+        transport.responses.append((400, {}, {'message': 'invalid sender'}))
+
+        assert run(queue_email_brevo_async('ada@example.com', 'Hi', '<p>Hi</p>', 'key', 'x@example.com', 'X')) is False
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
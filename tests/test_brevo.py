@@ -0,0 +1,109 @@
+"""
+Unit tests for the Brevo API transport
+"""
+
+import pytest
+import requests
+from urllib3.exceptions import ProtocolError
+from utils import brevo
+from utils.mail import send_email_brevo
+
+
+def send(to="user@example.com"):
+    """Send one email through the shared transport"""
+    return send_email_brevo(to, "Subject", "<p>Hi</p>", "key", "sender@example.com", "Sender")
+
+
+class TestBrevoTransport:
+    """Test cases for the pooled Brevo transport"""
+
+    def test_connections_are_reused(self, brevo_stub):
+        """Test that consecutive sends share one keep-alive connection"""
+        assert all(send() for _ in range(3))
+
+        assert len(brevo_stub.requests) == 3
+        assert len({request['client'] for request in brevo_stub.requests}) == 1
+        assert brevo_stub.requests[0]['path'] == '/v3/smtp/email'
+        assert brevo_stub.requests[0]['headers']['api-key'] == 'key'
+
+    def test_server_errors_are_retried(self, brevo_stub):
+        """Test that 5xx responses are retried until success"""
+        brevo_stub.responses.extend([(503, {}, {}), (502, {}, {})])
+
+        assert send() is True
+        assert len(brevo_stub.requests) == 3
+        stats = brevo.get_brevo_transport().stats()['/smtp/email']
+        assert (stats['requests'], stats['errors'], stats['retries']) == (3, 2, 2)
+
+    def test_client_errors_are_not_retried(self, brevo_stub):
+        """Test that a 400 fails immediately"""
+        brevo_stub.responses.append((400, {}, {'message': 'invalid'}))
+
+        assert send() is False
+        assert len(brevo_stub.requests) == 1
+
+    def test_retries_give_up(self, brevo_stub):
+        """Test that retries stop after max_retries"""
+        brevo_stub.responses.extend([(500, {}, {})] * 10)
+
+        assert send() is False
+        assert len(brevo_stub.requests) == brevo.get_brevo_transport().max_retries + 1
+
+    def test_retry_after_is_respected(self, brevo_stub, monkeypatch):
+        """Test that Retry-After sets the wait, and too long a wait stops retrying"""
+        delays = []
+        monkeypatch.setattr('utils.brevo.time.sleep', delays.append)
+        brevo_stub.responses.extend([(429, {'Retry-After': '0.5'}, {}), (429, {'Retry-After': '120'}, {})])
+
+        assert send() is False
+        assert delays == [0.5]
+        assert len(brevo_stub.requests) == 2
+
+    def test_backoff_is_bounded_and_jittered(self):
+        """Test the full-jitter exponential backoff"""
+        transport = brevo.BrevoTransport(backoff_base=1, backoff_max=4)
+
+        for attempt in range(6):
+            assert 0 <= transport._backoff(attempt, None) <= min(4, 2 ** attempt)
+
+    def test_connection_errors_are_retried(self, monkeypatch):
+        """Test that an unreachable server is retried and reported as no response"""
+        monkeypatch.setattr('utils.brevo.time.sleep', lambda delay: None)
+        transport = brevo.BrevoTransport(base_url="http://127.0.0.1:9", max_retries=2, connect_timeout=0.5)
+
+        assert transport.post('/smtp/email', {}, 'key') is None
+        assert transport.stats()['/smtp/email']['requests'] == 3
+
+    @pytest.mark.parametrize('error', [requests.ReadTimeout('read timed out'),
+                                       requests.ConnectionError(ProtocolError('Connection aborted.'))])
+    def test_errors_after_sending_are_not_retried(self, mocker, error):
+        """Test that a request Brevo may have received is never sent again"""
+        sleep = mocker.patch('utils.brevo.time.sleep')
+        transport = brevo.BrevoTransport(max_retries=3)
+        post = mocker.patch.object(transport.session, 'post', side_effect=error)
+
+        assert transport.post('/smtp/email', {}, 'key') is None
+        assert post.call_count == 1
+        sleep.assert_not_called()
+
+    def test_connect_timeouts_are_retried(self, mocker, brevo_stub):
+        """Test that a connection that could not be opened is tried again"""
+        mocker.patch('utils.brevo.time.sleep')
+        transport = brevo.BrevoTransport(base_url=f"{brevo_stub.url}/v3", max_retries=3)
+        post = transport.session.post
+        attempts = []
+
+        def connect_once(*args, **kwargs):
+            attempts.append(args)
+            if len(attempts) == 1:
+                raise requests.ConnectTimeout('connect timed out')
+            return post(*args, **kwargs)
+
+        mocker.patch.object(transport.session, 'post', side_effect=connect_once)
+
+        assert transport.post('/smtp/email', {}, 'key').status_code == 201
+        assert len(attempts) == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
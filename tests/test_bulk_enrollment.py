@@ -0,0 +1,242 @@
+"""
+Unit tests for bulk enrollment
+"""
+
+import pytest
+from bson import ObjectId
+from unittest.mock import Mock
+from pymongo.errors import BulkWriteError
+from utils import course_controller
+from utils.course_controller import bulk_select_courses, normalize_schedule
+from utils.models import User
+
+ADA = {'_id': ObjectId(), 'name': 'Ada', 'email': 'ada@example.com'}
+ALAN = {'_id': ObjectId(), 'name': 'Alan', 'email': 'alan@example.com'}
+
+
+@pytest.fixture
+def db(mocker):
+    """A database whose usertable holds Ada and Alan"""
+    collections = {'usertable': mocker.MagicMock(), 'course_enrollments': mocker.MagicMock(),
+                   'user_course_summaries': mocker.MagicMock()}
+    collections['usertable'].find.return_value = [ADA, ALAN]
+
+    # Every upsert creates a new enrollment
+    collections['course_enrollments'].bulk_write.side_effect = lambda operations, ordered: mocker.Mock(
+        upserted_ids={index: ObjectId() for index in range(len(operations))})
+    database = mocker.MagicMock()
+    database.__getitem__.side_effect = collections.__getitem__
+    mocker.patch.object(course_controller, 'get_db_connection', return_value=database)
+    database.collections = collections
+    return database
+
+
+class TestNormalizeSchedule:
+    """Test cases for normalize_schedule()"""
+
+    def test_known_fields_and_defaults(self):
+        """Test that unknown fields are dropped and frequency and pace get defaults"""
+        schedule = normalize_schedule({'duration': 30, 'preferred_time': '10:00', 'admin': 'yes'})
+
+        assert schedule['duration'] == '30'
+        assert schedule['preferred_time'] == '10:00'
+        assert schedule['frequency'] == 'daily'
+        assert schedule['pace'] == 'intermediate'
+        assert 'admin' not in schedule
+
+    def test_malformed(self):
+        """Test that nested or non-object schedules are rejected"""
+        assert normalize_schedule(['daily']) is None
+        assert normalize_schedule({'duration': {'$gt': ''}}) is None
+
+
+class TestBulkSelectCourses:
+    """Test cases for bulk_select_courses()"""
+
+    def test_valid_rows_are_upserted_in_one_unordered_batch(self, db):
+        """Test that users are resolved in one query and all rows are written with one bulk_write"""
+        results = bulk_select_courses([
+            {'email': 'ada@example.com', 'course_id': 'python', 'schedule': {'duration': '30'}},
+            {'user_id': str(ALAN['_id']), 'course_id': 'java'},
+        ])
+
+        assert [result['success'] for result in results] == [True, True]
+        assert results[0]['created'] is True
+        assert results[1]['user_id'] == str(ALAN['_id'])
+        db.collections['usertable'].find.assert_called_once()
+        operations = db.collections['course_enrollments'].bulk_write.call_args[0][0]
+        assert db.collections['course_enrollments'].bulk_write.call_args[1] == {'ordered': False}
+        assert [operation._filter for operation in operations] == [
+            {'user_id': str(ADA['_id']), 'course_id': 'python'},
+            {'user_id': str(ALAN['_id']), 'course_id': 'java'}]
+        assert all(operation._upsert for operation in operations)
+        assert operations[0]._doc['$set']['schedule']['duration'] == '30'
+        assert 'created_at' in operations[0]._doc['$setOnInsert']
+        summaries = db.collections['user_course_summaries'].bulk_write.call_args[0][0]
+        assert [operation._filter for operation in summaries] == [{'_id': str(ADA['_id'])}, {'_id': str(ALAN['_id'])}]
+
+    def test_existing_enrollments_are_updated(self, db, mocker):
+        """Test that a row for an existing enrollment is reported as updated rather than created"""
+        db.collections['course_enrollments'].bulk_write.side_effect = None
+        db.collections['course_enrollments'].bulk_write.return_value = mocker.Mock(upserted_ids={1: ObjectId()})
+
+        results = bulk_select_courses([{'email': 'ada@example.com', 'course_id': 'python'},
+                                       {'email': 'alan@example.com', 'course_id': 'python'}])
+
+        assert [result['created'] for result in results] == [False, True]
+
+    def test_invalid_rows_are_reported_and_skipped(self, db):
+        """Test that validation failures are reported per row without stopping the valid ones"""
+        results = bulk_select_courses([
+            {'email': 'ada@example.com', 'course_id': 'cobol'},
+            {'email': 'nobody@example.com', 'course_id': 'python'},
+            {'user_id': 'not-an-id', 'course_id': 'python'},
+            {'course_id': 'python'},
+            'ada@example.com',
+            {'email': 'ada@example.com', 'course_id': 'python'},
+            {'user_id': str(ADA['_id']), 'course_id': 'python'},
+        ])
+
+        assert [result['success'] for result in results] == [False, False, False, False, False, True, False]
+        assert 'not available' in results[0]['error']
+        assert 'No account found' in results[1]['error']
+        assert 'by row 5' in results[6]['error']
+        assert [result['index'] for result in results] == list(range(7))
+        assert len(db.collections['course_enrollments'].bulk_write.call_args[0][0]) == 1
+
+    def test_write_errors_fail_only_their_rows(self, db):
+        """Test that a row rejected by the server is reported while the rest of the batch succeeds"""
+        db.collections['course_enrollments'].bulk_write.side_effect = BulkWriteError({
+            'writeErrors': [{'index': 0, 'errmsg': 'E11000 duplicate key error'}],
+            'upserted': [{'index': 1, '_id': ObjectId()}]})
+
+        results = bulk_select_courses([
+            {'email': 'ada@example.com', 'course_id': 'python'},
+            {'email': 'alan@example.com', 'course_id': 'python'},
+        ])
+
+        assert [result['success'] for result in results] == [False, True]
+        assert results[1]['created'] is True
+
+    def test_notify_batches_confirmation_emails(self, db, mocker):
+        """Test that enrolled users with the same course and schedule share one batched Brevo send"""
+        send = mocker.patch.object(course_controller, 'send_batch_email_brevo',
+                                   side_effect=lambda recipients, *args: [{'success': True} for _ in recipients])
+
+        results = bulk_select_courses([{'email': 'ada@example.com', 'course_id': 'python'},
+                                       {'email': 'alan@example.com', 'course_id': 'python'},
+                                       {'email': 'ada@example.com', 'course_id': 'java', 'schedule': {'duration': '30'}},
+                                       {'email': 'ada@example.com', 'course_id': 'cobol'}], notify=True)
+
+        assert send.call_count == 2
+        recipients, subject, html_content = send.call_args_list[0][0][:3]
+        assert [recipient['email'] for recipient in recipients] == ['ada@example.com', 'alan@example.com']
+        assert recipients[0]['params'] == {'name': 'Ada'}
+        assert 'Python' in subject
+        assert '{{ params.name }}' in html_content
+        assert 'None' not in html_content
+        assert '30 days' in send.call_args_list[1][0][2]
+        assert [result.get('notified') for result in results] == [True, True, True, None]
+
+    def test_failed_notifications_are_reported(self, db, mocker):
+        """Test that a failed batch send marks its rows as not notified without failing the enrollment"""
+        mocker.patch.object(course_controller, 'send_batch_email_brevo', side_effect=Exception('down'))
+
+        results = bulk_select_courses([{'email': 'ada@example.com', 'course_id': 'python'}], notify=True)
+
+        assert results[0]['success'] and results[0]['notified'] is False
+
+    def test_database_unavailable(self, mocker):
+        """Test that every row fails with the connection message when there is no database"""
+        mocker.patch.object(course_controller, 'get_db_connection', return_value=None)
+
+        results = bulk_select_courses([{'email': 'ada@example.com', 'course_id': 'python'}])
+
+        assert not results[0]['success']
+        assert 'database connection' in results[0]['error']
+
+
+class TestBulkEnrollRoute:
+    """Test cases for POST /api/v1/enrollments/bulk"""
+
+    @pytest.fixture
+    def client(self, monkeypatch):
+        from app import app
+        monkeypatch.setitem(app.config, 'WTF_CSRF_ENABLED', False)
+        monkeypatch.setattr(course_controller, 'BULK_ENROLLMENT_ADMINS', frozenset({'admin@example.com'}))
+        return app.test_client()
+
+    def sign_in(self, client, email, mocker, status='verified'):
+        user_id = ObjectId()
+        mocker.patch.object(course_controller, 'get_user_by_id',
+                            side_effect=lambda requested: User(user_id, 'Ada', email, status, 0)
+                            if requested == str(user_id) else None)
+        with client.session_transaction() as session:
+            session['user_id'] = str(user_id)
+            session['email'] = email
+
+    def test_requires_sign_in(self, client):
+        """Test that anonymous requests are rejected with a JSON error"""
+        response = client.post('/api/v1/enrollments/bulk', json={'enrollments': []})
+
+        assert response.status_code == 401
+        assert response.get_json()['error']['code'] == 'unauthorized'
+
+    def test_requires_admin(self, client, mocker):
+        """Test that only configured accounts may enroll others"""
+        self.sign_in(client, 'ada@example.com', mocker)
+
+        assert client.post('/api/v1/enrollments/bulk', json={'enrollments': [{}]}).status_code == 403
+
+    def test_requires_verified_admin(self, client, mocker):
+        """Test that an admin address that was never verified is not trusted"""
+        self.sign_in(client, 'admin@example.com', mocker, status='notverified')
+
+        assert client.post('/api/v1/enrollments/bulk', json={'enrollments': [{}]}).status_code == 403
+
+    def test_password_reset_email_does_not_grant_access(self, client, mocker):
+        """Test that requesting a reset code for an admin address leaves the caller's access unchanged"""
+        from utils import user_controller
+        self.sign_in(client, 'ada@example.com', mocker)
+        mocker.patch.object(user_controller, 'get_db_connection', return_value=Mock())
+        mocker.patch.object(user_controller, 'get_collection', return_value=Mock())
+        mocker.patch.object(user_controller, 'find_one', return_value={'_id': ObjectId()})
+        mocker.patch.object(user_controller, 'update_document', return_value=True)
+        mocker.patch.object(user_controller, 'invalidate_user')
+        mocker.patch.object(user_controller, 'send_email_brevo', return_value=True)
+        bulk = mocker.patch.object(course_controller, 'bulk_select_courses', return_value=[])
+
+        assert client.post('/api/v1/enrollments/bulk', json={'enrollments': [{}]}).status_code == 403
+        client.post('/forgot-password', data={'email': 'admin@example.com'})
+        with client.session_transaction() as session:
+            assert session['email'] == 'admin@example.com'
+
+        assert client.post('/api/v1/enrollments/bulk', json={'enrollments': [{}]}).status_code == 403
+        bulk.assert_not_called()
+
+    def test_validates_body(self, client, monkeypatch, mocker):
+        """Test that malformed and oversized requests are rejected before any work"""
+        self.sign_in(client, 'Admin@example.com', mocker)
+        monkeypatch.setattr(course_controller, 'BULK_ENROLLMENT_MAX_ROWS', 2)
+
+        assert client.post('/api/v1/enrollments/bulk', data='nope').status_code == 400
+        assert client.post('/api/v1/enrollments/bulk', json={'enrollments': [{}] * 3}).status_code == 413
+
+    def test_returns_per_row_results(self, client, mocker):
+        """Test that the response counts and lists the result of every row"""
+        self.sign_in(client, 'admin@example.com', mocker)
+        bulk = mocker.patch.object(course_controller, 'bulk_select_courses', return_value=[
+            {'index': 0, 'success': True, 'created': True},
+            {'index': 1, 'success': False, 'error': 'No account found for this user.'}])
+
+        response = client.post('/api/v1/enrollments/bulk', json={'enrollments': [{}, {}], 'notify': True})
+
+        assert response.status_code == 200
+        body = response.get_json()
+        assert (body['enrolled'], body['failed']) == (1, 1)
+        assert body['results'][1]['error'] == 'No account found for this user.'
+        bulk.assert_called_once_with([{}, {}], notify=True)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
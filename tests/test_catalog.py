@@ -0,0 +1,65 @@
+"""
+Unit tests for the course catalog registry
+"""
+
+import json
+import pytest
+from utils.catalog import CATALOG, CATALOG_VERSION, COURSE_LIST, Course, get_course, load_catalog
+from utils.course_controller import get_available_courses
+
+
+class TestCatalog:
+    """Test cases for the catalog registry"""
+
+    def test_lookup_by_id(self):
+        """Test that courses are found by id and unknown ids return None"""
+        course = get_course('python')
+
+        assert course.name == 'Python Programming'
+        assert course.slug == 'python-programming'
+        assert course.icon.endswith('.svg')
+        assert get_course('cobol') is None
+        assert get_course(None) is None
+
+    def test_registry_is_immutable(self):
+        """Test that the registry cannot be changed at runtime"""
+        with pytest.raises(TypeError):
+            CATALOG['cobol'] = Course('cobol', 'COBOL', 'cobol', '', '')
+        with pytest.raises(AttributeError):
+            CATALOG['python'].name = 'Changed'
+
+    def test_controller_courses_come_from_the_catalog(self):
+        """Test that enrollment validation uses the same catalog"""
+        assert dict(get_available_courses()) == {course.id: course.name for course in COURSE_LIST}
+
+    def test_every_course_is_complete(self):
+        """Test that every entry has a name, slug, icon and description"""
+        assert len(COURSE_LIST) == len(CATALOG) == 12
+        for course in COURSE_LIST:
+            assert all(course), course
+
+    def test_version_follows_the_file_contents(self, tmp_path):
+        """Test that the version hash changes when the catalog file changes"""
+        entry = {'id': 'go', 'name': 'Go', 'slug': 'go', 'icon': 'go.svg', 'description': 'Learn Go'}
+        path = tmp_path / 'courses.json'
+        path.write_text(json.dumps([entry]))
+        _, first = load_catalog(str(path))
+        path.write_text(json.dumps([dict(entry, name='Go Programming')]))
+        courses, second = load_catalog(str(path))
+
+        assert first != second
+        assert courses[0].name == 'Go Programming'
+        assert len(CATALOG_VERSION) == 12
+
+    def test_duplicate_ids_are_rejected(self, tmp_path):
+        """Test that a catalog with a repeated id fails to load"""
+        entry = {'id': 'go', 'name': 'Go', 'slug': 'go', 'icon': 'go.svg', 'description': 'Learn Go'}
+        path = tmp_path / 'courses.json'
+        path.write_text(json.dumps([entry, entry]))
+
+        with pytest.raises(ValueError):
+            load_catalog(str(path))
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
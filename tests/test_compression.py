@@ -0,0 +1,173 @@
+"""
+Unit tests for the response compression middleware
+"""
+
+import gzip
+import os
+import zlib
+import pytest
+from flask import Flask, Response, stream_with_context
+from utils.compression import CompressionMiddleware, negotiate_encoding
+
+PAGE = '<html><body>' + '<p>Learn Python with the AI agent</p>\n' * 100 + '</body></html>'
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+
+    @app.route('/page')
+    def page():
+        response = Response(PAGE, mimetype='text/html')
+        response.set_etag('page-v1')
+        return response
+
+    @app.route('/small')
+    def small():
+        return 'ok'
+
+    @app.route('/stream')
+    def stream():
+        def generate():
+            for _ in range(100):
+                yield '<p>Learn Python with the AI agent</p>\n'
+        return Response(stream_with_context(generate()), mimetype='text/html')
+
+    @app.route('/image')
+    def image():
+        return Response(b'\x89PNG' + bytes(2000), mimetype='image/png')
+
+    @app.route('/encoded')
+    def encoded():
+        response = Response(gzip.compress(PAGE.encode()), mimetype='text/css')
+        response.headers['Content-Encoding'] = 'gzip'
+        return response
+
+    @app.route('/no-transform')
+    def no_transform():
+        response = Response(PAGE, mimetype='text/html')
+        response.headers['Cache-Control'] = 'no-transform'
+        return response
+
+    app.wsgi_app = CompressionMiddleware(app.wsgi_app, min_size=500)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+class TestNegotiateEncoding:
+    """Test cases for Accept-Encoding negotiation"""
+
+    def test_gzip_without_brotli(self, mocker):
+        """Test that brotli is not offered when it is not installed"""
+        mocker.patch('utils.compression.brotli', None)
+
+        assert negotiate_encoding('gzip, deflate, br') == 'gzip'
+
+    def test_brotli_preferred_on_ties(self, mocker):
+        """Test that brotli wins when the client accepts both equally"""
+        mocker.patch('utils.compression.brotli', object())
+
+        assert negotiate_encoding('gzip, deflate, br') == 'br'
+        assert negotiate_encoding('br;q=0.5, gzip') == 'gzip'
+
+    def test_refused_or_missing(self):
+        """Test that identity is used when nothing acceptable is offered"""
+        assert negotiate_encoding('') is None
+        assert negotiate_encoding('deflate') is None
+        assert negotiate_encoding('gzip;q=0') is None
+
+
+class TestCompressionMiddleware:
+    """Test cases for CompressionMiddleware"""
+
+    def test_html_is_gzipped(self, client, mocker):
+        """Test that a large page is compressed for gzip clients"""
+        mocker.patch('utils.compression.brotli', None)
+        response = client.get('/page', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert gzip.decompress(response.data).decode() == PAGE
+        assert len(response.data) < len(PAGE) / 5
+
+    def test_etag_is_weakened(self, client):
+        """Test that a compressed body does not keep the strong validator of the original"""
+        response = client.get('/page', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['ETag'] == 'W/"page-v1"'
+
+    def test_identity_for_other_clients(self, client):
+        """Test that clients without an accepted encoding get the original, with Vary set"""
+        response = client.get('/page')
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.data.decode() == PAGE
+        assert response.headers['ETag'] == '"page-v1"'
+        assert 'Accept-Encoding' in response.headers['Vary']
+
+    def test_small_responses_are_not_compressed(self, client):
+        """Test that bodies under min_size go out as is"""
+        response = client.get('/small', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+        assert response.data == b'ok'
+
+    def test_streamed_responses_are_compressed(self, client):
+        """Test that a response without Content-Length is compressed as it streams"""
+        response = client.get('/stream', headers={'Accept-Encoding': 'gzip'})
+
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(response.data) == b'<p>Learn Python with the AI agent</p>\n' * 100
+
+    def test_stream_is_not_buffered(self):
+        """Test that compression starts before the application has produced its whole body"""
+        produced = []
+
+        def wsgi_app(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/html')])
+            for index in range(1000):
+                produced.append(index)
+                yield os.urandom(1024)
+
+        middleware = CompressionMiddleware(wsgi_app, min_size=500)
+        body = middleware({'REQUEST_METHOD': 'GET', 'HTTP_ACCEPT_ENCODING': 'gzip'}, lambda *args: None)
+
+        next(iter(body))
+        assert len(produced) < 1000
+        body.close()
+
+    def test_compressed_and_binary_payloads_are_skipped(self, client):
+        """Test that images and already-encoded responses are left alone"""
+        image = client.get('/image', headers={'Accept-Encoding': 'gzip'})
+        encoded = client.get('/encoded', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in image.headers
+        assert 'Vary' not in image.headers
+        assert encoded.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(encoded.data).decode() == PAGE
+
+    def test_no_transform_is_respected(self, client):
+        """Test that Cache-Control: no-transform disables compression"""
+        response = client.get('/no-transform', headers={'Accept-Encoding': 'gzip'})
+
+        assert 'Content-Encoding' not in response.headers
+
+    def test_levels_per_content_type(self, app, mocker):
+        """Test that each content type is compressed with its own level"""
+        mocker.patch('utils.compression.brotli', None)
+        compressobj = mocker.patch('utils.compression.zlib.compressobj', wraps=zlib.compressobj)
+        app.wsgi_app.levels = {'text/html': {'gzip': 9}}
+
+        response = app.test_client().get('/page', headers={'Accept-Encoding': 'gzip'})
+
+        assert compressobj.call_args[0][0] == 9
+        assert gzip.decompress(response.data).decode() == PAGE
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,219 @@
+"""
+Unit tests for the per-user course summaries
+"""
+
+from datetime import datetime, timezone
+import pytest
+from unittest.mock import MagicMock
+from utils import course_controller, course_summary
+from utils.course_summary import (next_lesson_at, parse_lesson_time, rebuild_course_summaries, summary_update,
+                                  get_user_course_summary)
+
+# A Friday
+NOW = datetime(2025, 10, 10, 9, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def db(mocker):
+    """A database with mock collections, returned by every get_db_connection()"""
+    collections = {}
+
+    def get_collection(name):
+        return collections.setdefault(name, MagicMock())
+
+    database = MagicMock()
+    database.__getitem__.side_effect = get_collection
+    database.collections = collections
+    for module in (course_summary, course_controller):
+        mocker.patch.object(module, 'get_db_connection', return_value=database)
+    return database
+
+
+class TestLessonTimes:
+    """Test cases for lesson time parsing and next lesson computation"""
+
+    def test_parse_lesson_time(self):
+        """Test that both schedule forms' values are normalized to HH:MM"""
+        assert parse_lesson_time('2:00 PM') == '14:00'
+        assert parse_lesson_time('7:00 am') == '07:00'
+        assert parse_lesson_time('Evening') == '17:00'
+        assert parse_lesson_time('18:30') == '18:30'
+        assert parse_lesson_time('whenever') is None
+        assert parse_lesson_time(None) is None
+
+    def test_next_lesson_daily(self):
+        """Test that today's lesson is next until it has started, then tomorrow's"""
+        assert next_lesson_at('10:00', 'daily', NOW) == datetime(2025, 10, 10, 10, 0, tzinfo=timezone.utc)
+        assert next_lesson_at('09:00', 'daily', NOW) == datetime(2025, 10, 11, 9, 0, tzinfo=timezone.utc)
+        assert next_lesson_at(None, 'daily', NOW) is None
+
+    def test_next_lesson_respects_frequency(self):
+        """Test that weekday and weekend schedules skip the other days"""
+        assert next_lesson_at('09:00', 'weekdays', NOW) == datetime(2025, 10, 13, 9, 0, tzinfo=timezone.utc)
+        assert next_lesson_at('10:00', 'weekends', NOW) == datetime(2025, 10, 11, 10, 0, tzinfo=timezone.utc)
+
+
+class TestSummaryWrites:
+    """Test cases for keeping summaries in step with enrollment writes"""
+
+    def test_summary_update_replaces_only_its_course(self):
+        """Test that an enrollment write sets its own entry of the courses map"""
+        query, update = summary_update('u1', 'python', 'Python Programming', 'active',
+                                       {'preferred_time': '2:00 PM', 'frequency': 'daily'}, NOW)
+
+        assert query == {'_id': 'u1'}
+        assert set(update['$set']) == {'courses.python', 'updated_at'}
+        entry = update['$set']['courses.python']
+        assert entry['lesson_time'] == '14:00'
+        assert entry['next_lesson_at'] == datetime(2025, 10, 10, 14, 0, tzinfo=timezone.utc)
+
+    def test_select_course_records_summary(self, db):
+        """Test that saving a schedule upserts the enrollment and then the user's summary"""
+        success, _ = course_controller.select_course('u1', 'python', {'preferred_time': '7:00 AM'})
+
+        assert success
+        db.collections['course_enrollments'].update_one.assert_called_once()
+        query, update = db.collections[course_summary.SUMMARY_COLLECTION].update_one.call_args[0]
+        assert query == {'_id': 'u1'}
+        assert update['$set']['courses.python']['course_name'] == course_controller.COURSES['python']
+        assert db.collections[course_summary.SUMMARY_COLLECTION].update_one.call_args[1] == {'upsert': True}
+
+    def test_update_schedule_records_summary(self, db):
+        """Test that a schedule change refreshes the summary from the updated enrollment"""
+        db.collections['course_enrollments'] = MagicMock()
+        db.collections['course_enrollments'].find_one_and_update.return_value = {
+            'course_name': 'Java Development', 'status': 'active'}
+
+        success, _ = course_controller.update_course_schedule('u1', 'java', {'preferred_time': 'morning'})
+
+        assert success
+        _, update = db.collections[course_summary.SUMMARY_COLLECTION].update_one.call_args[0]
+        assert update['$set']['courses.java']['lesson_time'] == '08:00'
+
+    def test_missing_enrollment_leaves_summary_alone(self, db):
+        """Test that updating an enrollment that does not exist writes no summary"""
+        db.collections['course_enrollments'] = MagicMock()
+        db.collections['course_enrollments'].find_one_and_update.return_value = None
+
+        success, _ = course_controller.update_course_schedule('u1', 'java', {})
+
+        assert not success
+        assert course_summary.SUMMARY_COLLECTION not in db.collections
+
+
+class TestSummaryReads:
+    """Test cases for get_user_course_summary()"""
+
+    def test_reads_one_document(self, db, mocker):
+        """Test that the courses come from the summary alone, with passed lessons moved on"""
+        mocker.patch.object(course_summary, 'datetime', wraps=datetime, now=lambda tz=None: NOW)
+        summaries = db.collections.setdefault(course_summary.SUMMARY_COLLECTION, MagicMock())
+        summaries.find_one.return_value = {'courses': {
+            'java': {'course_id': 'java', 'course_name': 'Java', 'status': 'active', 'lesson_time': '09:00',
+                     'frequency': 'daily', 'next_lesson_at': datetime(2025, 10, 9, 9, 0)},
+            'python': {'course_id': 'python', 'course_name': 'Python', 'status': 'active', 'lesson_time': None,
+                       'frequency': 'daily', 'next_lesson_at': None},
+        }}
+
+        courses = get_user_course_summary('u1')
+
+        assert [course.course_id for course in courses] == ['java', 'python']
+        assert courses[0].next_lesson_at == datetime(2025, 10, 11, 9, 0, tzinfo=timezone.utc)
+        assert courses[0].to_dict()['next_lesson_at'] == '2025-10-11T09:00:00+00:00'
+        assert 'course_enrollments' not in db.collections
+
+    def test_builds_missing_summary(self, db):
+        """Test that a user without a summary gets one built from their enrollments"""
+        summaries = db.collections.setdefault(course_summary.SUMMARY_COLLECTION, MagicMock())
+        summaries.find_one.return_value = None
+        db.collections['course_enrollments'] = MagicMock()
+        db.collections['course_enrollments'].find.return_value = [
+            {'course_id': 'python', 'course_name': 'Python', 'status': 'active', 'schedule': {}}]
+
+        courses = get_user_course_summary('u1')
+
+        assert [course.course_id for course in courses] == ['python']
+        query, update = summaries.update_one.call_args[0]
+        assert query == {'_id': 'u1'}
+        assert set(update['$setOnInsert']['courses']) == {'python'}
+
+    def test_database_unavailable(self, mocker):
+        """Test that no connection yields None"""
+        mocker.patch.object(course_summary, 'get_db_connection', return_value=None)
+
+        assert get_user_course_summary('u1') is None
+
+
+class TestRebuild:
+    """Test cases for rebuild_course_summaries()"""
+
+    def test_rebuild_streams_users_in_batches(self, db, monkeypatch):
+        """Test that each user's enrollments become one summary and stale summaries are removed"""
+        monkeypatch.setattr(course_summary, 'SUMMARY_REBUILD_BATCH_SIZE', 1)
+        enrollments = db.collections.setdefault('course_enrollments', MagicMock())
+        cursor = enrollments.find.return_value.sort.return_value.batch_size.return_value
+        cursor.__iter__.return_value = iter([
+            {'user_id': 'u1', 'course_id': 'java', 'course_name': 'Java', 'status': 'active', 'schedule': {}},
+            {'user_id': 'u1', 'course_id': 'python', 'course_name': 'Python', 'status': 'active', 'schedule': {}},
+            {'user_id': 'u2', 'course_id': 'python', 'course_name': 'Python', 'status': 'active', 'schedule': {}},
+        ])
+        summaries = db.collections.setdefault(course_summary.SUMMARY_COLLECTION, MagicMock())
+        summaries.bulk_write.side_effect = lambda operations, ordered: MagicMock(upserted_ids={})
+
+        assert rebuild_course_summaries(db) == 2
+
+        batches = [call.args[0] for call in summaries.bulk_write.call_args_list]
+        assert [[operation._filter for operation in batch] for batch in batches] == [[{'_id': 'u1'}], [{'_id': 'u2'}]]
+        assert set(batches[0][0]._doc['$set']['courses']) == {'java', 'python'}
+        enrollments.find.return_value.sort.assert_called_once_with([('user_id', 1), ('course_id', 1)])
+        assert set(summaries.delete_many.call_args[0][0]) == {'updated_at'}
+
+    def test_rebuild_one_user(self, db):
+        """Test that a single-user rebuild only reads and prunes that user"""
+        enrollments = db.collections.setdefault('course_enrollments', MagicMock())
+        enrollments.find.return_value.sort.return_value.batch_size.return_value.__iter__.return_value = iter([])
+
+        assert rebuild_course_summaries(db, 'u1') == 0
+
+        assert enrollments.find.call_args[0][0] == {'user_id': 'u1'}
+        assert db.collections[course_summary.SUMMARY_COLLECTION].delete_many.call_args[0][0]['_id'] == 'u1'
+
+    def test_rebuild_reports_failure(self, db):
+        """Test that a failed batch write makes the rebuild return None"""
+        enrollments = db.collections.setdefault('course_enrollments', MagicMock())
+        enrollments.find.return_value.sort.return_value.batch_size.return_value.__iter__.return_value = iter([
+            {'user_id': 'u1', 'course_id': 'java'}])
+        db.collections.setdefault(course_summary.SUMMARY_COLLECTION, MagicMock()).bulk_write.side_effect = Exception('down')
+
+        assert rebuild_course_summaries(db) is None
+
+
+class TestEnrollmentsRoute:
+    """Test cases for GET /api/v1/users/me/enrollments"""
+
+    @pytest.fixture
+    def client(self):
+        from app import app
+        return app.test_client()
+
+    def test_requires_sign_in(self, client):
+        """Test that anonymous requests are rejected with a JSON error"""
+        assert client.get('/api/v1/users/me/enrollments').status_code == 401
+
+    def test_returns_summary(self, client, mocker):
+        """Test that the signed-in user's summary is returned"""
+        from utils.models import CourseSummary
+        get_summary = mocker.patch.object(course_summary, 'get_user_course_summary', return_value=[
+            CourseSummary('python', 'Python', 'active', '14:00', 'daily', datetime(2025, 10, 10, 14, 0, tzinfo=timezone.utc))])
+        with client.session_transaction() as session:
+            session['user_id'] = 'u1'
+
+        response = client.get('/api/v1/users/me/enrollments')
+
+        assert response.get_json() == {'courses': [{'course_id': 'python', 'course_name': 'Python', 'status': 'active',
+                                                    'next_lesson_at': '2025-10-10T14:00:00+00:00'}]}
+        get_summary.assert_called_once_with('u1')
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
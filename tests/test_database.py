@@ -0,0 +1,159 @@
+"""
+Unit tests for the database connection manager
+"""
+
+import os
+import pytest
+from unittest.mock import MagicMock, Mock, patch
+from pymongo.errors import BulkWriteError
+from utils import database
+
+
+@pytest.fixture(autouse=True)
+def reset_client():
+    """Make every test start without a pooled client"""
+    database._client = None
+    database._client_pid = None
+    yield
+    database._client = None
+    database._client_pid = None
+
+
+class TestConnectionManager:
+    """Test cases for the pooled MongoClient manager"""
+
+    def test_client_is_created_once_per_process(self):
+        """Test that repeated calls reuse the same client"""
+        with patch('utils.database.MongoClient') as mock_client_cls:
+            first = database.get_client()
+            second = database.get_client()
+
+        assert first is second
+        mock_client_cls.assert_called_once()
+
+    def test_client_uses_pool_options(self):
+        """Test that the pool configuration is passed to MongoClient"""
+        with patch('utils.database.MongoClient') as mock_client_cls:
+            database.get_client()
+
+        _, kwargs = mock_client_cls.call_args
+        assert kwargs['maxPoolSize'] == database.MONGO_MAX_POOL_SIZE
+        assert kwargs['maxIdleTimeMS'] == database.MONGO_MAX_IDLE_TIME_MS
+        assert kwargs['serverSelectionTimeoutMS'] == database.MONGO_SERVER_SELECTION_TIMEOUT_MS
+        assert kwargs['connect'] is False
+
+    def test_client_is_rebuilt_after_fork(self):
+        """Test that a child process never reuses the parent's client"""
+        with patch('utils.database.MongoClient', side_effect=[Mock(), Mock()]) as mock_client_cls:
+            parent_client = database.get_client()
+            with patch('utils.database.os.getpid', return_value=os.getpid() + 1):
+                child_client = database.get_client()
+
+        assert parent_client is not child_client
+        assert mock_client_cls.call_count == 2
+
+    def test_get_db_connection_does_not_ping(self):
+        """Test that getting the database issues no server command"""
+        mock_client = MagicMock()
+        with patch('utils.database.MongoClient', return_value=mock_client):
+            db = database.get_db_connection()
+
+        assert db is mock_client.__getitem__.return_value
+        mock_client.admin.command.assert_not_called()
+
+
+class TestQueryHelpers:
+    """Test cases for the streaming and single-document query helpers"""
+
+    def test_iter_documents_applies_cursor_options(self):
+        """Test that cursor options are forwarded and documents are streamed"""
+        cursor = MagicMock()
+        cursor.sort.return_value = cursor
+        cursor.limit.return_value = cursor
+        cursor.batch_size.return_value = cursor
+        cursor.max_time_ms.return_value = cursor
+        cursor.__iter__.return_value = iter([{'_id': 1}, {'_id': 2}])
+        collection = Mock()
+        collection.find.return_value = cursor
+
+        documents = database.iter_documents(collection, {'status': 'active'}, projection={'_id': 1},
+                                            sort=[('_id', 1)], limit=10, batch_size=2, max_time_ms=500)
+
+        collection.find.assert_not_called()
+        assert list(documents) == [{'_id': 1}, {'_id': 2}]
+        collection.find.assert_called_once_with({'status': 'active'}, {'_id': 1})
+        cursor.sort.assert_called_once_with([('_id', 1)])
+        cursor.limit.assert_called_once_with(10)
+        cursor.batch_size.assert_called_once_with(2)
+        cursor.max_time_ms.assert_called_once_with(500)
+        cursor.close.assert_called_once()
+
+    def test_find_one_returns_first_match(self):
+        """Test that find_one delegates to a single-document query"""
+        collection = Mock()
+        collection.find_one.return_value = {'_id': 1, 'email': 'john@example.com'}
+
+        user = database.find_one(collection, {'email': 'john@example.com'}, {'email': 1})
+
+        assert user == {'_id': 1, 'email': 'john@example.com'}
+        collection.find_one.assert_called_once_with({'email': 'john@example.com'}, {'email': 1},
+                                                    sort=None, max_time_ms=None)
+
+    def test_find_one_returns_none_on_error(self):
+        """Test that query errors are reported as no result"""
+        collection = Mock()
+        collection.find_one.side_effect = Exception('boom')
+
+        assert database.find_one(collection, {'email': 'john@example.com'}) is None
+
+    def test_insert_documents_reports_failed_rows(self):
+        """Test that an unordered batch reports the position and reason of each failed document"""
+        collection = Mock()
+        collection.insert_many.side_effect = BulkWriteError({'writeErrors': [
+            {'index': 1, 'code': 11000, 'errmsg': 'E11000 duplicate key error'}]})
+
+        errors = database.insert_documents(collection, [{'a': 1}, {'a': 1}, {'a': 2}])
+
+        assert errors == {1: 'E11000 duplicate key error'}
+        collection.insert_many.assert_called_once_with([{'a': 1}, {'a': 1}, {'a': 2}], ordered=False)
+
+    def test_insert_documents_ordered_stops_at_first_failure(self):
+        """Test that documents after the first failure of an ordered batch are reported as not written"""
+        collection = Mock()
+        collection.insert_many.side_effect = BulkWriteError({'writeErrors': [{'index': 0, 'errmsg': 'invalid'}]})
+
+        errors = database.insert_documents(collection, [{'a': 1}, {'a': 2}], ordered=True)
+
+        assert errors == {0: 'invalid', 1: 'Not attempted after an earlier failure'}
+
+    def test_upsert_documents(self):
+        """Test that upserts go out as one unordered bulk_write and report inserted ids by position"""
+        collection = Mock()
+        collection.bulk_write.return_value = Mock(upserted_ids={1: 'new-id'})
+
+        upserted, errors = database.upsert_documents(collection, [({'k': 1}, {'$set': {'v': 1}}),
+                                                                  ({'k': 2}, {'$set': {'v': 2}})])
+
+        assert (upserted, errors) == ({1: 'new-id'}, {})
+        operations = collection.bulk_write.call_args[0][0]
+        assert [(operation._filter, operation._upsert) for operation in operations] == [({'k': 1}, True), ({'k': 2}, True)]
+        assert collection.bulk_write.call_args[1] == {'ordered': False}
+
+    def test_upsert_documents_reports_failed_rows(self):
+        """Test that a partly failed batch reports both the inserted ids and the errors"""
+        collection = Mock()
+        collection.bulk_write.side_effect = BulkWriteError({'writeErrors': [{'index': 0, 'errmsg': 'E11000'}],
+                                                            'upserted': [{'index': 1, '_id': 'new-id'}]})
+
+        assert database.upsert_documents(collection, [({'k': 1}, {}), ({'k': 2}, {})]) == ({1: 'new-id'}, {0: 'E11000'})
+
+    def test_insert_documents_returns_none_on_error(self):
+        """Test that a failed batch is reported as no result"""
+        collection = Mock()
+        collection.insert_many.side_effect = Exception('boom')
+
+        assert database.insert_documents(collection, [{'a': 1}]) is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
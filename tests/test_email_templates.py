@@ -0,0 +1,61 @@
+"""
+Unit tests for the Jinja email templates
+"""
+
+import pytest
+from jinja2 import UndefinedError
+from utils.email_templates import EMAIL_ENV, get_email_template, schedule_rows
+from utils.mail import get_otp_email_template, render_schedule_confirmation_email
+
+
+class TestEmailTemplates:
+    """Test cases for email template compilation and rendering"""
+
+    def test_fields_are_escaped_unless_safe(self):
+        """Test that values are escaped and |safe values are inserted as is"""
+        template = EMAIL_ENV.from_string("<p>{{ name }}</p>{{ body|safe }}<b>{{ count }}</b>")
+
+        assert template.render(name='<script>', body='<i>ok</i>', count=3) == "<p>&lt;script&gt;</p><i>ok</i><b>3</b>"
+
+    def test_missing_field_raises(self):
+        """Test that a missing field is an error rather than a blank"""
+        with pytest.raises(UndefinedError):
+            EMAIL_ENV.from_string("{{ name }}").render()
+
+    def test_templates_are_compiled_once(self):
+        """Test that repeated lookups return the same compiled template"""
+        assert get_email_template('otp.html') is get_email_template('otp.html')
+
+    def test_otp_email(self):
+        """Test the OTP email content"""
+        html = get_otp_email_template(123456, 'reset', 15)
+
+        assert "Password Reset Code" in html
+        assert '<div class="otp-code">123456</div>' in html
+        assert "expire in 15 minutes" in html
+
+    def test_schedule_confirmation_escapes_user_fields(self):
+        """Test that names and schedule values cannot inject markup"""
+        html = render_schedule_confirmation_email('<b>John</b>', 'Python Programming',
+                                                  {'fullname': 'A & B', 'duration': '30',
+                                                   'notification_method': 'email_and_whatsapp'})
+
+        assert "Hello &lt;b&gt;John&lt;/b&gt;," in html
+        assert "<span class='detail-label'>Full Name:</span> A &amp; B</div>" in html
+        assert "<span class='detail-label'>Learning Duration:</span> 30 days</div>" in html
+        assert "Email And Whatsapp" in html
+
+    def test_schedule_details_follow_display_order(self):
+        """Test that rows appear in the same order as the original email"""
+        assert schedule_rows({'whatsapp': '+1', 'fullname': 'John'}) == [('Full Name', 'John'), ('WhatsApp', '+1')]
+        assert schedule_rows({}) == []
+
+    def test_bulk_placeholder_survives_rendering(self):
+        """Test that the Brevo name placeholder used by bulk confirmations is passed through"""
+        html = render_schedule_confirmation_email('{{ params.name }}', 'Python Programming', {})
+
+        assert "Hello {{ params.name }}," in html
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,179 @@
+"""
+Unit tests for HTTP conditional caching of rendered pages
+"""
+
+import pytest
+from flask import Flask
+from flask_wtf.csrf import CSRFProtect
+from jinja2 import DictLoader
+import utils.http_cache as http_cache
+from utils.http_cache import PageCache, render_cached
+
+TEMPLATES = {
+    'hello.html': '<h1>Hello {{ name }}</h1>',
+    'form.html': '<form><input name="csrf_token" value="{{ csrf_token() }}"/></form>',
+}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.jinja_loader = DictLoader(dict(TEMPLATES))
+    CSRFProtect(app)
+    http_cache._template_versions.clear()
+
+    @app.route('/hello/<name>')
+    def hello(name):
+        return render_cached('hello.html', (name,), name=name)
+
+    @app.route('/form')
+    def form():
+        return render_cached('form.html', csrf=True)
+
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def revalidate(client, path):
+    etag = client.get(path).headers['ETag']
+    return client.get(path, headers={'If-None-Match': etag})
+
+
+class TestRenderCached:
+    """Test cases for ETag revalidation"""
+
+    def test_matching_etag_returns_304_without_rendering(self, client, mocker):
+        """Test that a revalidation skips the template"""
+        etag = client.get('/hello/ada').headers['ETag']
+        render = mocker.patch('utils.http_cache.render_template')
+
+        response = client.get('/hello/ada', headers={'If-None-Match': etag})
+
+        assert response.status_code == 304
+        assert response.data == b''
+        assert response.headers['ETag'] == etag
+        assert response.headers['Cache-Control'] == 'private, no-cache'
+        assert 'Cookie' in response.headers['Vary']
+        render.assert_not_called()
+
+    def test_weakened_etag_revalidates(self, client):
+        """Test that the weak ETag of a compressed page still matches"""
+        etag = client.get('/hello/ada').headers['ETag']
+
+        response = client.get('/hello/ada', headers={'If-None-Match': 'W/' + etag})
+
+        assert response.status_code == 304
+
+    def test_etag_follows_the_key(self, client):
+        """Test that pages for different keys do not share an ETag"""
+        etag = client.get('/hello/ada').headers['ETag']
+
+        response = client.get('/hello/grace', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.data == b'<h1>Hello grace</h1>'
+
+    def test_output_is_escaped_and_complete(self, client):
+        """Test that the 200 response is the normal rendered template"""
+        response = client.get('/hello/<b>')
+
+        assert response.status_code == 200
+        assert response.data == b'<h1>Hello &lt;b&gt;</h1>'
+
+    def test_template_edit_changes_the_etag(self, app, client):
+        """Test that a changed template is re-rendered while templates auto-reload"""
+        app.jinja_env.auto_reload = True
+        etag = client.get('/hello/ada').headers['ETag']
+        app.jinja_loader.mapping['hello.html'] = '<h2>Hi {{ name }}</h2>'
+
+        response = client.get('/hello/ada', headers={'If-None-Match': etag})
+
+        assert response.status_code == 200
+        assert response.data == b'<h2>Hi ada</h2>'
+
+
+class TestCsrfPages:
+    """Test cases for pages that embed CSRF tokens"""
+
+    def test_first_render_has_no_etag(self, client):
+        """Test that a page rendered before the session had a CSRF secret is not revalidated"""
+        response = client.get('/form')
+
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+
+    def test_same_session_revalidates(self, client):
+        """Test that a session with a CSRF secret gets 304s"""
+        client.get('/form')
+
+        assert revalidate(client, '/form').status_code == 304
+
+    def test_etag_is_tied_to_the_csrf_secret(self, client):
+        """Test that another session's page is never reused"""
+        client.get('/form')
+        etag = client.get('/form').headers['ETag']
+        with client.session_transaction() as sess:
+            sess['csrf_token'] = 'another-secret'
+
+        assert client.get('/form', headers={'If-None-Match': etag}).status_code == 200
+
+    def test_etag_expires_with_the_csrf_window(self, client, mocker):
+        """Test that cached tokens are refreshed before they expire"""
+        client.get('/form')
+        window = mocker.patch('utils.http_cache._csrf_window', return_value=555)
+        etag = client.get('/form').headers['ETag']
+        window.return_value = 556
+
+        assert client.get('/form', headers={'If-None-Match': etag}).status_code == 200
+
+    def test_csrf_window_is_half_the_token_lifetime(self, app, mocker):
+        """Test that the window turns over every WTF_CSRF_TIME_LIMIT / 2 seconds"""
+        with app.app_context():
+            mocker.patch('utils.http_cache.time.time', return_value=3600.0 * 10)
+            first = http_cache._csrf_window()
+            mocker.patch('utils.http_cache.time.time', return_value=3600.0 * 10 + 1799)
+            assert http_cache._csrf_window() == first
+            mocker.patch('utils.http_cache.time.time', return_value=3600.0 * 10 + 1800)
+            assert http_cache._csrf_window() == first + 1
+
+
+class TestPageCache:
+    """Test cases for the rendered-output cache"""
+
+    def test_rendered_output_is_reused(self, client, mocker):
+        """Test that a cached page is served without rendering again"""
+        mocker.patch.object(http_cache, 'PAGE_CACHE_ENABLED', True)
+        mocker.patch.object(http_cache, 'page_cache', PageCache(ttl=60, max_entries=10))
+        first = client.get('/hello/ada').data
+        render = mocker.patch('utils.http_cache.render_template')
+
+        assert client.get('/hello/ada').data == first
+        render.assert_not_called()
+        assert http_cache.page_cache.stats()['hits'] == 1
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache stays within max_entries"""
+        cache = PageCache(ttl=60, max_entries=1)
+        cache.put('a', 'A')
+        cache.put('b', 'B')
+
+        assert cache.get('a') is None
+        assert cache.get('b') == 'B'
+
+    def test_disabled_http_cache_renders_plainly(self, client, mocker):
+        """Test that HTTP_CACHE_ENABLED=false turns off ETags"""
+        mocker.patch.object(http_cache, 'HTTP_CACHE_ENABLED', False)
+
+        response = client.get('/hello/ada')
+
+        assert response.status_code == 200
+        assert 'ETag' not in response.headers
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
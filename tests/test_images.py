@@ -0,0 +1,132 @@
+"""
+Unit tests for responsive image variants
+"""
+
+import io
+import pytest
+from flask import Flask, render_template_string
+import utils.assets as assets
+from utils.assets import build_assets, init_assets, reset_manifest
+
+Image = pytest.importorskip('PIL.Image')
+
+from utils.images import build_image_variants
+
+
+def png_bytes(width, height):
+    output = io.BytesIO()
+    Image.new('RGBA', (width, height), (30, 120, 200, 255)).save(output, format='PNG')
+    return output.getvalue()
+
+
+@pytest.fixture(autouse=True)
+def webp_and_png_only(mocker):
+    """Keep the tests fast and independent of the AVIF codec"""
+    mocker.patch('utils.images.available_formats', return_value=['webp', 'png'])
+    mocker.patch('utils.assets.available_formats', return_value=['webp', 'png'])
+
+
+class TestBuildImageVariants:
+    """Test cases for the derivative generator"""
+
+    def test_widths_stop_at_the_source_width(self, tmp_path, mocker):
+        """Test that images are never upscaled and the full width is kept"""
+        mocker.patch('utils.images.IMAGE_WIDTHS', (220, 350, 700))
+        image = build_image_variants(png_bytes(500, 250), str(tmp_path))
+
+        assert image['width'] == 500
+        webp = [(v['width'], Image.open(v['file']).size) for v in image['variants'] if v['format'] == 'webp']
+        assert webp == [(220, (220, 110)), (350, (350, 175)), (500, (500, 250))]
+        # The full-size PNG is the original file, so it is not re-encoded
+        assert [v['width'] for v in image['variants'] if v['format'] == 'png'] == [220, 350]
+
+    def test_derivatives_are_cached_by_source_hash(self, tmp_path, mocker):
+        """Test that a second build reuses the encoded files"""
+        mocker.patch('utils.images.IMAGE_WIDTHS', (100,))
+        content = png_bytes(300, 300)
+        build_image_variants(content, str(tmp_path))
+        encode = mocker.patch('utils.images._encode')
+
+        image = build_image_variants(content, str(tmp_path))
+
+        encode.assert_not_called()
+        assert len(image['variants']) == 3
+
+    def test_changed_source_gets_new_derivatives(self, tmp_path, mocker):
+        """Test that the cache key follows the image content"""
+        mocker.patch('utils.images.IMAGE_WIDTHS', (100,))
+        first = build_image_variants(png_bytes(300, 300), str(tmp_path))
+        second = build_image_variants(png_bytes(300, 200), str(tmp_path))
+
+        assert first['variants'][0]['file'] != second['variants'][0]['file']
+
+
+class TestResponsiveImage:
+    """Test cases for the template helpers"""
+
+    @pytest.fixture
+    def client(self, tmp_path, monkeypatch):
+        static = tmp_path / 'static'
+        (static / 'images').mkdir(parents=True)
+        (static / 'images' / 'hero.png').write_bytes(png_bytes(400, 200))
+        monkeypatch.setattr('utils.images.IMAGE_WIDTHS', (200,))
+        monkeypatch.setattr('utils.images.IMAGE_CACHE_DIR', str(tmp_path / 'cache'))
+        monkeypatch.setattr(assets, 'DIST_DIR', str(static / 'dist'))
+        monkeypatch.setattr(assets, 'build_image_variants',
+                            lambda content: build_image_variants(content, str(tmp_path / 'cache')))
+        build_assets(str(static), str(static / 'dist'))
+        reset_manifest()
+
+        app = Flask(__name__)
+        init_assets(app)
+
+        @app.route('/hero')
+        def hero():
+            return render_template_string("{{ responsive_image('images/hero.png', 'Hero <1>', '50vw', 'card') }}")
+
+        @app.route('/missing')
+        def missing():
+            return render_template_string("{{ responsive_image('images/missing.png', 'Missing') }}")
+
+        yield app.test_client()
+        reset_manifest()
+
+    def test_picture_lists_variants_by_width(self, client):
+        """Test that each format gets a srcset of its widths"""
+        body = client.get('/hero').data.decode()
+
+        assert body.startswith('<picture><source type="image/webp" srcset="/assets/images/hero-200w.')
+        assert ' 200w, /assets/images/hero-400w.' in body
+        assert 'sizes="50vw"' in body
+        assert 'class="card"' in body
+        assert 'alt="Hero &lt;1&gt;"' in body
+        assert 'image/avif' not in body
+
+    def test_png_srcset_ends_with_the_original(self, client):
+        """Test that the fallback img offers the original at full width"""
+        body = client.get('/hero').data.decode()
+        img = body[body.index('<img'):]
+
+        assert 'hero-200w.' in img
+        assert '.png 400w"' in img
+
+    def test_variants_are_served(self, client):
+        """Test that the derivative URLs resolve"""
+        body = client.get('/hero').data.decode()
+        url = body.split('srcset="')[1].split(' ')[0]
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'image/webp'
+        assert Image.open(io.BytesIO(response.data)).size == (200, 100)
+
+    def test_plain_img_without_a_build(self, client):
+        """Test that unknown images fall back to a plain static img"""
+        body = client.get('/missing').data.decode()
+
+        assert body == '<img src="/static/images/missing.png" alt="Missing" loading="lazy" />'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,70 @@
+"""
+Unit tests for the mail utilities
+"""
+
+import pytest
+from utils.mail import send_batch_email_brevo
+
+
+def recipients(count):
+    """Build a list of recipients with personalised params"""
+    return [{'email': f"user{index}@example.com", 'name': f"User {index}", 'params': {'index': index}}
+            for index in range(count)]
+
+
+class TestBatchEmail:
+    """Test cases for Brevo multi-version batch sending"""
+
+    def test_recipients_are_grouped_into_chunks(self, brevo_stub):
+        """Test that recipients sharing a template go out in chunked payloads"""
+        results = send_batch_email_brevo(recipients(5), "Subject", "<p>Hi {{ params.index }}</p>",
+                                         "key", "sender@example.com", "Sender", chunk_size=2)
+
+        assert len(brevo_stub.requests) == 3
+        versions = [request['json']['messageVersions'] for request in brevo_stub.requests]
+        assert [len(chunk) for chunk in versions] == [2, 2, 1]
+        assert versions[0][1] == {'to': [{'email': 'user1@example.com', 'name': 'User 1'}], 'params': {'index': 1}}
+        assert brevo_stub.requests[0]['json']['htmlContent'] == "<p>Hi {{ params.index }}</p>"
+        assert [result['email'] for result in results] == [f"user{index}@example.com" for index in range(5)]
+        assert all(result['success'] for result in results)
+
+    def test_message_ids_are_reported_per_recipient(self, brevo_stub):
+        """Test that Brevo's message ids are matched to their recipients"""
+        brevo_stub.responses.append((201, {}, {'messageIds': ['<a@brevo>', '<b@brevo>']}))
+
+        results = send_batch_email_brevo(recipients(2), "Subject", "<p>Hi</p>", "key", "sender@example.com", "Sender")
+
+        assert [result['message_id'] for result in results] == ['<a@brevo>', '<b@brevo>']
+
+    def test_failed_chunk_marks_its_recipients(self, brevo_stub):
+        """Test that a rejected chunk fails only its own recipients"""
+        brevo_stub.responses.extend([(201, {}, {'messageIds': ['<a@brevo>', '<b@brevo>']}), (400, {}, {'message': 'bad'})])
+
+        results = send_batch_email_brevo(recipients(3), "Subject", "<p>Hi</p>", "key", "sender@example.com", "Sender",
+                                         chunk_size=2)
+
+        assert [result['success'] for result in results] == [True, True, False]
+        assert results[2]['status_code'] == 400
+        assert 'bad' in results[2]['error']
+
+
+
+class TestAnnouncement:
+    """Test cases for send_announcement.py"""
+
+    def test_names_are_escaped_for_brevo(self, mocker):
+        """Test that stored names cannot inject markup and a missing name becomes blank"""
+        import send_announcement
+        mocker.patch.object(send_announcement, 'get_db_connection')
+        mocker.patch.object(send_announcement, 'get_collection')
+        mocker.patch.object(send_announcement, 'iter_documents', return_value=[
+            {'email': 'ada@example.com', 'name': '<b>Ada</b>'}, {'email': 'bob@example.com', 'name': None}])
+        sent = []
+        mocker.patch.object(send_announcement, 'send_batch_email_brevo',
+                            side_effect=lambda batch, *args: sent.extend(batch) or [])
+
+        assert send_announcement.send_announcement('News', '<p>Hi {{ params.name }}</p>')
+        assert [recipient['params']['name'] for recipient in sent] == ['&lt;b&gt;Ada&lt;/b&gt;', '']
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,78 @@
+"""
+Unit tests for the background mail dispatcher
+"""
+
+import threading
+import pytest
+from utils.mail_queue import MailDispatcher
+from utils.mail import send_email_brevo
+
+
+class TestMailDispatcher:
+    """Test cases for the bounded mail queue"""
+
+    def test_queued_emails_reach_brevo(self, brevo_stub):
+        """Test that queued sends are delivered and drained on shutdown"""
+        dispatcher = MailDispatcher(max_queue_size=10, workers=2)
+
+        for index in range(5):
+            assert dispatcher.submit(send_email_brevo, f"user{index}@example.com", "Subject", "<p>Hi</p>",
+                                     "key", "sender@example.com", "Sender")
+
+        assert dispatcher.shutdown(timeout=5)
+        recipients = sorted(request['json']['to'][0]['email'] for request in brevo_stub.requests)
+        assert recipients == [f"user{index}@example.com" for index in range(5)]
+        stats = dispatcher.stats()
+        assert (stats['enqueued'], stats['sent'], stats['failed'], stats['queue_depth']) == (5, 5, 0, 0)
+
+    def test_submit_returns_before_send_completes(self):
+        """Test that a slow send does not block the caller"""
+        release = threading.Event()
+        dispatcher = MailDispatcher(max_queue_size=10, workers=1)
+
+        assert dispatcher.submit(release.wait, 5) is True
+        assert dispatcher.stats()['sent'] == 0
+
+        release.set()
+        assert dispatcher.shutdown(timeout=5)
+        assert dispatcher.stats()['sent'] == 1
+
+    def test_full_queue_runs_inline(self):
+        """Test backpressure: a full queue makes the caller do the work"""
+        release = threading.Event()
+        calls = []
+        dispatcher = MailDispatcher(max_queue_size=1, workers=1, enqueue_timeout=0.01)
+
+        started = threading.Event()
+        dispatcher.submit(lambda: started.set() or release.wait(5))  # occupies the worker
+        assert started.wait(5)
+        dispatcher.submit(release.wait, 5)  # fills the queue
+        assert dispatcher.submit(lambda: calls.append('inline') or True) is True
+
+        assert calls == ['inline']
+        assert dispatcher.stats()['inline'] == 1
+        release.set()
+        assert dispatcher.shutdown(timeout=5)
+
+    def test_failed_sends_are_counted(self, brevo_stub):
+        """Test that provider errors show up in the metrics"""
+        brevo_stub.responses.append((400, {}, {'message': 'invalid'}))
+        dispatcher = MailDispatcher(max_queue_size=10, workers=1)
+
+        dispatcher.submit(send_email_brevo, "user@example.com", "Subject", "<p>Hi</p>",
+                          "key", "sender@example.com", "Sender")
+
+        assert dispatcher.shutdown(timeout=5)
+        assert dispatcher.stats()['failed'] == 1
+
+    def test_closed_dispatcher_rejects(self):
+        """Test that nothing is accepted after shutdown"""
+        dispatcher = MailDispatcher(max_queue_size=10, workers=1)
+        dispatcher.shutdown(timeout=1)
+
+        assert dispatcher.submit(lambda: True) is False
+        assert dispatcher.stats()['rejected'] == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
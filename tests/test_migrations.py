@@ -0,0 +1,99 @@
+"""
+Unit tests for the migration and index runner
+"""
+
+import pytest
+from bson import ObjectId
+from unittest.mock import MagicMock, Mock
+from utils import migrations
+
+
+def make_db(applied_versions):
+    """Build a mock database whose migrations collection holds the given versions"""
+    collections = {}
+
+    def get_collection(name):
+        if name not in collections:
+            collections[name] = Mock()
+            collections[name].find.return_value = []
+            collections[name].aggregate.return_value = []
+        return collections[name]
+
+    db = MagicMock()
+    db.__getitem__.side_effect = get_collection
+    get_collection(migrations.MIGRATIONS_COLLECTION).find.return_value = [{'_id': v} for v in applied_versions]
+    return db, collections
+
+
+class TestMigrations:
+    """Test cases for the versioned migration runner"""
+
+    def test_apply_migrations_runs_pending_in_order(self, mocker):
+        """Test that every pending migration is applied and recorded"""
+        db, collections = make_db([])
+        mocker.patch.object(migrations, 'rebuild_course_summaries', return_value=0)
+
+        applied = migrations.apply_migrations(db)
+
+        assert applied == [version for version, _, _ in migrations.MIGRATIONS]
+        recorded = collections[migrations.MIGRATIONS_COLLECTION].update_one.call_args_list
+        assert [call.args[0] for call in recorded] == [{'_id': v} for v in applied]
+
+    def test_apply_migrations_skips_applied(self):
+        """Test that an up-to-date database is left alone"""
+        db, collections = make_db([version for version, _, _ in migrations.MIGRATIONS])
+
+        assert migrations.apply_migrations(db) == []
+        collections[migrations.MIGRATIONS_COLLECTION].update_one.assert_not_called()
+
+    def test_base_indexes(self):
+        """Test that the base migration declares the documented indexes"""
+        db, collections = make_db([])
+
+        migrations.apply_migrations(db, target=1)
+
+        user_indexes = [call.args[0] for call in collections['usertable'].create_index.call_args_list]
+        assert [('email', 1)] in user_indexes
+        enrollment_indexes = [call.args[0] for call in collections['course_enrollments'].create_index.call_args_list]
+        assert [('user_id', 1), ('course_id', 1)] in enrollment_indexes
+
+    def test_unique_enrollments(self):
+        """Test that duplicate enrollments collapse into the newest and the pair index becomes unique"""
+        db, collections = make_db([1, 2, 3])
+        oldest, middle, newest = ObjectId(), ObjectId(), ObjectId()
+        enrollments = collections.setdefault('course_enrollments', Mock())
+        enrollments.aggregate.return_value = [{'_id': {'user_id': 'u1', 'course_id': 'python'},
+                                               'ids': [newest, middle, oldest], 'count': 3}]
+
+        assert migrations.apply_migrations(db, target=4) == [4]
+
+        enrollments.delete_many.assert_called_once_with({'_id': {'$in': [middle, oldest]}})
+        kept = enrollments.update_one.call_args.args
+        assert kept[0]['_id'] == newest
+        assert kept[1]['$set']['created_at'] == oldest.generation_time
+        enrollments.drop_index.assert_called_once_with('user_id_1_course_id_1')
+        enrollments.create_index.assert_called_once_with([('user_id', 1), ('course_id', 1)], unique=True,
+                                                         name='user_id_1_course_id_1')
+
+    def test_course_summaries_failure_is_not_recorded(self, mocker):
+        """Test that a failed summary build stops the migration from being marked as applied"""
+        db, collections = make_db([1, 2, 3, 4])
+        mocker.patch.object(migrations, 'rebuild_course_summaries', return_value=None)
+
+        with pytest.raises(RuntimeError):
+            migrations.apply_migrations(db)
+        collections[migrations.MIGRATIONS_COLLECTION].update_one.assert_not_called()
+
+    def test_query_uses_index(self):
+        """Test explain() plan inspection"""
+        ixscan = {'queryPlanner': {'winningPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}}}}
+        collscan = {'queryPlanner': {'winningPlan': {'stage': 'COLLSCAN'}}}
+        sbe = {'queryPlanner': {'winningPlan': {'queryPlan': {'stage': 'FETCH', 'inputStage': {'stage': 'IXSCAN'}}}}}
+
+        assert migrations.query_uses_index(ixscan) is True
+        assert migrations.query_uses_index(collscan) is False
+        assert migrations.query_uses_index(sbe) is True
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
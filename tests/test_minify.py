@@ -0,0 +1,68 @@
+"""
+Unit tests for CSS and JS minification
+"""
+
+import pytest
+from utils.minify import minify_css, minify_js
+
+
+class TestMinifyCss:
+    """Test cases for minify_css()"""
+
+    def test_whitespace_and_comments_are_removed(self):
+        """Test that a rule collapses to its shortest equivalent"""
+        css = """
+        /* Card styling */
+        .card, .card-body {
+            margin: 0 auto;
+            color: #333;
+        }
+        """
+
+        assert minify_css(css) == '.card,.card-body{margin:0 auto;color:#333}'
+
+    def test_strings_are_kept_verbatim(self):
+        """Test that comment markers and spacing inside strings survive"""
+        css = '.quote::before { content: "/* not a comment */  ;" ; }'
+
+        assert minify_css(css) == '.quote::before{content:"/* not a comment */  ;"}'
+
+    def test_descendant_pseudo_class_keeps_its_space(self):
+        """Test that the space before a colon, a combinator in selectors, is kept"""
+        assert minify_css('.nav :hover { color: red; }') == '.nav :hover{color:red}'
+
+    def test_media_queries(self):
+        """Test that nested blocks are minified"""
+        css = '@media (max-width: 768px) {\n    .hero { padding: 1rem; }\n}\n'
+
+        assert minify_css(css) == '@media (max-width:768px){.hero{padding:1rem}}'
+
+
+class TestMinifyJs:
+    """Test cases for minify_js()"""
+
+    def test_indentation_blank_lines_and_comments_are_removed(self):
+        """Test that only whole-line comments and whitespace are dropped"""
+        js = """
+        // Toggle the form
+        const form = document.getElementById('form');
+
+        form.addEventListener('submit', function(e) {
+            e.preventDefault() // keep trailing comments, they may be inside strings
+        });
+        """
+
+        assert minify_js(js) == (
+            "const form = document.getElementById('form');\n"
+            "form.addEventListener('submit', function(e) {\n"
+            "e.preventDefault() // keep trailing comments, they may be inside strings\n"
+            "});\n"
+        )
+
+    def test_line_breaks_are_kept_for_semicolon_insertion(self):
+        """Test that statements without semicolons stay on separate lines"""
+        assert minify_js('let a = 1\nlet b = a\n') == 'let a = 1\nlet b = a\n'
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,58 @@
+"""
+Unit tests for the document models
+"""
+
+import pytest
+from bson.objectid import ObjectId
+from utils.models import User, Enrollment
+
+
+class TestModels:
+    """Test cases for the slotted User and Enrollment models"""
+
+    def test_user_from_projected_document(self):
+        """Test that missing fields default to None"""
+        user_id = ObjectId()
+        user = User.from_document({'_id': user_id, 'name': 'John Doe', 'status': 'verified'})
+
+        assert user.id == user_id
+        assert user.name == 'John Doe'
+        assert user.email is None
+        assert user.is_verified
+        assert not user.has_pending_code
+        assert user.member_since == user_id.generation_time.strftime('%B %d, %Y')
+
+    def test_user_from_missing_document(self):
+        """Test that no document yields no user"""
+        assert User.from_document(None) is None
+
+    def test_user_has_no_instance_dict(self):
+        """Test that the model is slotted and rejects unknown fields"""
+        user = User(name='John Doe')
+
+        assert not hasattr(user, '__dict__')
+        with pytest.raises(AttributeError):
+            user.password = 'secret'
+
+    def test_user_pending_code(self):
+        """Test detection of an outstanding OTP code"""
+        assert User(status='verified', code=123456).has_pending_code
+        assert User(status='verified', code=0).has_pending_code is False
+
+    def test_enrollment_from_document(self):
+        """Test that enrollments keep their schedule"""
+        enrollment = Enrollment.from_document({
+            'user_id': 'user123',
+            'course_id': 'python',
+            'course_name': 'Python Programming',
+            'schedule': {'preferred_time': '2:00 PM'},
+            'status': 'active'
+        })
+
+        assert enrollment.course_id == 'python'
+        assert enrollment.schedule == {'preferred_time': '2:00 PM'}
+        assert Enrollment().schedule == {}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
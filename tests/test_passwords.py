@@ -0,0 +1,121 @@
+"""
+Unit tests for the password hashing service
+"""
+
+import os
+import pytest
+from flask import Flask
+from werkzeug.security import generate_password_hash
+import utils.passwords as passwords
+from utils.passwords import hash_method, hash_password, needs_rehash, verify_password
+
+# Cheap parameters, so the tests do not spend their time in the KDF
+FAST_METHOD = 'pbkdf2:sha256:1000'
+
+
+@pytest.fixture(autouse=True)
+def fast_hashing(monkeypatch):
+    monkeypatch.setattr(passwords, 'PASSWORD_HASH_METHOD', FAST_METHOD)
+    monkeypatch.setattr(passwords, 'PASSWORD_HASH_WORKERS', 0)
+    monkeypatch.setattr(passwords, '_pool_unavailable', False)
+    yield
+    passwords.shutdown_pool()
+
+
+class TestHashMethod:
+    """Test cases for hash_method()"""
+
+    def test_methods(self):
+        """Test that algorithm and iterations map to Werkzeug method strings"""
+        assert hash_method('pbkdf2:sha256', 0) == 'pbkdf2:sha256:600000'
+        assert hash_method('pbkdf2:sha512', 300000) == 'pbkdf2:sha512:300000'
+        assert hash_method('pbkdf2', 0) == 'pbkdf2:sha256:600000'
+        assert hash_method('scrypt', 16384) == 'scrypt:16384:8:1'
+
+    def test_unknown_algorithm(self):
+        """Test that a typo in the configuration is reported"""
+        with pytest.raises(ValueError):
+            hash_method('bcrypt', 0)
+
+
+class TestHashing:
+    """Test cases for hash_password(), verify_password() and needs_rehash()"""
+
+    def test_round_trip(self):
+        """Test that a hash verifies its own password only"""
+        password_hash = hash_password('s3cret!')
+
+        assert password_hash.startswith(FAST_METHOD + '$')
+        assert verify_password(password_hash, 's3cret!')
+        assert not verify_password(password_hash, 'wrong')
+
+    def test_outdated_hashes_need_rehash(self):
+        """Test that hashes with other parameters are flagged and current ones are not"""
+        assert not needs_rehash(hash_password('s3cret!'))
+        assert needs_rehash(generate_password_hash('s3cret!', 'pbkdf2:sha256:500'))
+        assert needs_rehash(generate_password_hash('s3cret!', 'scrypt:1024:8:1'))
+
+    def test_pool_runs_in_worker_processes(self, monkeypatch):
+        """Test that the KDF runs outside the calling process when workers are configured"""
+        monkeypatch.setattr(passwords, 'PASSWORD_HASH_WORKERS', 1)
+
+        assert passwords._run(os.getpid) != os.getpid()
+        assert verify_password(hash_password('s3cret!'), 's3cret!')
+
+    def test_inline_when_the_pool_cannot_start(self, monkeypatch, mocker):
+        """Test that platforms without multiprocessing support hash on the calling thread"""
+        monkeypatch.setattr(passwords, 'PASSWORD_HASH_WORKERS', 2)
+        mocker.patch('utils.passwords.ProcessPoolExecutor', side_effect=OSError('no /dev/shm'))
+
+        assert passwords._run(os.getpid) == os.getpid()
+        assert passwords.get_pool() is None
+
+
+class TestRehashOnLogin:
+    """Test cases for the transparent rehash in login_user()"""
+
+    @pytest.fixture
+    def login(self, mocker):
+        from utils import user_controller
+        mocker.patch.object(user_controller, 'get_db_connection', return_value=mocker.MagicMock())
+        mocker.patch.object(user_controller, 'get_collection', return_value=mocker.MagicMock())
+        update = mocker.patch.object(user_controller, 'update_document', return_value=True)
+        mocker.patch.object(user_controller, 'invalidate_user')
+
+        def login(stored_hash, password='s3cret!'):
+            user = {'_id': 'user123', 'email': 'ada@example.com', 'name': 'Ada', 'status': 'verified',
+                    'password': stored_hash}
+            mocker.patch.object(user_controller, 'find_one', return_value=user)
+            app = Flask(__name__)
+            app.secret_key = 'test'
+            with app.test_request_context():
+                return user_controller.login_user('ada@example.com', password)
+
+        login.update = update
+        return login
+
+    def test_outdated_hash_is_upgraded(self, login):
+        """Test that a successful login rewrites a hash made with old parameters"""
+        old_hash = generate_password_hash('s3cret!', 'pbkdf2:sha256:500')
+
+        assert login(old_hash) == (True, [])
+
+        query, update = login.update.call_args[0][1:]
+        assert query == {'email': 'ada@example.com', 'password': old_hash}
+        assert update['$set']['password'].startswith(FAST_METHOD + '$')
+
+    def test_current_hash_is_left_alone(self, login):
+        """Test that no write happens when the hash is up to date"""
+        assert login(generate_password_hash('s3cret!', FAST_METHOD)) == (True, [])
+        login.update.assert_not_called()
+
+    def test_wrong_password_is_not_rehashed(self, login):
+        """Test that only a verified password is used to rehash"""
+        success, errors = login(generate_password_hash('s3cret!', 'pbkdf2:sha256:500'), 'wrong')
+
+        assert not success
+        login.update.assert_not_called()
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
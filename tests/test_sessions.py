@@ -0,0 +1,216 @@
+"""
+Unit tests for the server-side session store
+"""
+
+import pytest
+from unittest.mock import patch
+from flask import Flask, session
+from flask.sessions import SecureCookieSessionInterface
+from utils import user_controller
+from utils.sessions import (
+    MemorySessionStore, MongoSessionStore, ServerSideSessionInterface, init_sessions
+)
+
+
+class CountingStore(MemorySessionStore):
+    """Memory store that counts round trips"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loads = 0
+        self.saves = 0
+
+    def load(self, sid):
+        self.loads += 1
+        return super().load(sid)
+
+    def save(self, sid, data):
+        self.saves += 1
+        return super().save(sid, data)
+
+
+@pytest.fixture
+def store():
+    return CountingStore()
+
+
+@pytest.fixture
+def client(store):
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    app.session_interface = ServerSideSessionInterface(store)
+
+    @app.route('/login')
+    def login():
+        session['email'] = 'user@example.com'
+        session['info'] = 'x' * 2000
+        return 'ok'
+
+    @app.route('/whoami')
+    def whoami():
+        return session.get('email', 'anonymous')
+
+    @app.route('/static-page')
+    def static_page():
+        return 'static'
+
+    @app.route('/sign-in')
+    def sign_in():
+        success, _ = user_controller.login_user('user@example.com', 's3cret!')
+        return 'ok' if success else 'failed'
+
+    @app.route('/logout')
+    def logout():
+        session.clear()
+        return 'bye'
+
+    return app.test_client()
+
+
+def session_cookie(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+class TestServerSideSessions:
+    """Test cases for the session interface"""
+
+    def test_cookie_holds_only_an_opaque_id(self, client, store):
+        """Test that session values stay on the server"""
+        client.get('/login')
+
+        sid = session_cookie(client)
+        assert len(sid) == 43
+        assert 'user@example.com' not in sid
+        assert store.load(sid)['email'] == 'user@example.com'
+
+    def test_unmodified_session_is_not_written_back(self, client, store):
+        """Test that reading the session does not save it again"""
+        client.get('/login')
+        saves = store.saves
+
+        assert client.get('/whoami').data == b'user@example.com'
+        assert store.saves == saves
+
+    def test_session_is_loaded_lazily(self, client, store):
+        """Test that a request which never touches the session skips the store"""
+        client.get('/login')
+        loads = store.loads
+
+        response = client.get('/static-page')
+
+        assert store.loads == loads
+        assert 'Cookie' not in response.headers.get('Vary', '')
+
+    def test_clear_rotates_the_session_id(self, client, store):
+        """Test that logout forgets the old session and its cookie"""
+        client.get('/login')
+        sid = session_cookie(client)
+
+        client.get('/logout')
+
+        assert store.load(sid) is None
+        assert session_cookie(client) is None
+        assert client.get('/whoami').data == b'anonymous'
+
+    def test_login_rotates_the_session_id(self, client, store, mocker):
+        """Test that signing in moves the session to a new id, so a planted id is never authenticated"""
+        mocker.patch.object(user_controller, 'get_db_connection', return_value=mocker.MagicMock())
+        mocker.patch.object(user_controller, 'find_one', return_value={
+            '_id': 'user123', 'name': 'Ada', 'status': 'verified', 'password': 'hash'})
+        mocker.patch.object(user_controller, 'verify_password', return_value=True)
+        mocker.patch.object(user_controller, 'needs_rehash', return_value=False)
+        client.get('/login')
+        planted = session_cookie(client)
+
+        assert client.get('/sign-in').data == b'ok'
+
+        sid = session_cookie(client)
+        assert sid != planted
+        assert store.load(planted) is None
+        assert store.load(sid)['user_id'] == 'user123'
+        assert store.load(sid)['info'] == 'x' * 2000
+
+    def test_unknown_session_id_starts_empty(self, client, store):
+        """Test that forged or expired ids are not revived"""
+        client.set_cookie('session', 'A' * 43)
+        assert client.get('/whoami').data == b'anonymous'
+
+        client.get('/login')
+        assert session_cookie(client) != 'A' * 43
+
+    def test_malformed_cookie_skips_the_store(self, client, store):
+        """Test that cookies that cannot be session ids are ignored"""
+        client.set_cookie('session', 'not-a-session-id')
+
+        assert client.get('/whoami').data == b'anonymous'
+        assert store.loads == 0
+
+
+class TestMemorySessionStore:
+    """Test cases for the in-process store"""
+
+    def test_sessions_expire(self):
+        """Test that sessions older than the lifetime are gone"""
+        store = MemorySessionStore(lifetime=60)
+        with patch('utils.sessions.time.monotonic', return_value=100.0):
+            store.save('sid', {'email': 'user@example.com'})
+        with patch('utils.sessions.time.monotonic', return_value=161.0):
+            assert store.load('sid') is None
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the store stays within max_entries"""
+        store = MemorySessionStore(max_entries=2)
+        store.save('a', {'n': 1})
+        store.save('b', {'n': 2})
+        store.load('a')
+        store.save('c', {'n': 3})
+
+        assert store.load('b') is None
+        assert store.load('a') == {'n': 1}
+        assert len(store) == 2
+
+
+class TestMongoSessionStore:
+    """Test cases for the MongoDB store"""
+
+    def test_load_ignores_expired_sessions(self, mocker):
+        """Test that expiry is enforced before the TTL monitor runs"""
+        mocker.patch('utils.sessions.get_db_connection')
+        find_one = mocker.patch('utils.sessions.find_one', return_value={'_id': 'sid', 'data': {'email': 'a@b.c'}})
+
+        assert MongoSessionStore().load('sid') == {'email': 'a@b.c'}
+        query = find_one.call_args[0][1]
+        assert query['_id'] == 'sid'
+        assert '$gt' in query['expires_at']
+
+    def test_save_upserts_data_and_expiry(self, mocker):
+        """Test that a save is a single upsert keyed by session id"""
+        mocker.patch('utils.sessions.get_db_connection')
+        upsert = mocker.patch('utils.sessions.upsert_document', return_value=True)
+
+        assert MongoSessionStore().save('sid', {'email': 'a@b.c'})
+        query, update = upsert.call_args[0][1:]
+        assert query == {'_id': 'sid'}
+        assert update['$set']['data'] == {'email': 'a@b.c'}
+        assert 'expires_at' in update['$set']
+
+
+class TestInitSessions:
+    """Test cases for backend selection"""
+
+    def test_cookie_backend_keeps_flask_sessions(self):
+        """Test that the default backend leaves Flask's cookie sessions in place"""
+        app = Flask(__name__)
+        init_sessions(app, 'cookie')
+        assert isinstance(app.session_interface, SecureCookieSessionInterface)
+
+    def test_memory_backend(self):
+        """Test that the memory backend installs the server-side interface"""
+        app = Flask(__name__)
+        init_sessions(app, 'memory')
+        assert isinstance(app.session_interface.store, MemorySessionStore)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,125 @@
+"""
+Unit tests for the cached application settings
+"""
+
+import os
+import pytest
+import utils.settings as settings
+from utils.settings import get_settings, load_environment
+
+
+@pytest.fixture
+def fresh_settings(monkeypatch):
+    """Forget the loaded .env and cached settings for the duration of a test"""
+    monkeypatch.setattr(settings, '_environment_loaded', None)
+    get_settings.cache_clear()
+    yield
+    get_settings.cache_clear()
+
+
+class TestLoadEnvironment:
+    """Test cases for load_environment()"""
+
+    def test_file_is_loaded_once(self, fresh_settings, tmp_path, monkeypatch):
+        """Test that the .env file is read on the first call only"""
+        env_file = tmp_path / '.env'
+        env_file.write_text('SETTINGS_TEST_VALUE=first\n')
+        monkeypatch.delenv('SETTINGS_TEST_VALUE', raising=False)
+        monkeypatch.delenv('SETTINGS_TEST_OTHER', raising=False)
+
+        assert load_environment(str(env_file)) is True
+        env_file.write_text('SETTINGS_TEST_VALUE=second\nSETTINGS_TEST_OTHER=1\n')
+        assert load_environment(str(env_file)) is True
+
+        assert os.environ['SETTINGS_TEST_VALUE'] == 'first'
+        assert 'SETTINGS_TEST_OTHER' not in os.environ
+
+    def test_environment_wins_over_file(self, fresh_settings, tmp_path, monkeypatch):
+        """Test that variables set by the platform are not overridden"""
+        env_file = tmp_path / '.env'
+        env_file.write_text('SETTINGS_TEST_VALUE=from-file\n')
+        monkeypatch.setenv('SETTINGS_TEST_VALUE', 'from-platform')
+
+        load_environment(str(env_file))
+
+        assert os.environ['SETTINGS_TEST_VALUE'] == 'from-platform'
+
+    def test_missing_file(self, fresh_settings, tmp_path):
+        """Test that a missing .env is reported and not retried"""
+        assert load_environment(str(tmp_path / '.env')) is False
+        assert load_environment(str(tmp_path / '.env')) is False
+
+
+class TestGetSettings:
+    """Test cases for get_settings()"""
+
+    def test_values_are_typed(self, fresh_settings, monkeypatch):
+        """Test that numbers and flags are converted from their string form"""
+        monkeypatch.setattr(settings, '_environment_loaded', False)
+        monkeypatch.setenv('PORT', '8080')
+        monkeypatch.setenv('RUN_MIGRATIONS_ON_STARTUP', 'True')
+        monkeypatch.setenv('OTP_MAX_ATTEMPTS', '3')
+        monkeypatch.delenv('SENDER_NAME', raising=False)
+
+        current = get_settings()
+
+        assert current.port == 8080
+        assert current.run_migrations_on_startup is True
+        assert current.otp_max_attempts == 3
+        assert current.sender_name == 'AI Agent System'
+
+    def test_settings_are_cached(self, fresh_settings, monkeypatch):
+        """Test that the environment is read once per process"""
+        monkeypatch.setattr(settings, '_environment_loaded', False)
+        first = get_settings()
+        monkeypatch.setenv('PORT', '9999')
+
+        assert get_settings() is first
+
+    def test_module_settings_are_parsed(self, fresh_settings, monkeypatch):
+        """Test that lists, decimals and paths get their types and defaults"""
+        monkeypatch.setattr(settings, '_environment_loaded', False)
+        monkeypatch.setenv('BULK_ENROLLMENT_ADMINS', ' Admin@Example.com, ,ops@example.com')
+        monkeypatch.setenv('IMAGE_WIDTHS', '700,220')
+        monkeypatch.setenv('BREVO_READ_TIMEOUT', '2.5')
+        monkeypatch.delenv('TEMPLATE_CACHE_DIR', raising=False)
+
+        current = get_settings()
+
+        assert current.bulk_enrollment_admins == frozenset({'admin@example.com', 'ops@example.com'})
+        assert current.image_widths == (220, 700)
+        assert current.brevo_read_timeout == 2.5
+        assert current.template_cache_dir == os.path.join(settings.PROJECT_DIR, '.jinja_cache')
+
+    def test_mail_is_sent_inline_on_vercel(self, fresh_settings, monkeypatch):
+        """Test that mail is sent inline on Vercel unless MAIL_ASYNC is set"""
+        monkeypatch.setattr(settings, '_environment_loaded', False)
+        monkeypatch.delenv('MAIL_ASYNC', raising=False)
+        monkeypatch.setenv('VERCEL', '1')
+        assert get_settings().mail_async is False
+
+        get_settings.cache_clear()
+        monkeypatch.setenv('MAIL_ASYNC', 'true')
+        assert get_settings().mail_async is True
+
+    def test_password_hash_workers_default(self, fresh_settings, monkeypatch):
+        """Test that a small fixed pool is the default, and inline hashing on Vercel"""
+        monkeypatch.setattr(settings, '_environment_loaded', False)
+        monkeypatch.delenv('PASSWORD_HASH_WORKERS', raising=False)
+        monkeypatch.delenv('VERCEL', raising=False)
+        assert get_settings().password_hash_workers == 2
+
+        get_settings.cache_clear()
+        monkeypatch.setenv('VERCEL', '1')
+        assert get_settings().password_hash_workers == 0
+
+    def test_mail_is_queued_elsewhere(self, fresh_settings, monkeypatch):
+        """Test that long-running servers queue mail by default"""
+        monkeypatch.setattr(settings, '_environment_loaded', False)
+        monkeypatch.delenv('MAIL_ASYNC', raising=False)
+        monkeypatch.delenv('VERCEL', raising=False)
+        assert get_settings().mail_async is True
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,87 @@
+"""
+Unit tests for the pooled SMTP transport
+"""
+
+import pytest
+from utils.mail import Mailer
+from utils.smtp_pool import SMTPConnectionPool, close_smtp_pools
+
+MESSAGE = "Subject: Hello\r\n\r\nHi there"
+
+
+@pytest.fixture(autouse=True)
+def fresh_pools():
+    """Keep the shared pools from leaking between tests"""
+    close_smtp_pools()
+    yield
+    close_smtp_pools()
+
+
+class TestSMTPConnectionPool:
+    """Test cases for the SMTP connection pool"""
+
+    def test_many_messages_share_one_session(self, smtp_stub):
+        """Test that one authenticated session sends many messages"""
+        pool = SMTPConnectionPool(smtp_stub.host, smtp_stub.port, 'user', 'secret')
+
+        for index in range(5):
+            pool.sendmail('sender@example.com', [f"user{index}@example.com"], MESSAGE)
+
+        assert len(smtp_stub.messages) == 5
+        assert smtp_stub.connections == 1
+        assert smtp_stub.logins == ['user']
+        pool.close()
+
+    def test_reconnects_after_server_disconnect(self, smtp_stub):
+        """Test that a dropped session is replaced transparently"""
+        smtp_stub.drop_after = 1
+        pool = SMTPConnectionPool(smtp_stub.host, smtp_stub.port)
+
+        for index in range(3):
+            pool.sendmail('sender@example.com', [f"user{index}@example.com"], MESSAGE)
+
+        assert [message['to'] for message in smtp_stub.messages] == [[f"user{index}@example.com"] for index in range(3)]
+        assert pool.connections_opened == 3
+        pool.close()
+
+    def test_large_recipient_lists_are_chunked(self, smtp_stub):
+        """Test that recipients are split under the per-transaction limit"""
+        smtp_stub.max_recipients = 2
+        pool = SMTPConnectionPool(smtp_stub.host, smtp_stub.port, max_recipients=2)
+        recipients = [f"user{index}@example.com" for index in range(5)]
+
+        refused = pool.sendmail('sender@example.com', recipients, MESSAGE)
+
+        assert refused == {}
+        assert [len(message['to']) for message in smtp_stub.messages] == [2, 2, 1]
+        assert sum((message['to'] for message in smtp_stub.messages), []) == recipients
+        assert smtp_stub.connections == 1
+        pool.close()
+
+    def test_worn_out_sessions_are_recycled(self, smtp_stub):
+        """Test that a session is closed after its message budget"""
+        pool = SMTPConnectionPool(smtp_stub.host, smtp_stub.port, max_messages_per_connection=2)
+
+        for index in range(4):
+            pool.sendmail('sender@example.com', ["user@example.com"], MESSAGE)
+
+        assert pool.connections_opened == 2
+        pool.close()
+
+    def test_mailer_sends_through_shared_pool(self, smtp_stub):
+        """Test that separate Mailer sends reuse the same pooled session"""
+        for index in range(3):
+            mailer = Mailer()
+            mailer.set_smtp_options(smtp_stub.host, smtp_stub.port, 'user', 'secret')
+            mailer.set_from('sender@example.com', 'Sender')
+            mailer.add_address(f"user{index}@example.com")
+            mailer.set_subject('Hello')
+            mailer.set_body('<p>Hi</p>', is_html=True)
+            assert mailer.send() is True
+
+        assert len(smtp_stub.messages) == 3
+        assert smtp_stub.connections == 1
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,31 @@
+"""
+Cold start tests: the import time of app.py and the modules it must not load eagerly
+"""
+
+import pytest
+from utils.startup import COLD_IMPORT_BUDGET_MS, cold_import_ms, profile_imports
+
+# Modules only needed to send mail or build assets, which a cold start must not pay for
+LAZY_MODULES = ['requests', 'smtplib', 'email.mime.multipart', 'PIL', 'utils.mail', 'utils.brevo', 'utils.smtp_pool']
+
+
+@pytest.fixture(scope='module')
+def timings():
+    return profile_imports('app')
+
+
+class TestColdImport:
+    """Test cases for a cold `import app`"""
+
+    def test_within_budget(self, timings):
+        """Test that importing the app stays under COLD_IMPORT_BUDGET_MS"""
+        assert cold_import_ms(timings) <= COLD_IMPORT_BUDGET_MS
+
+    @pytest.mark.parametrize('module', LAZY_MODULES)
+    def test_rarely_used_modules_are_lazy(self, timings, module):
+        """Test that mail, SMTP and image modules are imported on first use only"""
+        assert module not in {timing.module for timing in timings}
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
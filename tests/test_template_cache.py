@@ -0,0 +1,116 @@
+"""
+Unit tests for the Jinja bytecode cache and template precompilation
+"""
+
+import asyncio
+import pytest
+from flask import Flask, render_template
+from utils.template_cache import TemplateBytecodeCache, init_template_cache, precompile_templates
+
+
+def make_app(template_dir, cache_dir):
+    app = Flask(__name__, template_folder=str(template_dir))
+    init_template_cache(app, str(cache_dir))
+
+    @app.route('/<name>')
+    def page(name):
+        return render_template(f"{name}.html", user='Ada')
+
+    return app
+
+
+@pytest.fixture
+def template_dir(tmp_path):
+    templates = tmp_path / 'templates'
+    (templates / 'email').mkdir(parents=True)
+    (templates / 'home.html').write_text('<h1>Hello {{ user }}</h1>{% for i in range(3) %}{{ i }}{% endfor %}')
+    (templates / 'profile.html').write_text('<p>{{ user|upper }}</p>')
+    (templates / 'email' / 'otp.html').write_text('<p>{{ otp_code }}</p>')
+    return templates
+
+
+class TestTemplateCache:
+    """Test cases for the bytecode cache"""
+
+    def test_precompile_writes_every_page_template(self, template_dir, tmp_path):
+        """Test that each page template gets bytecode and email templates are skipped"""
+        app = make_app(template_dir, tmp_path / 'cache')
+
+        names = precompile_templates(app)
+
+        assert names == ['home.html', 'profile.html']
+        assert len(list((tmp_path / 'cache').glob('*.jinja'))) == 2
+
+    def test_new_instance_skips_compilation(self, template_dir, tmp_path, mocker):
+        """Test that a fresh app loads precompiled bytecode instead of compiling"""
+        precompile_templates(make_app(template_dir, tmp_path / 'cache'))
+        app = make_app(template_dir, tmp_path / 'cache')
+        compile_ = mocker.spy(app.jinja_env, 'compile')
+
+        response = app.test_client().get('/home')
+
+        assert response.data == b'<h1>Hello Ada</h1>012'
+        compile_.assert_not_called()
+
+    def test_cache_is_portable_between_paths(self, template_dir, tmp_path, mocker):
+        """Test that bytecode built in one directory is used from another, as after a deploy"""
+        precompile_templates(make_app(template_dir, tmp_path / 'cache'))
+        deployed = tmp_path / 'deployed' / 'templates'
+        deployed.mkdir(parents=True)
+        (deployed / 'profile.html').write_text((template_dir / 'profile.html').read_text())
+        app = make_app(deployed, tmp_path / 'cache')
+        compile_ = mocker.spy(app.jinja_env, 'compile')
+
+        assert app.test_client().get('/profile').data == b'<p>ADA</p>'
+        compile_.assert_not_called()
+
+    def test_edited_template_is_recompiled(self, template_dir, tmp_path):
+        """Test that stale bytecode is ignored when the source changes"""
+        precompile_templates(make_app(template_dir, tmp_path / 'cache'))
+        (template_dir / 'profile.html').write_text('<p>{{ user|lower }}</p>')
+
+        app = make_app(template_dir, tmp_path / 'cache')
+
+        assert app.test_client().get('/profile').data == b'<p>ada</p>'
+
+    def test_read_only_cache_still_renders(self, template_dir, tmp_path, capsys):
+        """Test that a failed bytecode write is reported instead of failing the request"""
+        app = Flask(__name__, template_folder=str(template_dir))
+        app.jinja_env.bytecode_cache = TemplateBytecodeCache(str(tmp_path / 'missing'), '%s.jinja')
+
+        with app.app_context():
+            assert render_template('profile.html', user='Ada') == '<p>ADA</p>'
+        assert 'Template bytecode not cached' in capsys.readouterr().out
+
+    def test_sync_and_async_apps_share_a_directory(self, template_dir, tmp_path):
+        """Test that Flask and the async app each load bytecode compiled for their own Jinja mode"""
+        quart = pytest.importorskip('quart')
+
+        def render_async():
+            app = quart.Quart(__name__, template_folder=str(template_dir))
+            init_template_cache(app, str(tmp_path / 'cache'))
+
+            async def render():
+                async with app.app_context():
+                    return await quart.render_template('home.html', user='Ada')
+            return asyncio.run(render())
+
+        def render_sync():
+            return make_app(template_dir, tmp_path / 'cache').test_client().get('/home').data.decode()
+
+        assert render_async() == '<h1>Hello Ada</h1>012'
+        assert render_sync() == '<h1>Hello Ada</h1>012'
+        precompile_templates(make_app(template_dir, tmp_path / 'cache'))
+        assert render_async() == '<h1>Hello Ada</h1>012'
+        assert len(list((tmp_path / 'cache').glob('*.jinja'))) == 3
+
+    def test_disabled(self, template_dir, tmp_path, mocker):
+        """Test that TEMPLATE_CACHE_ENABLED=false leaves the environment alone"""
+        mocker.patch('utils.template_cache.TEMPLATE_CACHE_ENABLED', False)
+        app = make_app(template_dir, tmp_path / 'cache')
+
+        assert app.jinja_env.bytecode_cache is None
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,153 @@
+"""
+Unit tests for the in-process user cache
+"""
+
+import pytest
+from unittest.mock import patch
+from bson.objectid import ObjectId
+from utils.models import User
+from utils.user_cache import UserCache, get_user_by_email, get_user_by_id, invalidate_user, user_cache
+
+
+def make_user(email='user@example.com', status='verified'):
+    return User(ObjectId(), 'Test User', email, status, 0)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    """Keep the shared cache from leaking between tests"""
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+class TestUserCache:
+    """Test cases for the TTL and LRU cache"""
+
+    def test_lookup_by_id_and_email(self):
+        """Test that a cached user is found by either key"""
+        cache = UserCache(ttl=60, max_entries=10)
+        user = make_user()
+        cache.put(user)
+
+        assert cache.get_by_id(str(user.id)) is user
+        assert cache.get_by_email(user.email) is user
+        assert cache.stats()['hits'] == 2
+
+    def test_entries_expire(self):
+        """Test that entries older than the TTL are treated as misses"""
+        cache = UserCache(ttl=60, max_entries=10)
+        user = make_user()
+        with patch('utils.user_cache.time.monotonic', return_value=100.0):
+            cache.put(user)
+        with patch('utils.user_cache.time.monotonic', return_value=161.0):
+            assert cache.get_by_id(str(user.id)) is None
+            assert cache.get_by_email(user.email) is None
+
+        assert cache.stats()['size'] == 0
+        assert cache.stats()['misses'] == 2
+
+    def test_least_recently_used_is_evicted(self):
+        """Test that the cache stays within max_entries"""
+        cache = UserCache(ttl=60, max_entries=2)
+        first, second, third = make_user('a@example.com'), make_user('b@example.com'), make_user('c@example.com')
+        cache.put(first)
+        cache.put(second)
+        cache.get_by_id(str(first.id))
+        cache.put(third)
+
+        assert cache.get_by_id(str(second.id)) is None
+        assert cache.get_by_email('b@example.com') is None
+        assert cache.get_by_id(str(first.id)) is first
+        assert cache.stats()['evictions'] == 1
+
+    def test_evicted_entries_leave_no_alias(self):
+        """Test that eviction drops the email alias together with the entry"""
+        cache = UserCache(ttl=60, max_entries=2)
+        users = [make_user(f'user{index}@example.com') for index in range(5)]
+        for user in users:
+            cache.put(user)
+
+        assert cache.stats()['size'] == cache.stats()['aliases'] == 2
+        assert cache.get_by_email('user0@example.com') is None
+        assert cache.get_by_email('user4@example.com') is users[4]
+
+    def test_evicting_a_stale_entry_keeps_the_new_owner_alias(self):
+        """Test that an email moved to another id stays reachable when the old entry is evicted"""
+        cache = UserCache(ttl=60, max_entries=2)
+        old, new = make_user('a@example.com'), make_user('a@example.com')
+        cache.put(old)
+        cache.put(new)
+        cache.put(make_user('b@example.com'))
+
+        assert cache.get_by_id(str(old.id)) is None
+        assert cache.get_by_email('a@example.com') is new
+        assert cache.stats()['aliases'] == 2
+
+    def test_changed_email_replaces_the_alias(self):
+        """Test that re-caching a user under a new email forgets the old one"""
+        cache = UserCache(ttl=60, max_entries=10)
+        user = make_user('old@example.com')
+        cache.put(user)
+        cache.put(User(user.id, user.name, 'new@example.com', user.status, user.code))
+
+        assert cache.get_by_email('old@example.com') is None
+        assert cache.get_by_email('new@example.com').id == user.id
+        assert cache.stats()['aliases'] == 1
+
+    def test_invalidate_by_email_or_id(self):
+        """Test that invalidation drops both keys of an entry"""
+        cache = UserCache(ttl=60, max_entries=10)
+        first, second = make_user('a@example.com'), make_user('b@example.com')
+        cache.put(first)
+        cache.put(second)
+
+        cache.invalidate(email='a@example.com')
+        cache.invalidate(user_id=second.id)
+
+        assert cache.get_by_id(str(first.id)) is None
+        assert cache.get_by_email('b@example.com') is None
+        assert cache.stats()['size'] == 0
+
+
+class TestCachedLookups:
+    """Test cases for the database-backed lookup functions"""
+
+    def test_second_lookup_skips_the_database(self, mocker):
+        """Test that a loaded user is served from memory afterwards"""
+        user_id = ObjectId()
+        mocker.patch('utils.user_cache.get_db_connection')
+        find_one = mocker.patch('utils.user_cache.find_one', return_value={
+            '_id': user_id, 'name': 'Test User', 'email': 'user@example.com', 'status': 'verified', 'code': 0
+        })
+
+        assert get_user_by_email('user@example.com').id == user_id
+        assert get_user_by_id(str(user_id)).email == 'user@example.com'
+        assert find_one.call_count == 1
+
+    def test_invalidated_user_is_reloaded(self, mocker):
+        """Test that a change made through the controllers is visible on the next lookup"""
+        user_id = ObjectId()
+        mocker.patch('utils.user_cache.get_db_connection')
+        find_one = mocker.patch('utils.user_cache.find_one', side_effect=[
+            {'_id': user_id, 'email': 'user@example.com', 'status': 'unverified', 'code': 123456},
+            {'_id': user_id, 'email': 'user@example.com', 'status': 'verified', 'code': 0},
+        ])
+
+        assert not get_user_by_email('user@example.com').is_verified
+        invalidate_user(email='user@example.com')
+        assert get_user_by_email('user@example.com').is_verified
+        assert find_one.call_count == 2
+
+    def test_missing_user_is_not_cached(self, mocker):
+        """Test that unknown users are looked up again"""
+        mocker.patch('utils.user_cache.get_db_connection')
+        find_one = mocker.patch('utils.user_cache.find_one', return_value=None)
+
+        assert get_user_by_email('nobody@example.com') is None
+        assert get_user_by_email('nobody@example.com') is None
+        assert find_one.call_count == 2
+
+
+if __name__ == '__main__':
+    pytest.main([__file__])
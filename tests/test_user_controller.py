@@ -4,7 +4,8 @@ Unit tests for the user controller module
 
 import pytest
 from unittest.mock import Mock, patch
-from utils.user_controller import signup_user, login_user, verify_otp
+from flask import Flask, session
+from utils.user_controller import signup_user, login_user, verify_otp, reset_password_otp
 
 
 class TestUserController:
@@ -128,5 +129,129 @@ class TestUserController:
         assert "Invalid verification code" in errors[0]
 
 
+class TestOtpVerification:
+    """Test cases for email-scoped OTP verification"""
+
+    @pytest.fixture
+    def request_session(self):
+        """Provide a request context whose session holds the user's email"""
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        with app.test_request_context():
+            session['email'] = 'john@example.com'
+            yield session
+
+    @pytest.fixture
+    def collection(self, mocker):
+        """Patch the controller's database access with a mock collection"""
+        mock_collection = Mock()
+        mocker.patch('utils.user_controller.get_db_connection', return_value=Mock())
+        mocker.patch('utils.user_controller.get_collection', return_value=mock_collection)
+        return mock_collection
+
+    def test_verify_otp_is_one_keyed_update(self, request_session, collection):
+        """Test that a valid code is consumed with a single find_one_and_update"""
+        collection.find_one_and_update.return_value = {'_id': 'user123', 'name': 'John Doe'}
+
+        success, errors = verify_otp("123456")
+
+        assert success is True
+        assert errors == []
+        query, update = collection.find_one_and_update.call_args.args
+        assert query['email'] == 'john@example.com'
+        assert query['code'] == 123456
+        assert '$gte' in query['code_issued_at']
+        assert query['code_attempts'] == {'$lt': 5}
+        assert update['$set'] == {'code': 0, 'status': 'verified'}
+        collection.find_one.assert_not_called()
+        collection.update_one.assert_not_called()
+        assert request_session['user_id'] == 'user123'
+
+    def test_verify_otp_wrong_code_counts_attempt(self, request_session, collection):
+        """Test that a wrong or expired code is rejected and counted"""
+        collection.find_one_and_update.return_value = None
+
+        success, errors = verify_otp("000000")
+
+        assert success is False
+        assert "Invalid verification code" in errors[0]
+        collection.update_one.assert_called_once_with(
+            {'email': 'john@example.com', 'code': {'$ne': 0}},
+            {'$inc': {'code_attempts': 1}}
+        )
+
+    def test_verify_otp_rejects_non_numeric_code(self, request_session, collection):
+        """Test that malformed input never reaches the database"""
+        success, errors = verify_otp("abc")
+
+        assert success is False
+        collection.find_one_and_update.assert_not_called()
+
+    def test_reset_password_otp_marks_code_verified(self, request_session, collection):
+        """Test that a valid reset code is marked verified in one round trip"""
+        collection.find_one_and_update.return_value = {'_id': 'user123', 'email': 'john@example.com'}
+
+        success, errors = reset_password_otp("654321")
+
+        assert success is True
+        query, update = collection.find_one_and_update.call_args.args
+        assert (query['email'], query['code']) == ('john@example.com', 654321)
+        assert 'code_verified_at' in update['$set']
+
+
+class TestOtpDelivery:
+    """Test cases for sending OTP emails before the user is told a code was sent"""
+
+    @pytest.fixture
+    def users(self, mocker):
+        from utils import user_controller
+        app = Flask(__name__)
+        app.secret_key = 'test'
+        mocker.patch.object(user_controller, 'get_db_connection', return_value=Mock())
+        mocker.patch.object(user_controller, 'get_collection', return_value=Mock())
+        mocker.patch.object(user_controller, 'hash_password', return_value='hash')
+        mocker.patch.object(user_controller, 'invalidate_user')
+        with app.test_request_context():
+            yield user_controller
+
+    def test_signup_reports_undelivered_code(self, users, mocker):
+        """Test that a failed send is reported and the undelivered code is retired"""
+        mocker.patch.object(users, 'find_one', return_value=None)
+        mocker.patch.object(users, 'insert_document', return_value='user123')
+        update = mocker.patch.object(users, 'update_document', return_value=True)
+        mocker.patch.object(users, 'send_email_brevo', return_value=False)
+
+        success, errors = users.signup_user("Ada", "ada@example.com", "password123", "password123")
+
+        assert not success
+        assert 'could not be sent' in errors[0]
+        assert update.call_args[0][2] == {'$set': {'code_attempts': users.OTP_MAX_ATTEMPTS}}
+        assert 'info' not in session
+
+    def test_signup_sends_before_returning(self, users, mocker):
+        """Test that the verification email is sent inline rather than queued"""
+        mocker.patch.object(users, 'find_one', return_value=None)
+        mocker.patch.object(users, 'insert_document', return_value='user123')
+        send = mocker.patch.object(users, 'send_email_brevo', return_value=True)
+
+        assert users.signup_user("Ada", "ada@example.com", "password123", "password123") == (True, [])
+        assert send.call_args[0][0] == 'ada@example.com'
+
+    def test_login_reports_undelivered_new_code(self, users, mocker):
+        """Test that an unverified login does not claim a new code was sent when the send failed"""
+        mocker.patch.object(users, 'find_one', return_value={
+            '_id': 'user123', 'name': 'Ada', 'status': 'notverified', 'password': 'hash', 'code': 0})
+        mocker.patch.object(users, 'verify_password', return_value=True)
+        mocker.patch.object(users, 'needs_rehash', return_value=False)
+        mocker.patch.object(users, 'update_document', return_value=True)
+        mocker.patch.object(users, 'send_email_brevo', return_value=False)
+
+        success, errors = users.login_user("ada@example.com", "password123")
+
+        assert not success
+        assert 'could not be sent' in errors[0]
+        assert 'user_id' not in session
+
+
 if __name__ == '__main__':
     pytest.main([__file__])
\ No newline at end of file
@@ -0,0 +1,270 @@
+"""
+Static asset pipeline for the AI Agent System
+Builds content-hashed, precompressed copies of static/ (and resized image variants) into
+static/dist and serves them with immutable caching and Accept-Encoding negotiation
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+from typing import Callable, Dict, List, Optional
+from flask import Flask, Response, abort, request, send_from_directory, url_for
+from markupsafe import Markup, escape
+from .images import IMAGE_EXTENSIONS, available_formats, build_image_variants, mime_type
+from .minify import MINIFIERS
+from .settings import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built without it
+    brotli = None
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static')
+DIST_DIR = os.path.join(STATIC_DIR, 'dist')
+MANIFEST_NAME = 'manifest.json'
+
+settings = get_settings()
+
+# Fingerprinted files never change, so browsers and CDNs may keep them for a year
+ASSET_MAX_AGE = settings.asset_max_age
+
+# Only text formats are worth precompressing; images are already compressed
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.json', '.txt', '.html', '.xml', '.map'}
+
+# A variant is kept only when it saves at least this fraction of the original size
+MIN_COMPRESSION_SAVING = 0.05
+
+# Encodings in order of preference, with the file suffix of each variant
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def fingerprint(path: str, content: bytes) -> str:
+    """
+    Insert a hash of the content before the extension: css/app.css -> css/app.1a2b3c4d5e.css
+    """
+    root, extension = os.path.splitext(path)
+    return f"{root}.{hashlib.sha256(content).hexdigest()[:10]}{extension}"
+
+def _compress(content: bytes, encoding: str) -> Optional[bytes]:
+    """Compress content with an encoding, or None when the encoder is unavailable"""
+    if encoding == 'gzip':
+        return gzip.compress(content, compresslevel=9, mtime=0)
+    if encoding == 'br' and brotli is not None:
+        return brotli.compress(content, quality=11)
+    return None
+
+def _write(path: str, content: bytes) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content)
+
+def _build_variants(logical: str, content: bytes, dist_dir: str) -> Dict:
+    """Copy an image's resized variants into the build under fingerprinted names"""
+    image = build_image_variants(content)
+    if image is None:
+        return {}
+
+    root = os.path.splitext(logical)[0]
+    variants = []
+    for variant in image['variants']:
+        with open(variant['file'], 'rb') as f:
+            variant_content = f.read()
+        hashed = fingerprint(f"{root}-{variant['width']}w.{variant['format']}", variant_content)
+        _write(os.path.join(dist_dir, hashed), variant_content)
+        variants.append({'width': variant['width'], 'format': variant['format'],
+                         'path': hashed, 'size': len(variant_content)})
+    return {'width': image['width'], 'variants': variants}
+
+def build_assets(static_dir: str = STATIC_DIR, dist_dir: str = DIST_DIR) -> Dict[str, Dict]:
+    """
+    Write a fingerprinted copy of every static file (CSS and JS minified first), plus br/gzip
+    variants of the text formats, and a manifest mapping each source path to its copy and encodings
+    """
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+
+    assets = {}
+    for directory, subdirectories, filenames in os.walk(static_dir):
+        # Never fingerprint the build output itself
+        subdirectories[:] = sorted(d for d in subdirectories
+                                   if os.path.join(directory, d) != os.path.normpath(dist_dir))
+        for filename in sorted(filenames):
+            source = os.path.join(directory, filename)
+            logical = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as f:
+                content = f.read()
+
+            minify = MINIFIERS.get(os.path.splitext(filename)[1].lower())
+            if minify is not None and '.min.' not in filename:
+                content = minify(content.decode('utf-8')).encode('utf-8')
+
+            hashed = fingerprint(logical, content)
+            _write(os.path.join(dist_dir, hashed), content)
+
+            encodings = []
+            if os.path.splitext(filename)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                for encoding, suffix in ENCODINGS:
+                    compressed = _compress(content, encoding)
+                    if compressed is not None and len(compressed) <= len(content) * (1 - MIN_COMPRESSION_SAVING):
+                        _write(os.path.join(dist_dir, hashed + suffix), compressed)
+                        encodings.append(encoding)
+
+            entry = {'path': hashed, 'size': len(content), 'encodings': encodings}
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                entry.update(_build_variants(logical, content, dist_dir))
+            assets[logical] = entry
+
+    _write(os.path.join(dist_dir, MANIFEST_NAME), json.dumps({'assets': assets}, indent=2, sort_keys=True).encode('utf-8'))
+    return assets
+
+# Manifest of the last build, loaded once per process
+_manifest: Optional[Dict[str, Dict]] = None
+_served: Optional[Dict[str, Dict]] = None
+_manifest_version = ''
+
+def load_manifest() -> Dict[str, Dict]:
+    """
+    Get the build manifest, or an empty one when build_assets.py has not been run
+    """
+    global _manifest, _served, _manifest_version
+
+    if _manifest is None:
+        try:
+            with open(os.path.join(DIST_DIR, MANIFEST_NAME), 'rb') as f:
+                raw = f.read()
+            manifest = json.loads(raw)['assets']
+            _manifest_version = hashlib.sha256(raw).hexdigest()[:12]
+        except (OSError, ValueError, KeyError):
+            manifest, _manifest_version = {}, ''
+        _served = {}
+        for entry in manifest.values():
+            _served[entry['path']] = entry
+            for variant in entry.get('variants', ()):
+                _served[variant['path']] = {'path': variant['path'], 'encodings': []}
+        _manifest = manifest
+    return _manifest
+
+def manifest_version() -> str:
+    """
+    Hash of the build manifest, so pages linking to assets change when the assets do
+    """
+    load_manifest()
+    return _manifest_version
+
+def reset_manifest() -> None:
+    """
+    Forget the loaded manifest so the next lookup reads it again (after a rebuild)
+    """
+    global _manifest, _served
+
+    _manifest = _served = None
+
+def asset_url(filename: str, build_url: Callable[..., str] = url_for) -> str:
+    """
+    URL of a static file: its fingerprinted copy when built, otherwise the plain static URL.
+    build_url is the url_for of the app rendering the page (Quart's in async mode).
+    """
+    entry = load_manifest().get(filename)
+    if entry is None:
+        return build_url('static', filename=filename)
+    return build_url('assets', filename=entry['path'])
+
+def image_srcset(filename: str, image_format: str) -> str:
+    """
+    srcset of an image's built variants in one format; PNG includes the original file at full width
+    """
+    entry = load_manifest().get(filename)
+    if entry is None:
+        return ''
+    candidates = [(variant['width'], variant['path']) for variant in entry.get('variants', ())
+                  if variant['format'] == image_format]
+    if image_format == 'png' and 'width' in entry:
+        candidates.append((entry['width'], entry['path']))
+    return ', '.join(f"{url_for('assets', filename=path)} {width}w" for width, path in sorted(candidates))
+
+def responsive_image(filename: str, alt: str, sizes: str = '100vw', css_class: Optional[str] = None,
+                     loading: str = 'lazy') -> Markup:
+    """
+    A <picture> offering the AVIF and WebP variants of an image, falling back to
+    an <img> with PNG variants; a plain <img> when no variants were built
+    """
+    attributes = f' alt="{escape(alt)}" loading="{escape(loading)}"'
+    if css_class:
+        attributes += f' class="{escape(css_class)}"'
+
+    entry = load_manifest().get(filename)
+    if not entry or not entry.get('variants'):
+        return Markup(f'<img src="{escape(asset_url(filename))}"{attributes} />')
+
+    sources = []
+    for image_format in ('avif', 'webp'):
+        srcset = image_srcset(filename, image_format)
+        if srcset:
+            sources.append(f'<source type="{mime_type(image_format)}" srcset="{escape(srcset)}" sizes="{escape(sizes)}" />')
+    img = (f'<img src="{escape(asset_url(filename))}" srcset="{escape(image_srcset(filename, "png"))}" '
+           f'sizes="{escape(sizes)}"{attributes} />')
+    return Markup(f"<picture>{''.join(sources)}{img}</picture>")
+
+def serve_asset(filename: str) -> Response:
+    """
+    Serve a fingerprinted file in the best encoding the client accepts
+    """
+    load_manifest()
+    entry = _served.get(filename)
+    if entry is None:
+        abort(404)
+
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    served_name, content_encoding = filename, None
+    for encoding, suffix in ENCODINGS:
+        if encoding in entry['encodings'] and request.accept_encodings[encoding]:
+            served_name, content_encoding = filename + suffix, encoding
+            break
+
+    response = send_from_directory(DIST_DIR, served_name, mimetype=mimetype, max_age=ASSET_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if content_encoding is not None:
+        response.headers['Content-Encoding'] = content_encoding
+    if entry['encodings']:
+        response.vary.add('Accept-Encoding')
+    return response
+
+def init_assets(app: Flask) -> None:
+    """
+    Register the /assets route and the asset_url(), image_srcset() and responsive_image() template helpers
+    """
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.jinja_env.globals['image_srcset'] = image_srcset
+    app.jinja_env.globals['responsive_image'] = responsive_image
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: build the fingerprinted assets and report their sizes
+    """
+    parser = argparse.ArgumentParser(description='Build fingerprinted, precompressed static assets')
+    parser.parse_args(argv)
+
+    if brotli is None:
+        print("brotli is not installed; building gzip variants only")
+    if not available_formats():
+        print("Pillow is not installed; skipping responsive image variants")
+
+    assets = build_assets()
+    for logical, entry in sorted(assets.items()):
+        variants = ', '.join(
+            f"{encoding} {os.path.getsize(os.path.join(DIST_DIR, entry['path'] + suffix))} B"
+            for encoding, suffix in ENCODINGS if encoding in entry['encodings']
+        )
+        print(f"{logical} -> {entry['path']} ({entry['size']} B{', ' + variants if variants else ''})")
+        for variant in entry.get('variants', ()):
+            print(f"    {variant['width']}w {variant['format']}: {variant['size']} B")
+    print(f"Built {len(assets)} assets into {os.path.relpath(DIST_DIR)}")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,341 @@
+"""
+Async (ASGI) execution mode for the AI Agent System
+Serves the auth and enrollment routes from a Quart app that awaits Motor and httpx instead of blocking a
+worker, and hands every other request to the Flask app. Both share the URLs, templates, session cookie
+and CSRF tokens, so a browser can move between them freely.
+"""
+
+import asyncio
+from functools import partial
+from typing import Any, Optional
+
+from flask import Flask
+from flask_wtf.csrf import CSRFError, generate_csrf as flask_generate_csrf
+from hypercorn.middleware import AsyncioWSGIMiddleware
+from quart import Quart, abort, current_app, g, redirect, render_template, request, session, url_for
+from quart.sessions import SessionInterface
+from werkzeug.routing import Rule
+from werkzeug.test import EnvironBuilder
+
+from .assets import asset_url
+from .async_database import close_async_client
+from .async_mail import close_async_mail
+from .catalog import get_course
+from .sessions import ServerSideSession
+from .template_cache import init_template_cache
+from .settings import get_settings
+
+settings = get_settings()
+
+# Largest request body passed on to the Flask app
+ASYNC_WSGI_MAX_BODY_SIZE = settings.async_wsgi_max_body_size
+
+# Flask settings the async app must share so cookies and sessions are interchangeable
+# (CSRF tokens are issued and checked by the Flask app's own Flask-WTF extension)
+SHARED_CONFIG_PREFIXES = ('SECRET_KEY', 'SESSION_', 'PERMANENT_SESSION_LIFETIME', 'APPLICATION_ROOT')
+
+class SessionInterfaceBridge(SessionInterface):
+    """Runs the Flask app's session interface for the Quart app, with store I/O in a worker thread"""
+
+    def __init__(self, interface):
+        self.interface = interface
+
+    def _open(self, app: Quart, request: Any):
+        session = self.interface.open_session(app, request)
+        if isinstance(session, ServerSideSession):
+            # Load from the store here, off the event loop, without marking the session as accessed
+            session.data
+            session.accessed = False
+        return session
+
+    async def open_session(self, app: Quart, request: Any):
+        return await asyncio.to_thread(self._open, app, request)
+
+    async def save_session(self, app: Quart, session: Any, response: Any) -> None:
+        await asyncio.to_thread(self.interface.save_session, app, session, response)
+
+    def is_null_session(self, obj: object) -> bool:
+        return self.interface.is_null_session(obj)
+
+def _flask_request_context(form: Optional[Any] = None):
+    """
+    A request context of the Flask app that mirrors the current Quart request and is bound to the same
+    session object, so Flask-WTF's own CSRF code can run for the async routes
+    """
+    flask_app = current_app.extensions['flask_app']
+    headers = [(name, value) for name, value in request.headers.items()
+               if name.lower() not in ('content-type', 'content-length')]
+    environ = EnvironBuilder(path=request.path, method=request.method, headers=headers, data=form,
+                             base_url=f"{request.scheme}://{request.host}{request.root_path}").get_environ()
+    context = flask_app.request_context(environ)
+    # The bridge makes the Quart session the Flask interface's session object, so changes are saved by Quart
+    context.session = session._get_current_object()
+    return context
+
+def generate_csrf() -> str:
+    """
+    CSRF token for the current session, issued by Flask-WTF so either app accepts the other's tokens
+    """
+    if 'csrf_token' not in g:
+        with _flask_request_context():
+            g.csrf_token = flask_generate_csrf()
+    return g.csrf_token
+
+async def protect_csrf() -> None:
+    """
+    Reject unsafe requests without a valid CSRF token by running the Flask app's CSRFProtect check
+    """
+    flask_app = current_app.extensions['flask_app']
+    if not flask_app.config['WTF_CSRF_ENABLED'] or request.method not in flask_app.config['WTF_CSRF_METHODS']:
+        return
+    form = await request.form
+    try:
+        with _flask_request_context(form.to_dict()):
+            flask_app.extensions['csrf'].protect()
+    except CSRFError as e:
+        print(f"CSRF check failed: {e.description}")
+        abort(400, e.description)
+
+def register_routes(app: Quart) -> None:
+    """
+    Add the async versions of the auth and enrollment routes from app.py, with the same URLs and endpoint names
+    """
+    from . import async_user_controller as users
+    from . import async_course_controller as courses
+
+    @app.route('/signup-user', methods=['GET', 'POST'])
+    async def signup_user():
+        """User signup page"""
+        errors = []
+
+        if request.method == 'POST':
+            form = await request.form
+            name = form.get('name')
+            email = form.get('email')
+            password = form.get('password')
+            cpassword = form.get('cpassword')
+
+            if not name or not email or not password or not cpassword:
+                errors.append("All fields are required. Please complete all registration fields.")
+            else:
+                success, errors = await users.signup_user(name, email, password, cpassword)
+                if success:
+                    return redirect(url_for('user_otp'))
+
+        return await render_template('login_signup.html', errors=errors, form='signup')
+
+    @app.route('/login-user', methods=['GET', 'POST'])
+    async def login_user():
+        """User login page"""
+        errors = []
+
+        if request.method == 'POST':
+            form = await request.form
+            email = form.get('email')
+            password = form.get('password')
+
+            if not email or not password:
+                errors.append("Both email and password are required for authentication.")
+            else:
+                success, errors = await users.login_user(email, password)
+                if success:
+                    return redirect(url_for('home'))
+                elif "redirect_user_otp" in errors:
+                    return redirect(url_for('user_otp'))
+
+        return await render_template('login_signup.html', errors=errors, form='login')
+
+    @app.route('/user-otp', methods=['GET', 'POST'])
+    async def user_otp():
+        """Email verification OTP page"""
+        if 'email' not in session:
+            return redirect(url_for('login_user'))
+
+        errors = []
+        info = session.get('info', '')
+
+        if request.method == 'POST':
+            otp_code = (await request.form).get('otp')
+
+            if not otp_code:
+                errors.append("Verification code is required. Please enter the code sent to your email.")
+            else:
+                success, errors = await users.verify_otp(otp_code)
+                if success:
+                    return redirect(url_for('home'))
+
+        return await render_template('login_signup.html', errors=errors, info=info, form='otp')
+
+    @app.route('/forgot-password', methods=['GET', 'POST'])
+    async def forgot_password():
+        """Password recovery page"""
+        errors = []
+
+        if request.method == 'POST':
+            email = (await request.form).get('email')
+
+            if not email:
+                errors.append("Email address is required to initiate password recovery.")
+            else:
+                success, errors = await users.forgot_password(email)
+                if success:
+                    return redirect(url_for('reset_code'))
+
+        return await render_template('login_signup.html', errors=errors, form='forgot')
+
+    @app.route('/reset-code', methods=['GET', 'POST'])
+    async def reset_code():
+        """Password reset OTP verification page"""
+        if 'email' not in session:
+            return redirect(url_for('login_user'))
+
+        errors = []
+        info = session.get('info', '')
+
+        if request.method == 'POST':
+            otp_code = (await request.form).get('otp')
+
+            if not otp_code:
+                errors.append("Verification code is required. Please enter the code sent to your email.")
+            else:
+                success, errors = await users.reset_password_otp(otp_code)
+                if success:
+                    return redirect(url_for('new_password'))
+
+        return await render_template('login_signup.html', errors=errors, info=info, form='reset')
+
+    @app.route('/new-password', methods=['GET', 'POST'])
+    async def new_password():
+        """New password creation page"""
+        if 'email' not in session:
+            return redirect(url_for('login_user'))
+
+        errors = []
+        info = session.get('info', '')
+
+        if request.method == 'POST':
+            form = await request.form
+            password = form.get('password')
+            cpassword = form.get('cpassword')
+
+            if not password or not cpassword:
+                errors.append("Both password fields are required. Please complete all password fields.")
+            else:
+                success, errors = await users.change_password(password, cpassword)
+                if success:
+                    return redirect(url_for('password_changed'))
+
+        return await render_template('login_signup.html', errors=errors, info=info, form='new-password')
+
+    @app.route('/password-changed', methods=['GET', 'POST'])
+    async def password_changed():
+        """Password changed confirmation page"""
+        info = session.get('info', '')
+
+        if request.method == 'POST':
+            return redirect(url_for('login_user'))
+
+        if not info:
+            return redirect(url_for('login_user'))
+
+        return await render_template('login_signup.html', info=info, form='password-changed')
+
+    @app.route('/course-agent/schedule/save', methods=['POST'])
+    async def save_schedule():
+        """Save the course schedule"""
+        if 'user_id' not in session:
+            return redirect(url_for('login_user'))
+
+        form = await request.form
+        course_id = form.get('course_id')
+        if not course_id:
+            return redirect(url_for('course_agent'))
+
+        schedule = {
+            'preferred_time': form.get('preferred_time'),
+            'frequency': 'daily',
+            'pace': 'intermediate',
+            'notification_method': form.get('notification_method'),
+            'fullname': form.get('fullname'),
+            'whatsapp': form.get('whatsapp'),
+            'duration': form.get('duration')
+        }
+
+        success, message = await courses.select_course(session['user_id'], course_id, schedule)
+
+        if success:
+            try:
+                user = await courses.get_user_info(session['user_id'])
+                if user:
+                    course = get_course(course_id)
+                    selected_course_name = course.name if course else 'Unknown Course'
+                    await courses.send_schedule_confirmation_email(user.email, user.name, selected_course_name, schedule)
+            except Exception as e:
+                print(f"Error sending confirmation email: {str(e)}")
+            return redirect(url_for('course_agent_success'))
+        else:
+            return redirect(url_for('course_agent'))
+
+    @app.route('/select-course', methods=['POST'])
+    async def select_course():
+        """Handle course selection - redirect to schedule page"""
+        if 'user_id' not in session:
+            return redirect(url_for('login_user'))
+
+        course_id = (await request.form).get('course_id')
+        if not course_id:
+            return redirect(url_for('course_agent'))
+
+        return redirect(url_for('course_schedule', course_id=course_id))
+
+def create_async_app(flask_app: Flask) -> Quart:
+    """
+    Build the Quart app serving the async routes, configured like flask_app
+    """
+    app = Quart(__name__, root_path=flask_app.root_path, template_folder=flask_app.template_folder,
+                static_folder=None)
+    app.config.update({key: value for key, value in flask_app.config.items()
+                       if key.startswith(SHARED_CONFIG_PREFIXES)})
+    app.session_interface = SessionInterfaceBridge(flask_app.session_interface)
+    app.extensions['flask_app'] = flask_app
+
+    app.jinja_env.globals['asset_url'] = partial(asset_url, build_url=url_for)
+    app.jinja_env.globals['csrf_token'] = generate_csrf
+    init_template_cache(app)
+
+    app.before_request(protect_csrf)
+    register_routes(app)
+
+    # The Flask routes are known here for url_for() and redirects only; the dispatcher sends them to Flask
+    async_endpoints = {rule.endpoint for rule in app.url_map.iter_rules()}
+    for rule in flask_app.url_map.iter_rules():
+        if rule.endpoint not in async_endpoints:
+            app.url_map.add(Rule(rule.rule, endpoint=rule.endpoint, methods=rule.methods, build_only=True))
+
+    @app.after_serving
+    async def close_connections():
+        await close_async_mail()
+        close_async_client()
+
+    return app
+
+class AsyncRouteDispatcher:
+    """ASGI app sending the async routes to the Quart app and every other request to the Flask app"""
+
+    def __init__(self, async_app: Quart, wsgi_app: Any, max_body_size: int = ASYNC_WSGI_MAX_BODY_SIZE):
+        self.async_app = async_app
+        self.wsgi_app = AsyncioWSGIMiddleware(wsgi_app, max_body_size=max_body_size)
+        self.paths = frozenset(rule.rule for rule in async_app.url_map.iter_rules() if not rule.build_only)
+
+    async def __call__(self, scope, receive, send) -> None:
+        # Lifespan events go to Quart, which opens and closes the async clients
+        if scope['type'] == 'http' and scope['path'] not in self.paths:
+            await self.wsgi_app(scope, receive, send)
+        else:
+            await self.async_app(scope, receive, send)
+
+def create_asgi_app(flask_app: Flask) -> AsyncRouteDispatcher:
+    """
+    ASGI application for flask_app with the auth and enrollment routes served asynchronously
+    """
+    return AsyncRouteDispatcher(create_async_app(flask_app), flask_app)
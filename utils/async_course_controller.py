@@ -0,0 +1,81 @@
+"""
+Async course controller utilities for the AI Agent System
+The asyncio counterpart of course_controller.py for routes served in async (ASGI) mode
+"""
+
+from bson import ObjectId
+from typing import Dict, Optional, Tuple
+from .async_database import get_async_db, find_one_async, upsert_document_async
+from .async_mail import queue_email_brevo_async
+from .catalog import COURSE_NAMES
+from .course_controller import enrollment_upsert
+from .course_summary import SUMMARY_COLLECTION, summary_update
+from .database import get_collection
+from .mail import render_schedule_confirmation_email
+from .models import User
+from .user_cache import user_cache, USER_CACHE_PROJECTION
+from .user_controller import BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME
+
+async def select_course(user_id: str, course_id: str, schedule: Dict) -> Tuple[bool, str]:
+    """
+    Select a course for a user and save their schedule preferences
+    Equivalent to course_controller.select_course
+    """
+    try:
+        if course_id not in COURSE_NAMES:
+            return False, "The selected course is not available. Please choose a valid course from the catalog."
+
+        db = get_async_db()
+        if db is None:
+            return False, "Unable to establish database connection. Please try again in a few moments."
+
+        collection = get_collection(db, 'course_enrollments')
+        query, update = enrollment_upsert(user_id, course_id, schedule)
+        if await upsert_document_async(collection, query, update):
+            # Keep the user's course summary in step with the enrollment
+            await upsert_document_async(get_collection(db, SUMMARY_COLLECTION),
+                                        *summary_update(user_id, course_id, COURSE_NAMES[course_id], 'active', schedule))
+            return True, "Course enrollment successful. Your learning journey is about to begin!"
+        else:
+            return False, "Course enrollment failed. Please try again or contact support for assistance."
+
+    except Exception as e:
+        print(f"Error selecting course: {str(e)}")
+        return False, "An unexpected error occurred during course enrollment. Please try again or contact support for assistance."
+
+async def get_user_info(user_id: str) -> Optional[User]:
+    """
+    Get a user's name and email by user ID, from the shared user cache when possible
+    Equivalent to course_controller.get_user_info
+    """
+    try:
+        user = user_cache.get_by_id(user_id)
+        if user is not None:
+            return user
+
+        db = get_async_db()
+        if db is None:
+            return None
+        document = await find_one_async(get_collection(db, 'usertable'), {'_id': ObjectId(user_id)}, USER_CACHE_PROJECTION)
+        user = User.from_document(document)
+        if user is not None:
+            user_cache.put(user)
+        return user
+
+    except Exception as e:
+        print(f"Error retrieving user info: {str(e)}")
+        return None
+
+async def send_schedule_confirmation_email(user_email: str, user_name: str, course_name: str, schedule: Dict) -> bool:
+    """
+    Send a schedule confirmation email to the user in a background task
+    Equivalent to course_controller.send_schedule_confirmation_email
+    """
+    try:
+        subject = f"AI Agent System - {course_name} Learning Schedule Confirmation"
+        html_content = render_schedule_confirmation_email(user_name, course_name, schedule)
+        return await queue_email_brevo_async(user_email, subject, html_content, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME)
+
+    except Exception as e:
+        print(f"Error sending schedule confirmation email: {str(e)}")
+        return False
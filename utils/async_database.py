@@ -0,0 +1,109 @@
+"""
+Async database utilities for the AI Agent System
+The asyncio counterpart of database.py, built on Motor, for routes served in async (ASGI) mode
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Union
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from .database import MONGO_URI, DB_NAME, get_client_options
+
+# One client per event loop: Motor clients are bound to the loop they were created on
+_client: Optional[AsyncIOMotorClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_async_client() -> AsyncIOMotorClient:
+    """
+    Return the pooled Motor client of the running event loop, creating it on first use
+    """
+    global _client, _client_loop
+
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        # Same pool limits and timeouts as the synchronous client
+        _client = AsyncIOMotorClient(MONGO_URI, io_loop=loop, **get_client_options())
+        _client_loop = loop
+    return _client
+
+def close_async_client() -> None:
+    """
+    Close the Motor client, if any
+    """
+    global _client, _client_loop
+
+    if _client is not None:
+        _client.close()
+    _client = None
+    _client_loop = None
+
+def get_async_db() -> Optional[AsyncIOMotorDatabase]:
+    """
+    Return the application database from the pooled Motor client
+    """
+    try:
+        return get_async_client()[DB_NAME]
+    except Exception as e:
+        print(f"Connection failed: {str(e)}")
+        return None
+
+async def find_one_async(collection: AsyncIOMotorCollection, query: Dict,
+                         projection: Optional[Union[Dict, List[str]]] = None) -> Optional[Dict]:
+    """
+    Find the first document matching a query
+    """
+    try:
+        return await collection.find_one(query, projection)
+    except Exception as e:
+        print(f"Query execution failed: {str(e)}")
+        return None
+
+async def insert_document_async(collection: AsyncIOMotorCollection, document: Dict) -> Optional[str]:
+    """
+    Insert a document into a collection
+    """
+    try:
+        result = await collection.insert_one(document)
+        return str(result.inserted_id)
+    except Exception as e:
+        print(f"Insert execution failed: {str(e)}")
+        return None
+
+async def update_document_async(collection: AsyncIOMotorCollection, query: Dict, update: Dict) -> bool:
+    """
+    Update documents in a collection
+    """
+    try:
+        result = await collection.update_one(query, update)
+        return result.matched_count > 0
+    except Exception as e:
+        print(f"Update execution failed: {str(e)}")
+        return False
+
+async def upsert_document_async(collection: AsyncIOMotorCollection, query: Dict, update: Dict) -> bool:
+    """
+    Update the document matching a query, inserting it if there is none
+    """
+    try:
+        await collection.update_one(query, update, upsert=True)
+        return True
+    except Exception as e:
+        print(f"Upsert execution failed: {str(e)}")
+        return False
+
+async def find_one_and_update_async(collection: AsyncIOMotorCollection, query: Dict, update: Dict,
+                                    projection: Optional[Union[Dict, List[str]]] = None,
+                                    return_updated: bool = False) -> Optional[Dict]:
+    """
+    Atomically update the first document matching a query and return it in one round trip
+    """
+    try:
+        return await collection.find_one_and_update(
+            query,
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER if return_updated else ReturnDocument.BEFORE
+        )
+    except Exception as e:
+        print(f"Update execution failed: {str(e)}")
+        return None
@@ -0,0 +1,164 @@
+"""
+Async email sending for the AI Agent System
+The asyncio counterpart of brevo.py and mail_queue.py: a keep-alive httpx client for the Brevo API
+and background send tasks, for routes served in async (ASGI) mode
+"""
+
+import asyncio
+import random
+import time
+from typing import Dict, Optional, Set
+
+import httpx
+
+from .brevo import (BREVO_API_BASE_URL, BREVO_CONNECT_TIMEOUT, BREVO_READ_TIMEOUT, BREVO_MAX_RETRIES,
+                    BREVO_BACKOFF_BASE, BREVO_BACKOFF_MAX, BREVO_POOL_SIZE, RETRY_STATUSES,
+                    EndpointStats, _parse_retry_after)
+from .mail import brevo_email_payload
+from .mail_queue import MAIL_ASYNC, MAIL_QUEUE_SIZE, MAIL_DRAIN_TIMEOUT
+
+class AsyncBrevoTransport:
+    """A pooled, keep-alive async HTTP client for the Brevo API, with the same retry policy as BrevoTransport"""
+
+    def __init__(self, base_url: str = BREVO_API_BASE_URL, connect_timeout: float = BREVO_CONNECT_TIMEOUT,
+                 read_timeout: float = BREVO_READ_TIMEOUT, max_retries: int = BREVO_MAX_RETRIES,
+                 backoff_base: float = BREVO_BACKOFF_BASE, backoff_max: float = BREVO_BACKOFF_MAX,
+                 pool_size: int = BREVO_POOL_SIZE):
+        self.base_url = base_url.rstrip('/')
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self._stats: Dict[str, EndpointStats] = {}
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response]) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt: the server's Retry-After when given,
+        otherwise full-jitter exponential backoff. None means the wait is too long to retry.
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.backoff_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def post(self, path: str, payload: Dict, api_key: str) -> Optional[httpx.Response]:
+        """
+        POST a JSON payload to a Brevo endpoint, retrying 429 and 5xx responses and connections that
+        could not be opened. Errors after the request was sent, such as read timeouts, are not retried,
+        as in BrevoTransport.post. Returns the final response, or None if no response was received.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        headers = {"api-key": api_key, "Content-Type": "application/json", "Accept": "application/json"}
+        stats = self._stats.setdefault(path, EndpointStats())
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            started = time.perf_counter()
+            try:
+                response = await self.client.post(url, json=payload, headers=headers)
+                failed = response.status_code in RETRY_STATUSES
+            except httpx.TransportError as e:
+                print(f"Brevo request to {path} failed: {str(e)}")
+                failed = True
+                sent = not isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+            else:
+                sent = False
+            stats.record(time.perf_counter() - started, failed or response.status_code >= 400)
+
+            if not failed or sent or attempt == self.max_retries:
+                return response
+
+            delay = self._backoff(attempt, response)
+            if delay is None:
+                return response
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency statistics per endpoint path"""
+        return {path: stats.snapshot() for path, stats in self._stats.items()}
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        await self.client.aclose()
+
+# One transport per event loop, created lazily on first use
+_transport: Optional[AsyncBrevoTransport] = None
+_transport_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def get_async_brevo_transport() -> AsyncBrevoTransport:
+    """
+    Return the Brevo transport of the running event loop, creating it on first use
+    """
+    global _transport, _transport_loop
+
+    loop = asyncio.get_running_loop()
+    if _transport is None or _transport_loop is not loop:
+        _transport = AsyncBrevoTransport()
+        _transport_loop = loop
+    return _transport
+
+async def send_email_brevo_async(to, subject, html_content, api_key, sender_email, sender_name) -> bool:
+    """
+    Send an email using the Brevo API without blocking the event loop
+    """
+    try:
+        payload = brevo_email_payload(to, subject, html_content, sender_email, sender_name)
+        response = await get_async_brevo_transport().post('/smtp/email', payload, api_key)
+
+        if response is not None and response.status_code in [200, 201]:
+            return True
+        elif response is not None:
+            print(f"Error sending email via Brevo API: {response.status_code} - {response.text}")
+            return False
+        else:
+            print("Error sending email via Brevo API: no response received")
+            return False
+
+    except Exception as e:
+        print(f"Error sending email via Brevo: {str(e)}")
+        return False
+
+# Sends in flight; the event loop only keeps weak references to tasks
+_pending: Set[asyncio.Task] = set()
+
+async def queue_email_brevo_async(to, subject, html_content, api_key, sender_email, sender_name) -> bool:
+    """
+    Send an email through Brevo in a background task, so the response does not wait on Brevo.
+    Takes the same arguments as send_email_brevo; sends before returning when MAIL_ASYNC is off
+    or MAIL_QUEUE_SIZE sends are already in flight, which slows producers down rather than dropping mail.
+    """
+    if not MAIL_ASYNC or len(_pending) >= MAIL_QUEUE_SIZE:
+        return await send_email_brevo_async(to, subject, html_content, api_key, sender_email, sender_name)
+
+    task = asyncio.create_task(send_email_brevo_async(to, subject, html_content, api_key, sender_email, sender_name))
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return True
+
+async def drain_mail_tasks(timeout: float = MAIL_DRAIN_TIMEOUT) -> bool:
+    """
+    Wait for the background sends to finish, e.g. at shutdown. Returns False if some were still running.
+    """
+    if _pending:
+        await asyncio.wait(set(_pending), timeout=timeout)
+    return not _pending
+
+async def close_async_mail() -> None:
+    """
+    Drain the background sends and close the transport of the running event loop
+    """
+    global _transport, _transport_loop
+
+    await drain_mail_tasks()
+    if _transport is not None and _transport_loop is asyncio.get_running_loop():
+        await _transport.close()
+    _transport = None
+    _transport_loop = None
@@ -0,0 +1,307 @@
+"""
+Async user controller utilities for the AI Agent System
+The asyncio counterpart of user_controller.py for routes served in async (ASGI) mode:
+the queries, updates and messages come from user_controller.py; only the database and mail I/O differ, awaited here
+"""
+
+from quart import session
+from typing import List, Tuple
+from .async_database import (get_async_db, find_one_async, find_one_and_update_async, insert_document_async,
+                             update_document_async)
+from .async_mail import send_email_brevo_async
+from .database import get_collection
+from .passwords import hash_password_async, verify_password_async, needs_rehash
+from .user_cache import invalidate_user
+from .user_controller import (BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME, _new_otp_fields, _live_otp_query,
+                              _otp_is_live, _otp_email, _new_user_document, _retire_otp, _failed_otp_attempt,
+                              _verify_account_update, _rehash, _reset_request_update, _reset_code_verified_update,
+                              _change_password, _sign_in)
+from .user_controller import (DB_UNAVAILABLE, PASSWORD_MISMATCH, EMAIL_TAKEN, SIGNUP_EMAIL_FAILED, SIGNUP_FAILED,
+                              SIGNUP_ERROR, VERIFY_SESSION_EXPIRED, INVALID_VERIFICATION_CODE, VERIFY_ERROR,
+                              INVALID_CREDENTIALS, NO_ACCOUNT, RESEND_FAILED, LOGIN_ERROR, RESET_EMAIL_FAILED,
+                              RESET_REQUEST_FAILED, NO_ACCOUNT_FOR_RESET, FORGOT_PASSWORD_ERROR, RESET_SESSION_EXPIRED,
+                              INVALID_RESET_CODE, RESET_ERROR, CHANGE_PASSWORD_FAILED, CHANGE_PASSWORD_ERROR,
+                              RESET_CODE_VERIFIED_INFO, PASSWORD_CHANGED_INFO, VERIFICATION_SENT_INFO,
+                              VERIFICATION_REQUIRED_INFO, RESET_SENT_INFO)
+
+async def _retire_undelivered_otp(collection, email: str) -> None:
+    """
+    Lock out a code whose email could not be sent, so the next sign-in issues and sends a new one
+    """
+    await update_document_async(collection, *_retire_otp(email))
+
+async def send_otp_email(email: str, subject: str, message: str) -> bool:
+    """
+    Send an OTP email before answering the request
+    Equivalent to user_controller.send_otp_email
+    """
+    return await send_email_brevo_async(email, subject, message, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME)
+
+async def _record_failed_otp_attempt(collection, email: str) -> None:
+    """
+    Count a wrong OTP guess against the user's outstanding code
+    """
+    await update_document_async(collection, *_failed_otp_attempt(email))
+
+async def signup_user(name: str, email: str, password: str, cpassword: str) -> Tuple[bool, List[str]]:
+    """
+    Handle user signup
+    Equivalent to user_controller.signup_user
+    """
+    errors = []
+
+    if password != cpassword:
+        errors.append(PASSWORD_MISMATCH)
+        return False, errors
+
+    try:
+        db = get_async_db()
+        if db is None:
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+
+        collection = get_collection(db, 'usertable')
+        existing_user = await find_one_async(collection, {'email': email}, {'_id': 1})
+        if existing_user:
+            errors.append(EMAIL_TAKEN)
+            return False, errors
+
+        otp = _new_otp_fields()
+        user_document = _new_user_document(name, email, await hash_password_async(password), otp)
+
+        if await insert_document_async(collection, user_document):
+            invalidate_user(email=email)
+            if await send_otp_email(email, *_otp_email(otp['code'], 'verification')):
+                session['info'] = VERIFICATION_SENT_INFO.format(email=email)
+                session['email'] = email
+                return True, []
+            else:
+                await _retire_undelivered_otp(collection, email)
+                errors.append(SIGNUP_EMAIL_FAILED)
+        else:
+            errors.append(SIGNUP_FAILED)
+
+        return False, errors
+
+    except Exception as e:
+        errors.append(SIGNUP_ERROR)
+        print(f"Database error: {str(e)}")
+        return False, errors
+
+async def verify_otp(otp_code: str) -> Tuple[bool, List[str]]:
+    """
+    Verify OTP code
+    Equivalent to user_controller.verify_otp
+    """
+    errors = []
+
+    try:
+        db = get_async_db()
+        if db is None:
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+
+        email = session.get('email', '')
+        if not email:
+            errors.append(VERIFY_SESSION_EXPIRED)
+            return False, errors
+
+        query = _live_otp_query(email, otp_code)
+        if query is None:
+            errors.append(INVALID_VERIFICATION_CODE)
+            return False, errors
+
+        collection = get_collection(db, 'usertable')
+        user = await find_one_and_update_async(collection, query, _verify_account_update(), projection={'name': 1})
+
+        if user:
+            invalidate_user(user['_id'], email)
+            session['name'] = user['name']
+            _sign_in(session, user['_id'])
+            return True, []
+        else:
+            await _record_failed_otp_attempt(collection, email)
+            errors.append(INVALID_VERIFICATION_CODE)
+
+        return False, errors
+
+    except Exception as e:
+        errors.append(VERIFY_ERROR)
+        print(f"Database error: {str(e)}")
+        return False, errors
+
+async def login_user(email: str, password: str) -> Tuple[bool, List[str]]:
+    """
+    Handle user login
+    Equivalent to user_controller.login_user
+    """
+    errors = []
+
+    try:
+        db = get_async_db()
+        if db is None:
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+
+        collection = get_collection(db, 'usertable')
+        user = await find_one_async(collection, {'email': email})
+
+        if user:
+            if await verify_password_async(user['password'], password):
+                # Upgrade hashes made with older parameters while the plain password is at hand
+                if needs_rehash(user['password']):
+                    new_hash = await hash_password_async(password)
+                    if await update_document_async(collection, *_rehash(email, user['password'], new_hash)):
+                        invalidate_user(email=email)
+
+                session['email'] = email
+                session['name'] = user['name']
+
+                if user['status'] == "verified":
+                    _sign_in(session, user['_id'])
+                    return True, []
+                else:
+                    # Issue a fresh code if the one sent at signup has expired or been locked out
+                    if not _otp_is_live(user):
+                        otp = _new_otp_fields()
+                        if await update_document_async(collection, {'email': email}, {'$set': otp}):
+                            invalidate_user(email=email)
+                            if not await send_otp_email(email, *_otp_email(otp['code'], 'verification')):
+                                await _retire_undelivered_otp(collection, email)
+                                errors.append(RESEND_FAILED)
+                                return False, errors
+                    session['info'] = VERIFICATION_REQUIRED_INFO.format(email=email)
+                    return False, ["redirect_user_otp"]
+            else:
+                errors.append(INVALID_CREDENTIALS)
+        else:
+            errors.append(NO_ACCOUNT)
+
+        return False, errors
+
+    except Exception as e:
+        errors.append(LOGIN_ERROR)
+        print(f"Database error: {str(e)}")
+        return False, errors
+
+async def forgot_password(email: str) -> Tuple[bool, List[str]]:
+    """
+    Handle forgot password request
+    Equivalent to user_controller.forgot_password
+    """
+    errors = []
+
+    try:
+        db = get_async_db()
+        if db is None:
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+
+        collection = get_collection(db, 'usertable')
+        user = await find_one_async(collection, {'email': email}, {'_id': 1})
+
+        if user:
+            otp = _new_otp_fields()
+            success = await update_document_async(collection, {'email': email}, _reset_request_update(otp))
+
+            if success:
+                invalidate_user(email=email)
+                if await send_otp_email(email, *_otp_email(otp['code'], 'reset')):
+                    session['info'] = RESET_SENT_INFO.format(email=email)
+                    session['email'] = email
+                    return True, []
+                else:
+                    errors.append(RESET_EMAIL_FAILED)
+            else:
+                errors.append(RESET_REQUEST_FAILED)
+        else:
+            errors.append(NO_ACCOUNT_FOR_RESET)
+
+        return False, errors
+
+    except Exception as e:
+        errors.append(FORGOT_PASSWORD_ERROR)
+        print(f"Database error: {str(e)}")
+        return False, errors
+
+async def reset_password_otp(otp_code: str) -> Tuple[bool, List[str]]:
+    """
+    Verify reset password OTP
+    Equivalent to user_controller.reset_password_otp
+    """
+    errors = []
+
+    try:
+        db = get_async_db()
+        if db is None:
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+
+        email = session.get('email', '')
+        if not email:
+            errors.append(RESET_SESSION_EXPIRED)
+            return False, errors
+
+        query = _live_otp_query(email, otp_code)
+        if query is None:
+            errors.append(INVALID_RESET_CODE)
+            return False, errors
+
+        collection = get_collection(db, 'usertable')
+        user = await find_one_and_update_async(collection, query, _reset_code_verified_update(), projection={'email': 1})
+
+        if user:
+            session['email'] = user['email']
+            session['info'] = RESET_CODE_VERIFIED_INFO
+            return True, []
+        else:
+            await _record_failed_otp_attempt(collection, email)
+            errors.append(INVALID_RESET_CODE)
+
+        return False, errors
+
+    except Exception as e:
+        errors.append(RESET_ERROR)
+        print(f"Database error: {str(e)}")
+        return False, errors
+
+async def change_password(password: str, cpassword: str) -> Tuple[bool, List[str]]:
+    """
+    Change user password
+    Equivalent to user_controller.change_password
+    """
+    errors = []
+
+    if password != cpassword:
+        errors.append(PASSWORD_MISMATCH)
+        return False, errors
+
+    try:
+        email = session.get('email', '')
+        if not email:
+            errors.append(RESET_SESSION_EXPIRED)
+            return False, errors
+
+        hashed_password = await hash_password_async(password)
+
+        db = get_async_db()
+        if db is None:
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+
+        collection = get_collection(db, 'usertable')
+        success = await update_document_async(collection, *_change_password(email, hashed_password))
+
+        if success:
+            invalidate_user(email=email)
+            session['info'] = PASSWORD_CHANGED_INFO
+            return True, []
+        else:
+            errors.append(CHANGE_PASSWORD_FAILED)
+
+        return False, errors
+
+    except Exception as e:
+        errors.append(CHANGE_PASSWORD_ERROR)
+        print(f"Database error: {str(e)}")
+        return False, errors
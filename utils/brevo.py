@@ -0,0 +1,210 @@
+"""
+Brevo API transport for the AI Agent System
+A shared keep-alive HTTP session with timeouts, jittered retries and per-endpoint latency statistics
+"""
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+from .settings import get_settings
+
+settings = get_settings()
+
+# Transport configuration
+BREVO_API_BASE_URL = settings.brevo_api_base_url
+BREVO_CONNECT_TIMEOUT = settings.brevo_connect_timeout
+BREVO_READ_TIMEOUT = settings.brevo_read_timeout
+BREVO_MAX_RETRIES = settings.brevo_max_retries
+BREVO_BACKOFF_BASE = settings.brevo_backoff_base
+BREVO_BACKOFF_MAX = settings.brevo_backoff_max
+BREVO_POOL_SIZE = settings.brevo_pool_size
+
+# Responses worth retrying: rate limiting and server-side failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Number of recent latencies kept per endpoint for percentiles
+LATENCY_WINDOW = 512
+
+class EndpointStats:
+    """Request counters and latency figures for one API endpoint"""
+
+    __slots__ = ('requests', 'errors', 'retries', 'total_time', 'max_time', 'recent')
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.recent = deque(maxlen=LATENCY_WINDOW)
+
+    def record(self, elapsed: float, error: bool) -> None:
+        """Record one HTTP attempt"""
+        self.requests += 1
+        self.errors += int(error)
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.recent.append(elapsed)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Summary of the counters, latencies in seconds"""
+        ordered = sorted(self.recent)
+
+        def percentile(fraction: float) -> float:
+            return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'avg': self.total_time / self.requests if self.requests else 0.0,
+            'p50': percentile(0.50),
+            'p95': percentile(0.95),
+            'max': self.max_time,
+        }
+
+class BrevoTransport:
+    """A pooled, keep-alive HTTP client for the Brevo API"""
+
+    def __init__(self, base_url: str = BREVO_API_BASE_URL, connect_timeout: float = BREVO_CONNECT_TIMEOUT,
+                 read_timeout: float = BREVO_READ_TIMEOUT, max_retries: int = BREVO_MAX_RETRIES,
+                 backoff_base: float = BREVO_BACKOFF_BASE, backoff_max: float = BREVO_BACKOFF_MAX,
+                 pool_size: int = BREVO_POOL_SIZE):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # One session keeps TCP/TLS connections alive across sends; retries are handled below
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._stats: Dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _backoff(self, attempt: int, response: Optional[requests.Response]) -> Optional[float]:
+        """
+        Seconds to wait before the next attempt: the server's Retry-After when given,
+        otherwise full-jitter exponential backoff. None means the wait is too long to retry.
+        """
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            delay = _parse_retry_after(retry_after)
+            if delay is not None:
+                return delay if delay <= self.backoff_max else None
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _endpoint_stats(self, path: str) -> EndpointStats:
+        """Get or create the statistics for an endpoint"""
+        stats = self._stats.get(path)
+        if stats is None:
+            stats = self._stats.setdefault(path, EndpointStats())
+        return stats
+
+    def post(self, path: str, payload: Dict, api_key: str) -> Optional[requests.Response]:
+        """
+        POST a JSON payload to a Brevo endpoint, retrying 429 and 5xx responses and connections that
+        could not be opened. Errors after the request was sent, such as read timeouts, are not retried:
+        Brevo may already have accepted the email. Returns the final response, or None if no response was received.
+        """
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        headers = {"api-key": api_key, "Content-Type": "application/json", "Accept": "application/json"}
+        stats = self._endpoint_stats(path)
+
+        for attempt in range(self.max_retries + 1):
+            response = None
+            started = time.perf_counter()
+            try:
+                response = self.session.post(url, json=payload, headers=headers, timeout=self.timeout)
+                failed = response.status_code in RETRY_STATUSES
+            except requests.RequestException as e:
+                print(f"Brevo request to {path} failed: {str(e)}")
+                failed = True
+                sent = not _never_sent(e)
+            else:
+                sent = False
+            with self._lock:
+                stats.record(time.perf_counter() - started, failed or response.status_code >= 400)
+
+            if not failed or sent or attempt == self.max_retries:
+                return response
+
+            delay = self._backoff(attempt, response)
+            if delay is None:
+                return response
+            with self._lock:
+                stats.retries += 1
+            time.sleep(delay)
+
+        return None
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Latency statistics per endpoint path"""
+        with self._lock:
+            return {path: stats.snapshot() for path, stats in self._stats.items()}
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.session.close()
+
+def _never_sent(error: requests.RequestException) -> bool:
+    """
+    Whether a failed request certainly never reached Brevo (the connection could not be opened),
+    so retrying it cannot deliver the email twice
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], 'reason', None) if error.args else None
+    return isinstance(error, requests.ConnectionError) and isinstance(reason, NewConnectionError)
+
+def _parse_retry_after(value: str) -> Optional[float]:
+    """
+    Parse a Retry-After header given either in seconds or as an HTTP date
+    """
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+# One transport per process, created lazily on first use
+_transport: Optional[BrevoTransport] = None
+_transport_lock = threading.Lock()
+
+def get_brevo_transport() -> BrevoTransport:
+    """
+    Return the process-wide Brevo transport, creating it on first use
+    """
+    global _transport
+
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = BrevoTransport()
+    return _transport
+
+def _reset_transport_after_fork() -> None:
+    """
+    Pooled sockets must not be shared with a forked child
+    """
+    global _transport, _transport_lock
+
+    _transport = None
+    _transport_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_transport_after_fork)
@@ -0,0 +1,44 @@
+"""
+Course catalog for the AI Agent System
+Loads data/courses.json once at import into an immutable registry shared by the routes, controllers and templates
+"""
+
+import hashlib
+import json
+import os
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'courses.json')
+
+class Course(NamedTuple):
+    """One entry of the course catalog"""
+    id: str
+    name: str
+    slug: str
+    icon: str
+    description: str
+
+def load_catalog(path: str = CATALOG_PATH) -> Tuple[Tuple[Course, ...], str]:
+    """
+    Read the catalog file and return its courses in display order with a version hash of the file
+    """
+    with open(path, 'rb') as f:
+        raw = f.read()
+
+    courses = tuple(Course(**entry) for entry in json.loads(raw))
+    ids = [course.id for course in courses]
+    if len(set(ids)) != len(ids):
+        raise ValueError(f"Duplicate course ids in {path}")
+    return courses, hashlib.sha256(raw).hexdigest()[:12]
+
+# Built once per process; nothing below is rebuilt per request
+COURSE_LIST, CATALOG_VERSION = load_catalog()
+CATALOG: Mapping[str, Course] = MappingProxyType({course.id: course for course in COURSE_LIST})
+COURSE_NAMES: Mapping[str, str] = MappingProxyType({course.id: course.name for course in COURSE_LIST})
+
+def get_course(course_id: Optional[str]) -> Optional[Course]:
+    """
+    Look up a course by id
+    """
+    return CATALOG.get(course_id)
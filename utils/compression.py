@@ -0,0 +1,168 @@
+"""
+Response compression for the AI Agent System
+WSGI middleware that compresses text responses with brotli or gzip as the client accepts,
+streaming each chunk through the encoder instead of buffering the whole body
+"""
+
+import zlib
+from itertools import chain
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from flask import Flask
+from werkzeug.http import parse_accept_header
+from .settings import get_settings
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip is offered without it
+    brotli = None
+
+settings = get_settings()
+
+# Compression configuration
+COMPRESSION_ENABLED = settings.compression_enabled
+COMPRESSION_MIN_SIZE = settings.compression_min_size
+
+# Encoder levels per content type; types not listed are never compressed. Pages are rendered
+# per request, so they use moderate levels: brotli 4 is about as fast as gzip 6 and smaller.
+COMPRESSION_LEVELS: Dict[str, Dict[str, int]] = {
+    'text/html': {'br': 4, 'gzip': 6},
+    'application/json': {'br': 4, 'gzip': 6},
+    'text/plain': {'br': 4, 'gzip': 6},
+    'text/css': {'br': 5, 'gzip': 6},
+    'text/javascript': {'br': 5, 'gzip': 6},
+    'application/javascript': {'br': 5, 'gzip': 6},
+    'image/svg+xml': {'br': 5, 'gzip': 6},
+    'application/xml': {'br': 4, 'gzip': 6},
+}
+
+# Encodings in order of preference when the client accepts them equally
+ENCODINGS = ('br', 'gzip')
+
+def available_encodings() -> List[str]:
+    """
+    Encodings this process can produce
+    """
+    return [encoding for encoding in ENCODINGS if encoding != 'br' or brotli is not None]
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Pick the available encoding the client prefers from an Accept-Encoding header, or None
+    """
+    accepted = parse_accept_header(accept_encoding)
+    candidates = [(accepted[encoding], -index, encoding) for index, encoding in enumerate(available_encodings())]
+    quality, _, encoding = max(candidates, default=(0, 0, None))
+    return encoding if quality > 0 else None
+
+def _encoder(encoding: str, level: int) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """A (compress, finish) pair of functions for a streaming encoder"""
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=level)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    return compressor.compress, compressor.flush
+
+def _header(headers: List[Tuple[str, str]], name: str) -> Optional[str]:
+    name = name.lower()
+    return next((value for key, value in headers if key.lower() == name), None)
+
+def _set_header(headers: List[Tuple[str, str]], name: str, value: Optional[str]) -> None:
+    """Replace a header, or remove it when value is None"""
+    headers[:] = [(key, old) for key, old in headers if key.lower() != name.lower()]
+    if value is not None:
+        headers.append((name, value))
+
+class CompressionMiddleware:
+    """
+    WSGI middleware compressing responses whose content type has an entry in levels,
+    unless they are smaller than min_size, already encoded or marked no-transform
+    """
+
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE, levels: Optional[Dict[str, Dict[str, int]]] = None):
+        self.app = app
+        self.min_size = min_size
+        self.levels = dict(COMPRESSION_LEVELS if levels is None else levels)
+
+    def __call__(self, environ, start_response) -> Iterable[bytes]:
+        return self._respond(environ, start_response, negotiate_encoding(environ.get('HTTP_ACCEPT_ENCODING', '')))
+
+    def _levels_for(self, environ, status: str, headers: List[Tuple[str, str]]) -> Optional[Dict[str, int]]:
+        """The encoder levels for a response, or None when it must go out as is"""
+        code = int(status.split(None, 1)[0])
+        if environ.get('REQUEST_METHOD') == 'HEAD' or code < 200 or code in (204, 304):
+            return None
+        if _header(headers, 'Content-Encoding') is not None:
+            return None
+        if 'no-transform' in (_header(headers, 'Cache-Control') or '').lower():
+            return None
+        mimetype = (_header(headers, 'Content-Type') or '').split(';', 1)[0].strip().lower()
+        return self.levels.get(mimetype)
+
+    def _respond(self, environ, start_response, encoding: Optional[str]) -> Iterable[bytes]:
+        response = {}
+        pending: List[bytes] = []
+
+        def capture(status, headers, exc_info=None):
+            response['start'] = (status, list(headers), exc_info)
+            # Bodies written through the legacy write() callable go out before the iterable
+            return pending.append
+
+        app_iter = self.app(environ, capture)
+        try:
+            body = iter(app_iter)
+            exhausted = False
+
+            def undecided() -> bool:
+                # Hold back the start of the body until the headers are known and, without a
+                # Content-Length, until enough of it has arrived to tell whether compressing pays off
+                if 'start' not in response:
+                    return True
+                status, headers, _ = response['start']
+                return (encoding is not None and self._levels_for(environ, status, headers) is not None
+                        and _header(headers, 'Content-Length') is None and sum(map(len, pending)) < self.min_size)
+
+            while not exhausted and undecided():
+                try:
+                    pending.append(next(body))
+                except StopIteration:
+                    exhausted = True
+
+            status, headers, exc_info = response['start']
+            levels = self._levels_for(environ, status, headers)
+            if levels is not None:
+                # Caches must keep the encodings apart even when this response goes out uncompressed
+                vary = _header(headers, 'Vary')
+                if vary is None or 'accept-encoding' not in vary.lower():
+                    _set_header(headers, 'Vary', f"{vary}, Accept-Encoding" if vary else 'Accept-Encoding')
+
+            length = _header(headers, 'Content-Length')
+            size = int(length) if length is not None else sum(map(len, pending))
+            if levels is None or encoding is None or encoding not in levels or size < self.min_size:
+                start_response(status, headers, exc_info)
+                yield from pending
+                yield from body
+                return
+
+            _set_header(headers, 'Content-Encoding', encoding)
+            _set_header(headers, 'Content-Length', None)
+            # The compressed bytes differ from the original, so a strong validator would be wrong
+            etag = _header(headers, 'ETag')
+            if etag is not None and not etag.startswith('W/'):
+                _set_header(headers, 'ETag', 'W/' + etag)
+            start_response(status, headers, exc_info)
+
+            compress, finish = _encoder(encoding, levels[encoding])
+            for chunk in chain(pending, body):
+                compressed = compress(chunk)
+                if compressed:
+                    yield compressed
+            yield finish()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+def init_compression(app: Flask, levels: Optional[Dict[str, Dict[str, int]]] = None) -> None:
+    """
+    Compress the app's responses when COMPRESSION_ENABLED is set (the default)
+    """
+    if COMPRESSION_ENABLED:
+        app.wsgi_app = CompressionMiddleware(app.wsgi_app, levels=levels)
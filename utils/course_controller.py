@@ -3,36 +3,56 @@ Course controller utilities for the AI Agent System
 Provides functionality for course selection and scheduling
 """
 
-import os
-from flask import session
-from typing import Dict, List, Optional, Tuple
-from bson.objectid import ObjectId
-from .database import get_db_connection, get_collection, find_documents, insert_document, update_document
-from .mail import send_email_brevo, get_schedule_confirmation_email_template
+from datetime import datetime, timezone
+from html import escape
+from bson import ObjectId
+from bson.errors import InvalidId
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from .database import (get_db_connection, get_collection, find_documents, find_one_and_update, upsert_document,
+                       upsert_documents)
+from .catalog import COURSE_NAMES
+from .course_summary import record_enrollment, record_enrollments, summary_update
+from .models import User, Enrollment, ENROLLMENT_PROJECTION
+from .user_cache import get_user_by_id
+from .mail import render_schedule_confirmation_email, send_batch_email_brevo
+from .mail_queue import queue_email_brevo
 from .user_controller import BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME
+from .settings import get_settings
 
-# Course definitions
-COURSES = {
-    'python': 'Python Programming',
-    'java': 'Java Development',
-    'javascript': 'JavaScript Mastery',
-    'fullstack': 'Full-Stack Web Development',
-    'react': 'React Framework',
-    'datascience': 'Data Science Fundamentals',
-    'mobile': 'Mobile App Development',
-    'cloud': 'Cloud Computing & DevOps',
-    'cybersecurity': 'Cybersecurity Essentials',
-    'uiux': 'UI/UX Design',
-    'ai': 'AI & Machine Learning',
-    'blockchain': 'Blockchain Development'
-}
-
-def get_available_courses() -> Dict[str, str]:
+# Course definitions (id -> name), from the shared catalog
+COURSES = COURSE_NAMES
+
+# Schedule fields accepted from clients, and the values used when they are left out
+SCHEDULE_FIELDS = ('preferred_time', 'frequency', 'pace', 'notification_method', 'fullname', 'whatsapp', 'duration')
+SCHEDULE_DEFAULTS = {'frequency': 'daily', 'pace': 'intermediate'}
+
+settings = get_settings()
+
+# Bulk enrollment: signed-in users allowed to enroll others (comma-separated emails) and rows per request
+BULK_ENROLLMENT_ADMINS = settings.bulk_enrollment_admins
+BULK_ENROLLMENT_MAX_ROWS = settings.bulk_enrollment_max_rows
+
+def get_available_courses() -> Mapping[str, str]:
     """
     Get all available courses
     """
     return COURSES
 
+def enrollment_upsert(user_id: str, course_id: str, schedule: Dict,
+                      now: Optional[datetime] = None) -> Tuple[Dict, Dict]:
+    """
+    The (query, update) pair that creates a user's enrollment in a course, or refreshes it when it already
+    exists. Enrollments are unique per (user_id, course_id), so saving a schedule again never adds a copy.
+    """
+    now = now or datetime.now(timezone.utc)
+    return (
+        {'user_id': user_id, 'course_id': course_id},
+        {
+            '$set': {'course_name': COURSES[course_id], 'schedule': schedule, 'status': 'active', 'updated_at': now},
+            '$setOnInsert': {'created_at': now}
+        }
+    )
+
 def select_course(user_id: str, course_id: str, schedule: Dict) -> Tuple[bool, str]:
     """
     Select a course for a user and save their schedule preferences
@@ -46,20 +66,14 @@ def select_course(user_id: str, course_id: str, schedule: Dict) -> Tuple[bool, s
         if db is None:
             return False, "Unable to establish database connection. Please try again in a few moments."
         
-        # Create course enrollment document
-        enrollment = {
-            'user_id': user_id,
-            'course_id': course_id,
-            'course_name': COURSES[course_id],
-            'schedule': schedule,
-            'status': 'active'
-        }
-        
-        # Insert enrollment
+        # Create the enrollment, or update it if the user saved this course before, in one round trip
         collection = get_collection(db, 'course_enrollments')
-        result = insert_document(collection, enrollment)
+        query, update = enrollment_upsert(user_id, course_id, schedule)
+        result = upsert_document(collection, query, update)
         
         if result:
+            # Keep the user's course summary in step with the enrollment
+            record_enrollment(db, user_id, course_id, COURSES[course_id], 'active', schedule)
             return True, "Course enrollment successful. Your learning journey is about to begin!"
         else:
             return False, "Course enrollment failed. Please try again or contact support for assistance."
@@ -68,7 +82,192 @@ def select_course(user_id: str, course_id: str, schedule: Dict) -> Tuple[bool, s
         print(f"Error selecting course: {str(e)}")
         return False, "An unexpected error occurred during course enrollment. Please try again or contact support for assistance."
 
-def get_user_courses(user_id: str) -> Optional[List[Dict]]:
+def can_bulk_enroll(user_id: Optional[str]) -> bool:
+    """
+    Whether a signed-in user may enroll other users through the bulk enrollment API.
+    Decided by the verified email stored for the user id, never by session['email'],
+    which the password reset flow sets to whatever address was submitted.
+    """
+    if not user_id:
+        return False
+    try:
+        user = get_user_by_id(user_id)
+    except Exception as e:
+        print(f"Error checking bulk enrollment access: {str(e)}")
+        return False
+    return (user is not None and user.is_verified and bool(user.email)
+            and user.email.lower() in BULK_ENROLLMENT_ADMINS)
+
+def normalize_schedule(schedule: Any) -> Optional[Dict]:
+    """
+    Keep the known fields of a client-supplied schedule as strings, with defaults for frequency and pace.
+    Returns None if the schedule is not an object or holds a value that is not a string or number.
+    """
+    if schedule is None:
+        schedule = {}
+    if not isinstance(schedule, dict):
+        return None
+
+    normalized = {field: SCHEDULE_DEFAULTS.get(field) for field in SCHEDULE_FIELDS}
+    for field in SCHEDULE_FIELDS:
+        value = schedule.get(field)
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            return None
+        normalized[field] = str(value)
+    return normalized
+
+def _find_bulk_users(collection, user_ids: List[ObjectId], emails: List[str]) -> Optional[Dict[str, Dict]]:
+    """
+    Look up every referenced user in one query; returns the users keyed by id and by email
+    """
+    clauses = []
+    if user_ids:
+        clauses.append({'_id': {'$in': user_ids}})
+    if emails:
+        clauses.append({'email': {'$in': emails}})
+    if not clauses:
+        return {}
+
+    users = find_documents(collection, {'$or': clauses}, {'name': 1, 'email': 1})
+    if users is None:
+        return None
+    found = {}
+    for user in users:
+        found[str(user['_id'])] = user
+        found[user['email']] = user
+    return found
+
+def bulk_select_courses(entries: List[Any], notify: bool = False) -> List[Dict]:
+    """
+    Enroll many users at once. Each entry names a user by 'user_id' or 'email', a 'course_id' and an
+    optional 'schedule'. Entries are validated against the course catalog and the user table in one
+    pass, and the valid ones are upserted in a single unordered batch, so one bad row does not stop the rest
+    and re-sending a row updates its enrollment instead of adding a copy.
+    Returns one result per entry, in order, with 'index', 'success' and either 'created' (False when
+    an existing enrollment was updated) or 'error'. With notify, enrolled users get the schedule confirmation email.
+    """
+    results: List[Optional[Dict]] = [None] * len(entries)
+    enrolled: List[Tuple[Dict, Dict, str, Dict]] = []
+
+    def fail(index: int, message: str) -> None:
+        results[index] = {'index': index, 'success': False, 'error': message}
+
+    # Validate the rows and collect the users they refer to
+    pending = []
+    user_ids, emails = [], []
+    for index, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            fail(index, "Each enrollment must be an object.")
+            continue
+        course_id = entry.get('course_id')
+        if course_id not in COURSES:
+            fail(index, "The selected course is not available. Please choose a valid course from the catalog.")
+            continue
+        schedule = normalize_schedule(entry.get('schedule'))
+        if schedule is None:
+            fail(index, "The schedule must be an object of text values.")
+            continue
+
+        user_id, email = entry.get('user_id'), entry.get('email')
+        if isinstance(user_id, str) and user_id:
+            try:
+                user_ids.append(ObjectId(user_id))
+            except InvalidId:
+                fail(index, "The user id is not valid.")
+                continue
+            user_key = user_id
+        elif isinstance(email, str) and email:
+            emails.append(email)
+            user_key = email
+        else:
+            fail(index, "Each enrollment needs a user_id or an email.")
+            continue
+        pending.append((index, user_key, course_id, schedule))
+
+    try:
+        db = get_db_connection() if pending else None
+        if pending and db is None:
+            for index, *_ in pending:
+                fail(index, "Unable to establish database connection. Please try again in a few moments.")
+            pending = []
+
+        users = _find_bulk_users(get_collection(db, 'usertable'), user_ids, emails) if pending else {}
+        if users is None:
+            for index, *_ in pending:
+                fail(index, "Unable to look up the users. Please try again in a few moments.")
+            pending = []
+
+        # Build the upserts for rows whose user exists, once per (user, course)
+        rows, updates, seen = [], [], {}
+        now = datetime.now(timezone.utc)
+        for index, user_key, course_id, schedule in pending:
+            user = users.get(user_key)
+            if user is None:
+                fail(index, "No account found for this user.")
+                continue
+            key = (str(user['_id']), course_id)
+            if key in seen:
+                fail(index, f"This user is already enrolled in this course by row {seen[key]}.")
+                continue
+            seen[key] = index
+            rows.append((index, user, course_id, schedule))
+            updates.append(enrollment_upsert(str(user['_id']), course_id, schedule, now))
+
+        if updates:
+            outcome = upsert_documents(get_collection(db, 'course_enrollments'), updates, ordered=False)
+            upserted, errors = outcome if outcome is not None else ({}, None)
+            summaries = []
+            for position, (index, user, course_id, schedule) in enumerate(rows):
+                if errors is None or position in errors:
+                    print(f"Bulk enrollment row {index} failed: {errors[position] if errors else 'batch failed'}")
+                    fail(index, "Course enrollment failed. Please try again or contact support for assistance.")
+                    continue
+                results[index] = {'index': index, 'success': True, 'created': position in upserted,
+                                  'user_id': str(user['_id']), 'course_id': course_id}
+                summaries.append(summary_update(str(user['_id']), course_id, COURSES[course_id], 'active', schedule, now))
+                enrolled.append((results[index], user, course_id, schedule))
+            record_enrollments(db, summaries)
+
+    except Exception as e:
+        print(f"Error in bulk enrollment: {str(e)}")
+        for index, result in enumerate(results):
+            if result is None:
+                fail(index, "An unexpected error occurred during course enrollment. Please try again or contact support for assistance.")
+
+    if notify and enrolled:
+        send_bulk_confirmation_emails(enrolled)
+    return results
+
+def send_bulk_confirmation_emails(enrolled: List[Tuple[Dict, Dict, str, Dict]]) -> None:
+    """
+    Send the schedule confirmation email to the users of a bulk enrollment, given as (result, user, course_id,
+    schedule) tuples. Users with the same course and schedule get the same email, so each group goes out as
+    Brevo batch requests of up to BREVO_BATCH_SIZE recipients with the name filled in per recipient.
+    Sets 'notified' on each result.
+    """
+    groups: Dict[Tuple, List[Tuple[Dict, Dict]]] = {}
+    for result, user, course_id, schedule in enrolled:
+        shown = tuple(sorted((field, value) for field, value in schedule.items() if value is not None))
+        groups.setdefault((course_id, shown), []).append((result, user))
+
+    for (course_id, shown), members in groups.items():
+        try:
+            course_name = COURSES[course_id]
+            subject = f"AI Agent System - {course_name} Learning Schedule Confirmation"
+            # Brevo substitutes {{ params.name }} into the HTML per recipient, so the name is escaped here
+            html_content = render_schedule_confirmation_email('{{ params.name }}', course_name, dict(shown))
+            recipients = [{'email': user['email'], 'name': user.get('name'), 'params': {'name': escape(user.get('name') or '')}}
+                          for _, user in members]
+            sent = send_batch_email_brevo(recipients, subject, html_content, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME)
+        except Exception as e:
+            print(f"Error sending bulk confirmation emails: {str(e)}")
+            sent = [{'success': False}] * len(members)
+        for (result, _), outcome in zip(members, sent):
+            result['notified'] = outcome['success']
+
+def get_user_courses(user_id: str) -> Optional[List[Enrollment]]:
     """
     Get all courses for a user
     """
@@ -78,9 +277,11 @@ def get_user_courses(user_id: str) -> Optional[List[Dict]]:
             return None
             
         collection = get_collection(db, 'course_enrollments')
-        enrollments = find_documents(collection, {'user_id': user_id})
+        enrollments = find_documents(collection, {'user_id': user_id}, ENROLLMENT_PROJECTION)
+        if enrollments is None:
+            return None
         
-        return enrollments
+        return [Enrollment.from_document(enrollment) for enrollment in enrollments]
         
     except Exception as e:
         print(f"Error retrieving user courses: {str(e)}")
@@ -95,14 +296,18 @@ def update_course_schedule(user_id: str, course_id: str, schedule: Dict) -> Tupl
         if db is None:
             return False, "Unable to establish database connection. Please try again in a few moments."
             
+        # Return the updated enrollment in the same round trip, for the course summary
         collection = get_collection(db, 'course_enrollments')
-        result = update_document(
+        enrollment = find_one_and_update(
             collection,
             {'user_id': user_id, 'course_id': course_id},
-            {'$set': {'schedule': schedule}}
+            {'$set': {'schedule': schedule, 'updated_at': datetime.now(timezone.utc)}},
+            {'course_name': 1, 'status': 1},
+            return_updated=True
         )
         
-        if result:
+        if enrollment:
+            record_enrollment(db, user_id, course_id, enrollment.get('course_name'), enrollment.get('status'), schedule)
             return True, "Learning schedule updated successfully."
         else:
             return False, "Unable to update learning schedule. Please try again or contact support for assistance."
@@ -111,21 +316,12 @@ def update_course_schedule(user_id: str, course_id: str, schedule: Dict) -> Tupl
         print(f"Error updating course schedule: {str(e)}")
         return False, "An error occurred while updating your schedule. Please try again or contact support for assistance."
 
-def get_user_info(user_id: str) -> Optional[Dict]:
+def get_user_info(user_id: str) -> Optional[User]:
     """
-    Get user information by user ID
+    Get a user's name and email by user ID
     """
     try:
-        db = get_db_connection()
-        if db is None:
-            return None
-            
-        collection = get_collection(db, 'usertable')
-        users = find_documents(collection, {'_id': ObjectId(user_id)})
-        
-        if users:
-            return users[0]
-        return None
+        return get_user_by_id(user_id)
         
     except Exception as e:
         print(f"Error retrieving user info: {str(e)}")
@@ -136,26 +332,12 @@ def send_schedule_confirmation_email(user_email: str, user_name: str, course_nam
     Send a schedule confirmation email to the user
     """
     try:
-        # Format schedule details for the email
-        schedule_details = ""
-        if 'fullname' in schedule:
-            schedule_details += f"<div class='detail-item'><span class='detail-label'>Full Name:</span> {schedule['fullname']}</div>"
-        if 'duration' in schedule:
-            schedule_details += f"<div class='detail-item'><span class='detail-label'>Learning Duration:</span> {schedule['duration']} days</div>"
-        if 'preferred_time' in schedule:
-            schedule_details += f"<div class='detail-item'><span class='detail-label'>Preferred Time:</span> {schedule['preferred_time']}</div>"
-        if 'notification_method' in schedule:
-            method = schedule['notification_method'].replace('_', ' ').title()
-            schedule_details += f"<div class='detail-item'><span class='detail-label'>Notification Method:</span> {method}</div>"
-        if 'whatsapp' in schedule:
-            schedule_details += f"<div class='detail-item'><span class='detail-label'>WhatsApp:</span> {schedule['whatsapp']}</div>"
-        
-        # Generate email content
+        # Generate email content; the schedule rows are rendered and escaped by the template
         subject = f"AI Agent System - {course_name} Learning Schedule Confirmation"
-        html_content = get_schedule_confirmation_email_template(user_name, course_name, schedule_details)
+        html_content = render_schedule_confirmation_email(user_name, course_name, schedule)
         
-        # Send email
-        return send_email_brevo(user_email, subject, html_content, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME)
+        # Queue the email so the request does not wait on Brevo
+        return queue_email_brevo(user_email, subject, html_content, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME)
         
     except Exception as e:
         print(f"Error sending schedule confirmation email: {str(e)}")
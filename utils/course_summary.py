@@ -0,0 +1,241 @@
+"""
+Course summary utilities for the AI Agent System
+Keeps one small document per user listing their courses, statuses and next lesson times, so the
+"my courses" view is a single read by _id instead of a scan of the user's full enrollment documents
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+from .database import (get_db_connection, get_collection, find_one, find_documents, iter_documents,
+                       upsert_document, upsert_documents)
+from .models import CourseSummary, ENROLLMENT_PROJECTION
+from .settings import get_settings
+
+# One document per user: {'_id': user_id, 'courses': {course_id: entry}, 'updated_at': datetime}
+SUMMARY_COLLECTION = 'user_course_summaries'
+
+settings = get_settings()
+
+# Time zone the preferred lesson times are given in, and users written per bulk_write by a rebuild
+LESSON_TIMEZONE = ZoneInfo(settings.lesson_timezone)
+SUMMARY_REBUILD_BATCH_SIZE = settings.summary_rebuild_batch_size
+
+# Start of each named slot of the course agent form; the schedule form sends clock times like "2:00 PM"
+LESSON_SLOTS = {'morning': '08:00', 'afternoon': '12:00', 'evening': '17:00', 'night': '21:00'}
+LESSON_TIME_FORMATS = ('%I:%M %p', '%H:%M')
+
+# Days of the week (Monday is 0) on which each frequency has lessons; anything else is daily
+LESSON_DAYS = {'weekdays': frozenset(range(5)), 'weekends': frozenset({5, 6})}
+
+def parse_lesson_time(value: Optional[str]) -> Optional[str]:
+    """
+    Normalize a schedule's preferred_time to 24-hour "HH:MM", or None if it is not a time
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.lower() in LESSON_SLOTS:
+        return LESSON_SLOTS[value.lower()]
+    for time_format in LESSON_TIME_FORMATS:
+        try:
+            return datetime.strptime(value.upper(), time_format).strftime('%H:%M')
+        except ValueError:
+            continue
+    return None
+
+def next_lesson_at(lesson_time: Optional[str], frequency: Optional[str], after: datetime) -> Optional[datetime]:
+    """
+    The first lesson strictly after a moment (in UTC), for a "HH:MM" lesson time in LESSON_TIMEZONE
+    """
+    if not lesson_time:
+        return None
+
+    hour, minute = (int(part) for part in lesson_time.split(':'))
+    days = LESSON_DAYS.get(frequency)
+    local = after.astimezone(LESSON_TIMEZONE)
+    candidate = local.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if candidate <= local:
+        candidate += timedelta(days=1)
+    while days is not None and candidate.weekday() not in days:
+        candidate += timedelta(days=1)
+    return candidate.astimezone(timezone.utc)
+
+def summary_entry(course_id: str, course_name: Optional[str], status: Optional[str], schedule: Optional[Dict],
+                  now: datetime) -> Dict:
+    """
+    The summary of one enrollment, as stored in the courses map
+    """
+    schedule = schedule or {}
+    lesson_time = parse_lesson_time(schedule.get('preferred_time'))
+    frequency = schedule.get('frequency')
+    return {
+        'course_id': course_id,
+        'course_name': course_name,
+        'status': status,
+        'lesson_time': lesson_time,
+        'frequency': frequency,
+        'next_lesson_at': next_lesson_at(lesson_time, frequency, now) if status == 'active' else None
+    }
+
+def summary_update(user_id: str, course_id: str, course_name: Optional[str], status: Optional[str],
+                   schedule: Optional[Dict], now: Optional[datetime] = None) -> Tuple[Dict, Dict]:
+    """
+    The (query, update) pair that records an enrollment write in its user's summary, creating the summary if needed.
+    Only the course's own entry is replaced, so writes to different courses of a user never overwrite each other.
+    """
+    now = now or datetime.now(timezone.utc)
+    return (
+        {'_id': user_id},
+        {'$set': {f'courses.{course_id}': summary_entry(course_id, course_name, status, schedule, now), 'updated_at': now}}
+    )
+
+def record_enrollment(db, user_id: str, course_id: str, course_name: Optional[str], status: Optional[str],
+                      schedule: Optional[Dict]) -> bool:
+    """
+    Update a user's summary after one of their enrollments was written.
+    A failure leaves the summary stale until the next write of that course or a rebuild, but never fails the enrollment.
+    """
+    collection = get_collection(db, SUMMARY_COLLECTION)
+    return upsert_document(collection, *summary_update(user_id, course_id, course_name, status, schedule))
+
+def record_enrollments(db, updates: List[Tuple[Dict, Dict]]) -> bool:
+    """
+    Apply many summary_update() pairs in one unordered bulk_write; True if all of them were written
+    """
+    if not updates:
+        return True
+    outcome = upsert_documents(get_collection(db, SUMMARY_COLLECTION), updates, ordered=False)
+    return outcome is not None and not outcome[1]
+
+def _summaries(document: Optional[Dict], now: datetime) -> List[CourseSummary]:
+    """
+    The courses of a summary document, with lessons that have already passed moved on to the next one,
+    soonest lesson first and courses without a lesson last
+    """
+    summaries = []
+    for entry in (document or {}).get('courses', {}).values():
+        summary = CourseSummary.from_document(entry)
+        lesson = summary.next_lesson_at
+        # pymongo returns naive datetimes in UTC
+        if lesson is not None and lesson.tzinfo is None:
+            lesson = lesson.replace(tzinfo=timezone.utc)
+        if lesson is not None and lesson <= now:
+            lesson = next_lesson_at(summary.lesson_time, summary.frequency, now)
+        summary.next_lesson_at = lesson
+        summaries.append(summary)
+
+    return sorted(summaries, key=lambda summary: (summary.next_lesson_at is None,
+                                                  summary.next_lesson_at or now,
+                                                  summary.course_name or ''))
+
+def _courses_from_enrollments(enrollments: Iterable[Dict], now: datetime) -> Dict[str, Dict]:
+    """
+    Build a courses map from a user's enrollment documents
+    """
+    return {
+        enrollment['course_id']: summary_entry(enrollment['course_id'], enrollment.get('course_name'),
+                                               enrollment.get('status'), enrollment.get('schedule'), now)
+        for enrollment in enrollments
+    }
+
+def get_user_course_summary(user_id: str) -> Optional[List[CourseSummary]]:
+    """
+    Get a user's courses from their summary document, building it from the enrollments on first use
+    """
+    try:
+        db = get_db_connection()
+        if db is None:
+            return None
+
+        now = datetime.now(timezone.utc)
+        collection = get_collection(db, SUMMARY_COLLECTION)
+        document = find_one(collection, {'_id': user_id}, {'courses': 1})
+        if document is not None:
+            return _summaries(document, now)
+
+        enrollments = find_documents(get_collection(db, 'course_enrollments'), {'user_id': user_id}, ENROLLMENT_PROJECTION)
+        if enrollments is None:
+            return None
+        courses = _courses_from_enrollments(enrollments, now)
+        # $setOnInsert, so an enrollment recorded meanwhile is not overwritten with this older view
+        upsert_document(collection, {'_id': user_id}, {'$setOnInsert': {'courses': courses, 'updated_at': now}})
+        return _summaries({'courses': courses}, now)
+
+    except Exception as e:
+        print(f"Error retrieving course summary: {str(e)}")
+        return None
+
+def rebuild_course_summaries(db, user_id: Optional[str] = None) -> Optional[int]:
+    """
+    Rebuild the summaries of every user (or of one user) from their enrollments, repairing any drift.
+    Enrollments are streamed in (user_id, course_id) index order and written in batches of
+    SUMMARY_REBUILD_BATCH_SIZE users; summaries of users without enrollments are removed.
+    Returns the number of summaries written, or None on failure.
+    """
+    try:
+        started = datetime.now(timezone.utc)
+        enrollments = get_collection(db, 'course_enrollments')
+        summaries = get_collection(db, SUMMARY_COLLECTION)
+        query = {'user_id': user_id} if user_id is not None else {}
+        documents = iter_documents(enrollments, query, ENROLLMENT_PROJECTION,
+                                   sort=[('user_id', 1), ('course_id', 1)], batch_size=1000)
+
+        written = 0
+        batch: List[Tuple[Dict, Dict]] = []
+
+        def flush() -> None:
+            nonlocal written
+            if batch and not record_enrollments(db, batch):
+                raise RuntimeError("Summary batch write failed")
+            written += len(batch)
+            batch.clear()
+
+        current, courses = None, []
+        for document in documents:
+            if document['user_id'] != current:
+                if courses:
+                    batch.append(({'_id': current}, {'$set': {'courses': _courses_from_enrollments(courses, started),
+                                                              'updated_at': started}}))
+                current, courses = document['user_id'], []
+                if len(batch) >= SUMMARY_REBUILD_BATCH_SIZE:
+                    flush()
+            courses.append(document)
+        if courses:
+            batch.append(({'_id': current}, {'$set': {'courses': _courses_from_enrollments(courses, started),
+                                                      'updated_at': started}}))
+        flush()
+
+        # Summaries not written by this rebuild or an enrollment since it started belong to users with no enrollments
+        stale = {'updated_at': {'$lt': started}}
+        if user_id is not None:
+            stale['_id'] = user_id
+        summaries.delete_many(stale)
+        return written
+
+    except Exception as e:
+        print(f"Error rebuilding course summaries: {str(e)}")
+        return None
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: rebuild every summary, or one user's with --user
+    """
+    parser = argparse.ArgumentParser(description='Rebuild the per-user course summaries from the enrollments')
+    parser.add_argument('--user', default=None, help='only rebuild the summary of this user id')
+    args = parser.parse_args(argv)
+
+    db = get_db_connection()
+    if db is None:
+        print("Failed to connect to database")
+        return 1
+
+    written = rebuild_course_summaries(db, args.user)
+    if written is None:
+        return 1
+    print(f"Rebuilt {written} course summaries")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
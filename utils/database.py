@@ -4,43 +4,161 @@ Provides functionality equivalent to connection.php in the original PHP implemen
 """
 
 import os
-from typing import Dict, Any, Optional
-from pymongo import MongoClient
+import threading
+from typing import Dict, Any, Iterator, List, Optional, Tuple, Union
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
 from pymongo.database import Database
 from pymongo.collection import Collection
+from .settings import get_settings
 
-# Database configuration for MongoDB
-MONGO_URI = os.environ.get('MONGO_URI', 'mongodb://localhost:27017/ai_agent_system')
-DB_NAME = os.environ.get('DB_NAME', 'ai_agent_system')
+# Database configuration for MongoDB (get_settings() loads .env first, so scripts that
+# import this module before calling load_dotenv() still see the configured values)
+settings = get_settings()
+MONGO_URI = settings.mongo_uri
+DB_NAME = settings.db_name
+
+# Connection pool configuration (all values can be tuned from the environment)
+MONGO_MAX_POOL_SIZE = settings.mongo_max_pool_size
+MONGO_MIN_POOL_SIZE = settings.mongo_min_pool_size
+MONGO_MAX_IDLE_TIME_MS = settings.mongo_max_idle_time_ms
+MONGO_CONNECT_TIMEOUT_MS = settings.mongo_connect_timeout_ms
+MONGO_SERVER_SELECTION_TIMEOUT_MS = settings.mongo_server_selection_timeout_ms
+MONGO_SOCKET_TIMEOUT_MS = settings.mongo_socket_timeout_ms
+
+# One pooled client per process, created lazily on first use
+_client: Optional[MongoClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+def get_client_options() -> Dict[str, Any]:
+    """
+    Build the MongoClient keyword arguments from the pool configuration
+    """
+    return {
+        'maxPoolSize': MONGO_MAX_POOL_SIZE,
+        'minPoolSize': MONGO_MIN_POOL_SIZE,
+        'maxIdleTimeMS': MONGO_MAX_IDLE_TIME_MS,
+        'connectTimeoutMS': MONGO_CONNECT_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'socketTimeoutMS': MONGO_SOCKET_TIMEOUT_MS,
+        # Defer connecting until the first operation so a client created in a
+        # prefork master never opens sockets that the workers would inherit
+        'connect': False,
+    }
+
+def get_client() -> MongoClient:
+    """
+    Return the process-wide pooled MongoClient, creating it on first use.
+    A new client is built after a fork, since pymongo clients are not fork-safe.
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            # The inherited client belongs to the parent; drop it without
+            # closing so the parent's sockets are left untouched
+            _client = MongoClient(MONGO_URI, **get_client_options())
+            _client_pid = pid
+        return _client
+
+def close_client() -> None:
+    """
+    Close the pooled client of the current process, if any
+    """
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+        _client = None
+        _client_pid = None
+
+def _reset_client_after_fork() -> None:
+    """
+    Forget the parent's client in a freshly forked child
+    """
+    global _client, _client_pid, _client_lock
+
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_client_after_fork)
 
 def get_db_connection() -> Optional[Database]:
     """
-    Create and return a MongoDB database connection
+    Return the application database from the pooled client
     Equivalent to the mysqli_connect in connection.php
     """
     try:
-        # Create connection using MONGO_URI
-        client = MongoClient(MONGO_URI)
-        db = client[DB_NAME]
-        # Test the connection
-        client.admin.command('ping')
-        return db
+        return get_client()[DB_NAME]
     except Exception as e:
         print(f"Connection failed: {str(e)}")
         return None
 
+def ping_database() -> bool:
+    """
+    Check that the database server is reachable
+    """
+    try:
+        get_client().admin.command('ping')
+        return True
+    except Exception as e:
+        print(f"Connection failed: {str(e)}")
+        return False
+
 def get_collection(db: Database, collection_name: str) -> Collection:
     """
     Get a collection from the database
     """
     return db[collection_name]
 
-def find_documents(collection: Collection, query: Dict) -> Optional[list]:
+def find_documents(collection: Collection, query: Dict, projection: Optional[Union[Dict, List[str]]] = None) -> Optional[list]:
     """
     Find documents in a collection
     """
     try:
-        return list(collection.find(query))
+        return list(collection.find(query, projection))
+    except Exception as e:
+        print(f"Query execution failed: {str(e)}")
+        return None
+
+def iter_documents(collection: Collection, query: Dict, projection: Optional[Union[Dict, List[str]]] = None,
+                   sort: Optional[List[Tuple[str, int]]] = None, limit: int = 0,
+                   batch_size: Optional[int] = None, max_time_ms: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Stream documents from a collection one at a time instead of loading them all into memory.
+    Errors are raised to the caller so a failed scan is never mistaken for a short one.
+    """
+    cursor = collection.find(query, projection)
+    if sort:
+        cursor = cursor.sort(sort)
+    if limit:
+        cursor = cursor.limit(limit)
+    if batch_size:
+        cursor = cursor.batch_size(batch_size)
+    if max_time_ms:
+        cursor = cursor.max_time_ms(max_time_ms)
+
+    try:
+        for document in cursor:
+            yield document
+    finally:
+        cursor.close()
+
+def find_one(collection: Collection, query: Dict, projection: Optional[Union[Dict, List[str]]] = None,
+             sort: Optional[List[Tuple[str, int]]] = None, max_time_ms: Optional[int] = None) -> Optional[Dict]:
+    """
+    Find the first document matching a query
+    """
+    try:
+        return collection.find_one(query, projection, sort=sort, max_time_ms=max_time_ms)
     except Exception as e:
         print(f"Query execution failed: {str(e)}")
         return None
@@ -56,6 +174,49 @@ def insert_document(collection: Collection, document: Dict) -> Optional[str]:
         print(f"Insert execution failed: {str(e)}")
         return None
 
+def _write_errors(error: BulkWriteError, count: int, ordered: bool) -> Dict[int, str]:
+    """
+    Error message of every operation of a failed batch that was not applied, by position
+    """
+    errors = {item['index']: item.get('errmsg', 'Write failed') for item in error.details.get('writeErrors', [])}
+    if ordered and errors:
+        # An ordered batch stops at its first failure; nothing after it was written
+        first = min(errors)
+        errors.update({index: 'Not attempted after an earlier failure' for index in range(first + 1, count)})
+    return errors
+
+def insert_documents(collection: Collection, documents: List[Dict], ordered: bool = False) -> Optional[Dict[int, str]]:
+    """
+    Insert many documents in one batch. Each inserted document gets its _id set; returns the error
+    message for every document that was not inserted, by position (empty when all were), or None
+    if the batch failed as a whole. Unordered batches keep going past failed documents.
+    """
+    try:
+        collection.insert_many(documents, ordered=ordered)
+        return {}
+    except BulkWriteError as e:
+        return _write_errors(e, len(documents), ordered)
+    except Exception as e:
+        print(f"Insert execution failed: {str(e)}")
+        return None
+
+def upsert_documents(collection: Collection, updates: List[Tuple[Dict, Dict]],
+                     ordered: bool = False) -> Optional[Tuple[Dict[int, Any], Dict[int, str]]]:
+    """
+    Apply many (query, update) upserts in one batch. Returns the _id of every inserted document and the
+    error message of every failed upsert, both by position, or None if the batch failed as a whole.
+    """
+    try:
+        result = collection.bulk_write([UpdateOne(query, update, upsert=True) for query, update in updates],
+                                       ordered=ordered)
+        return dict(result.upserted_ids), {}
+    except BulkWriteError as e:
+        upserted = {item['index']: item['_id'] for item in e.details.get('upserted', [])}
+        return upserted, _write_errors(e, len(updates), ordered)
+    except Exception as e:
+        print(f"Upsert execution failed: {str(e)}")
+        return None
+
 def update_document(collection: Collection, query: Dict, update: Dict) -> bool:
     """
     Update documents in a collection
@@ -67,6 +228,34 @@ def update_document(collection: Collection, query: Dict, update: Dict) -> bool:
         print(f"Update execution failed: {str(e)}")
         return False
 
+def upsert_document(collection: Collection, query: Dict, update: Dict) -> bool:
+    """
+    Update the document matching a query, inserting it if there is none
+    """
+    try:
+        collection.update_one(query, update, upsert=True)
+        return True
+    except Exception as e:
+        print(f"Upsert execution failed: {str(e)}")
+        return False
+
+def find_one_and_update(collection: Collection, query: Dict, update: Dict,
+                        projection: Optional[Union[Dict, List[str]]] = None,
+                        return_updated: bool = False) -> Optional[Dict]:
+    """
+    Atomically update the first document matching a query and return it in one round trip
+    """
+    try:
+        return collection.find_one_and_update(
+            query,
+            update,
+            projection=projection,
+            return_document=ReturnDocument.AFTER if return_updated else ReturnDocument.BEFORE
+        )
+    except Exception as e:
+        print(f"Update execution failed: {str(e)}")
+        return None
+
 def delete_document(collection: Collection, query: Dict) -> bool:
     """
     Delete documents from a collection
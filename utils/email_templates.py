@@ -0,0 +1,59 @@
+"""
+Email template rendering for the AI Agent System
+Renders the HTML email templates in templates/email with one module-level Jinja environment,
+so each template is compiled once per process and every value is escaped unless marked |safe
+"""
+
+import os
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, Template
+
+EMAIL_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates', 'email')
+
+# Schedule fields shown in the confirmation email, in display order
+SCHEDULE_DETAIL_LABELS = (
+    ('fullname', 'Full Name'),
+    ('duration', 'Learning Duration'),
+    ('preferred_time', 'Preferred Time'),
+    ('notification_method', 'Notification Method'),
+    ('whatsapp', 'WhatsApp'),
+)
+
+# The templates only change with a deploy, so they are never checked for changes once loaded;
+# a missing value is an error rather than a blank so a broken email is never sent
+EMAIL_ENV = Environment(
+    loader=FileSystemLoader(EMAIL_TEMPLATE_DIR),
+    autoescape=True,
+    undefined=StrictUndefined,
+    auto_reload=False
+)
+
+@lru_cache(maxsize=None)
+def get_email_template(name: str) -> Template:
+    """
+    Get a compiled email template; each template file is read and compiled once
+    """
+    return EMAIL_ENV.get_template(name)
+
+def render_email(name: str, **context: Any) -> str:
+    """
+    Render an email template, escaping every value not marked |safe
+    """
+    return get_email_template(name).render(**context)
+
+def schedule_rows(schedule: Dict) -> List[Tuple[str, str]]:
+    """
+    The (label, value) detail rows of a schedule for the confirmation email
+    """
+    rows = []
+    for key, label in SCHEDULE_DETAIL_LABELS:
+        if key not in schedule:
+            continue
+        value = schedule[key]
+        if key == 'duration':
+            value = f"{value} days"
+        elif key == 'notification_method':
+            value = str(value).replace('_', ' ').title()
+        rows.append((label, value))
+    return rows
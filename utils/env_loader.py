@@ -5,6 +5,7 @@ Provides functionality equivalent to env_loader.php in the original PHP implemen
 
 import os
 from typing import Optional
+from .settings import ENV_FILE, load_environment
 
 def load_env(file_path: str) -> bool:
     """
@@ -60,9 +61,9 @@ def get_env_variable(key: str, default: Optional[str] = None) -> Optional[str]:
     print(f"❌ Environment variable not found: {key}")
     return default
 
-# Load the .env file from the same directory
-env_file_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env')
-env_loaded = load_env(env_file_path)
+# Load the .env file from the same directory, once per process and without printing its values
+env_file_path = ENV_FILE
+env_loaded = load_environment(env_file_path)
 
 if not env_loaded:
     print("❌ CRITICAL: Failed to load .env file")
\ No newline at end of file
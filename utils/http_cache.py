@@ -0,0 +1,136 @@
+"""
+HTTP caching for rendered pages in the AI Agent System
+Computes an ETag from what a page depends on, answers If-None-Match with 304 before rendering,
+and can keep rendered output in memory keyed by the same ETag
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from flask import Response, current_app, make_response, render_template, request, session
+from .assets import manifest_version
+from .catalog import CATALOG_VERSION
+from .settings import get_settings
+
+settings = get_settings()
+
+# Caching configuration
+HTTP_CACHE_ENABLED = settings.http_cache_enabled
+PAGE_CACHE_ENABLED = settings.page_cache_enabled
+PAGE_CACHE_TTL = settings.page_cache_ttl
+PAGE_CACHE_MAX_ENTRIES = settings.page_cache_max_entries
+
+# Rendered pages show the user's name, so browsers may keep them but shared caches must not,
+# and browsers must revalidate before reusing them
+PAGE_CACHE_CONTROL = 'private, no-cache'
+
+class PageCache:
+    """A thread-safe TTL and LRU cache of rendered pages keyed by ETag"""
+
+    def __init__(self, ttl: float = PAGE_CACHE_TTL, max_entries: int = PAGE_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, Tuple[str, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, etag: str) -> Optional[str]:
+        """Get a live rendered page"""
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is None or entry[1] <= time.monotonic():
+                if entry is not None:
+                    del self._entries[etag]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(etag)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, etag: str, body: str) -> None:
+        """Remember a rendered page, evicting the least recently used beyond max_entries"""
+        with self._lock:
+            self._entries[etag] = (body, time.monotonic() + self.ttl)
+            self._entries.move_to_end(etag)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Forget every page"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit and miss counters and current size"""
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+# Process-wide rendered-output cache, used when PAGE_CACHE_ENABLED is set
+page_cache = PageCache()
+
+# Source hash per template name, so editing a template changes its pages' ETags
+_template_versions: Dict[str, str] = {}
+
+def template_version(template_name: str) -> str:
+    """
+    Hash of a template's source; recomputed on every call while templates auto-reload (debug)
+    """
+    version = _template_versions.get(template_name)
+    if version is None or current_app.jinja_env.auto_reload:
+        source = current_app.jinja_env.loader.get_source(current_app.jinja_env, template_name)[0]
+        version = _template_versions[template_name] = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+    return version
+
+def _csrf_window() -> int:
+    """
+    Time bucket that forces pages with signed CSRF tokens to be re-rendered
+    while their tokens still have at least half of their lifetime left
+    """
+    time_limit = current_app.config.get('WTF_CSRF_TIME_LIMIT', 3600)
+    return int(time.time() // (time_limit / 2)) if time_limit else 0
+
+def page_etag(template_name: str, key: Tuple, csrf: bool = False) -> Optional[str]:
+    """
+    ETag for a page from everything its output depends on. Returns None for a page with
+    CSRF tokens whose session has no CSRF secret yet, since that page cannot be revalidated.
+    """
+    parts = [template_name, template_version(template_name), CATALOG_VERSION, manifest_version(), request.script_root]
+    parts.extend(str(part) for part in key)
+    if csrf:
+        secret = session.get(current_app.config.get('WTF_CSRF_FIELD_NAME', 'csrf_token'))
+        if secret is None:
+            return None
+        parts.extend((str(secret), str(_csrf_window())))
+    return hashlib.sha256('\x1f'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+def _apply_policy(response: Response, etag: Optional[str]) -> Response:
+    """Add the caching headers shared by 200 and 304 responses"""
+    if etag is not None:
+        response.set_etag(etag)
+    response.headers['Cache-Control'] = PAGE_CACHE_CONTROL
+    response.vary.add('Cookie')
+    return response
+
+def render_cached(template_name: str, key: Tuple = (), csrf: bool = False, **context: Any) -> Response:
+    """
+    Render a template with ETag revalidation. key lists every request value that changes the output
+    (the template, catalog and asset versions and app root are always included); pass csrf=True
+    for pages that call csrf_token(), which ties the ETag to the session's CSRF secret.
+    """
+    if not HTTP_CACHE_ENABLED:
+        return make_response(render_template(template_name, **context))
+
+    etag = page_etag(template_name, key, csrf)
+    # Weak comparison, since the compression middleware weakens the ETags of compressed pages
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        return _apply_policy(Response(status=304), etag)
+
+    body = page_cache.get(etag) if PAGE_CACHE_ENABLED and etag is not None else None
+    if body is None:
+        body = render_template(template_name, **context)
+        if PAGE_CACHE_ENABLED and etag is not None:
+            page_cache.put(etag, body)
+    return _apply_policy(make_response(body), etag)
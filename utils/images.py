@@ -0,0 +1,100 @@
+"""
+Responsive image variants for the AI Agent System
+Resizes the raster images in static/ to a set of widths in AVIF, WebP and PNG for the asset build,
+caching each derivative on disk under the hash of its source so unchanged images are not re-encoded
+"""
+
+import hashlib
+import io
+import os
+from typing import Dict, List, Optional
+from .settings import get_settings
+
+settings = get_settings()
+
+IMAGE_CACHE_DIR = settings.image_cache_dir
+
+# Target widths in CSS pixels x density; widths above the source width are skipped
+IMAGE_WIDTHS = settings.image_widths
+
+# Encoder settings per output format, in order of preference for <picture>
+IMAGE_FORMATS = (
+    ('avif', 'image/avif', {'quality': 50}),
+    ('webp', 'image/webp', {'quality': 80, 'method': 6}),
+    ('png', 'image/png', {'optimize': True}),
+)
+
+IMAGE_EXTENSIONS = {'.png', '.jpg', '.jpeg'}
+
+def _pillow():
+    """
+    Import Pillow on first use, since only the asset build needs it.
+    Returns (Image, features), or (None, None) when Pillow is not installed.
+    """
+    try:
+        from PIL import Image, features
+    except ImportError:  # optional: the asset build skips image variants without Pillow
+        return None, None
+    return Image, features
+
+def available_formats() -> List[str]:
+    """
+    Output formats the installed Pillow can encode
+    """
+    Image, features = _pillow()
+    if Image is None:
+        return []
+    return [name for name, _, _ in IMAGE_FORMATS if name == 'png' or features.check(name)]
+
+def _encode(image, image_format: str) -> bytes:
+    """Encode an image with the format's settings"""
+    options = next(settings for name, _, settings in IMAGE_FORMATS if name == image_format)
+    output = io.BytesIO()
+    image.save(output, format=image_format.upper(), **options)
+    return output.getvalue()
+
+def build_image_variants(content: bytes, cache_dir: str = IMAGE_CACHE_DIR) -> Optional[Dict]:
+    """
+    Get an image's width and its resized variants as dicts of width, format and cached file path.
+    The original size is always included (except as PNG, where the original file is used),
+    and each derivative is encoded only once per source hash, width and format.
+    Returns None when Pillow is not installed or cannot decode the image.
+    """
+    formats = available_formats()
+    if not formats:
+        return None
+
+    Image = _pillow()[0]
+    digest = hashlib.sha256(content).hexdigest()[:16]
+    try:
+        source = Image.open(io.BytesIO(content))
+        source.load()
+    except (OSError, ValueError) as e:
+        print(f"Skipping image variants: {str(e)}")
+        return None
+    source_width, source_height = source.size
+    widths = [width for width in IMAGE_WIDTHS if width < source_width] + [source_width]
+
+    variants = []
+    for image_format in formats:
+        for width in widths:
+            if image_format == 'png' and width == source_width:
+                continue
+            path = os.path.join(cache_dir, digest, f"{width}w.{image_format}")
+            if not os.path.exists(path):
+                height = max(1, round(source_height * width / source_width))
+                resized = source if width == source_width else source.resize((width, height), Image.LANCZOS)
+                encoded = _encode(resized, image_format)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                # Write then rename, so an interrupted build never leaves a truncated derivative
+                with open(path + '.tmp', 'wb') as f:
+                    f.write(encoded)
+                os.replace(path + '.tmp', path)
+            variants.append({'width': width, 'format': image_format, 'file': path})
+    return {'width': source_width, 'variants': variants}
+
+def mime_type(image_format: str) -> Optional[str]:
+    """
+    MIME type of an output format, for <source type="...">
+    """
+    return next((mime for name, mime, _ in IMAGE_FORMATS if name == image_format), None)
@@ -3,15 +3,15 @@ Email utilities for the AI Agent System
 Provides functionality equivalent to PHPMailer in the original PHP implementation
 """
 
-import smtplib
 import os
-import requests
-import json
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
-import ssl
+from typing import Dict, Iterable, List, Optional
+from .email_templates import render_email, schedule_rows
+from .settings import get_settings
+
+settings = get_settings()
+
+# Maximum number of message versions (recipients) sent in one Brevo API call
+BREVO_BATCH_SIZE = settings.brevo_batch_size
 
 class Mailer:
     """A Python equivalent of PHPMailer for sending emails"""
@@ -77,6 +77,13 @@ class Mailer:
             
     def send(self):
         """Send the email"""
+        # Imported on first send: the MIME modules and smtplib are rarely used and slow down cold starts
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+        from email.mime.base import MIMEBase
+        from email import encoders
+        from .smtp_pool import get_smtp_pool
+
         try:
             # Create message
             msg = MIMEMultipart()
@@ -111,23 +118,14 @@ class Mailer:
                 )
                 msg.attach(part)
             
-            # Create SMTP session
-            if self.smtp_secure == 'ssl':
-                context = ssl.create_default_context()
-                server = smtplib.SMTP_SSL(self.smtp_host, self.smtp_port, context=context)
-            else:
-                server = smtplib.SMTP(self.smtp_host, self.smtp_port)
-                if self.smtp_secure == 'tls':
-                    server.starttls()
-                    
-            # Login and send
-            server.login(self.smtp_username, self.smtp_password)
+            # Send through the shared pool of authenticated sessions for this server, which
+            # reconnects transparently and splits long recipient lists into several transactions
+            pool = get_smtp_pool(self.smtp_host, self.smtp_port, self.smtp_username, self.smtp_password, self.smtp_secure)
             text = msg.as_string()
             
             # Send to all recipients
             all_recipients = [addr[0] for addr in self.to_addresses + self.cc_addresses + self.bcc_addresses]
-            server.sendmail(self.from_email, all_recipients, text)
-            server.quit()
+            pool.sendmail(self.from_email, all_recipients, text)
             
             return True
             
@@ -135,48 +133,128 @@ class Mailer:
             print(f"Error sending email: {str(e)}")
             return False
 
+def brevo_email_payload(to, subject, html_content, sender_email, sender_name) -> Dict:
+    """
+    Build the Brevo /smtp/email payload for a single recipient
+    """
+    return {
+        "sender": {
+            "name": sender_name,
+            "email": sender_email
+        },
+        "to": [
+            {
+                "email": to,
+                "name": to.split('@')[0] if '@' in to else "User"
+            }
+        ],
+        "subject": subject,
+        "htmlContent": html_content
+    }
+
 # Function to send email using Brevo API (updated to use API instead of SMTP)
 def send_email_brevo(to, subject, html_content, api_key, sender_email, sender_name):
     """
     Send email using Brevo API (equivalent to the PHP function)
     """
+    # Imported on first send, so loading this module does not import requests
+    from .brevo import get_brevo_transport
+
     try:
         # Use Brevo API instead of SMTP for better reliability
-        url = "https://api.brevo.com/v3/smtp/email"
-        headers = {
-            "api-key": api_key,
-            "Content-Type": "application/json"
-        }
+        payload = brevo_email_payload(to, subject, html_content, sender_email, sender_name)
         
-        payload = {
-            "sender": {
-                "name": sender_name,
-                "email": sender_email
-            },
-            "to": [
-                {
-                    "email": to,
-                    "name": to.split('@')[0] if '@' in to else "User"
-                }
-            ],
-            "subject": subject,
-            "htmlContent": html_content
-        }
-        
-        response = requests.post(url, headers=headers, data=json.dumps(payload))
+        # The shared transport reuses connections and retries rate limits and server errors
+        response = get_brevo_transport().post('/smtp/email', payload, api_key)
         
-        if response.status_code in [200, 201]:
+        if response is not None and response.status_code in [200, 201]:
             return True
-        else:
+        elif response is not None:
             print(f"Error sending email via Brevo API: {response.status_code} - {response.text}")
             return False
+        else:
+            print("Error sending email via Brevo API: no response received")
+            return False
             
     except Exception as e:
         print(f"Error sending email via Brevo: {str(e)}")
         return False
 
+def _chunks(items: List, size: int) -> Iterable[List]:
+    """
+    Split a list into consecutive chunks of at most size items
+    """
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+# Function to send one email template to many recipients using Brevo message versions
+def send_batch_email_brevo(recipients: List[Dict], subject: str, html_content: str, api_key, sender_email, sender_name,
+                           chunk_size: Optional[int] = None) -> List[Dict]:
+    """
+    Send one template to many recipients, grouping them into Brevo multi-version payloads.
+    Each recipient is a dict with 'email' and optional 'name', 'params' (for {{ params.* }}
+    placeholders in the template) and 'subject'. Returns one result per recipient, in order,
+    with 'email', 'success', 'status_code', 'message_id' and 'error'.
+    """
+    from .brevo import get_brevo_transport
+
+    chunk_size = chunk_size or BREVO_BATCH_SIZE
+    results = []
+
+    for chunk in _chunks(list(recipients), chunk_size):
+        message_versions = []
+        for recipient in chunk:
+            version = {
+                "to": [
+                    {
+                        "email": recipient['email'],
+                        "name": recipient.get('name') or (recipient['email'].split('@')[0] if '@' in recipient['email'] else "User")
+                    }
+                ]
+            }
+            if recipient.get('params'):
+                version["params"] = recipient['params']
+            if recipient.get('subject'):
+                version["subject"] = recipient['subject']
+            message_versions.append(version)
+
+        payload = {
+            "sender": {
+                "name": sender_name,
+                "email": sender_email
+            },
+            "subject": subject,
+            "htmlContent": html_content,
+            "messageVersions": message_versions
+        }
+
+        try:
+            response = get_brevo_transport().post('/smtp/email', payload, api_key)
+            status_code = response.status_code if response is not None else None
+            if response is not None and status_code in [200, 201]:
+                message_ids = response.json().get('messageIds', [])
+                error = None
+            else:
+                message_ids = []
+                error = response.text if response is not None else "no response received"
+                print(f"Error sending batch email via Brevo API: {status_code} - {error}")
+        except Exception as e:
+            status_code, message_ids, error = None, [], str(e)
+            print(f"Error sending batch email via Brevo: {error}")
+
+        for index, recipient in enumerate(chunk):
+            results.append({
+                'email': recipient['email'],
+                'success': error is None,
+                'status_code': status_code,
+                'message_id': message_ids[index] if index < len(message_ids) else None,
+                'error': error
+            })
+
+    return results
+
 # Function to generate OTP email template (equivalent to PHP function)
-def get_otp_email_template(otp_code, type='verification'):
+def get_otp_email_template(otp_code, type='verification', expires_in_minutes=10):
     """
     Generate beautiful OTP email template (equivalent to the PHP function)
     """
@@ -187,85 +265,20 @@ def get_otp_email_template(otp_code, type='verification'):
         title = "Email Verification Code"
         message = "Your verification code for AI Agent System"
     
-    return f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; background: #0c0c17; color: #fff; margin: 0; padding: 20px; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: rgba(12, 12, 23, 0.9); border: 1px solid #00ff9d; border-radius: 10px; padding: 30px; }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .logo {{ font-size: 2.5rem; color: #00ff9d; margin-bottom: 10px; }}
-            .title {{ font-size: 1.5rem; color: #00ff9d; margin-bottom: 10px; }}
-            .otp-code {{ background: rgba(0, 255, 157, 0.1); border: 2px solid #00ff9d; border-radius: 8px; padding: 20px; text-align: center; font-size: 2rem; font-weight: bold; letter-spacing: 5px; margin: 20px 0; color: #00ff9d; }}
-            .footer {{ margin-top: 30px; text-align: center; font-size: 0.8rem; color: #888; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="logo">🤖 AI AGENT SYSTEM</div>
-                <h1 class="title">{title}</h1>
-            </div>
-            <p>Hello,</p>
-            <p>{message}</p>
-            <div class="otp-code">{otp_code}</div>
-            <p>This code will expire in 10 minutes. Please do not share this code with anyone.</p>
-            <div class="footer">
-                <p>If you didn't request this code, please ignore this email.</p>
-                <p>&copy; 2024 AI Agent System. All rights reserved.</p>
-            </div>
-        </div>
-    </body>
-    </html>'''
+    return render_email('otp.html', title=title, message=message, otp_code=otp_code,
+                        expires_in_minutes=expires_in_minutes)
 
 # Function to generate schedule confirmation email template
 def get_schedule_confirmation_email_template(user_name, course_name, schedule_details):
     """
-    Generate beautiful schedule confirmation email template
+    Generate beautiful schedule confirmation email template from pre-rendered detail HTML
     """
-    return f'''
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <style>
-            body {{ font-family: Arial, sans-serif; background: #0c0c17; color: #fff; margin: 0; padding: 20px; }}
-            .container {{ max-width: 600px; margin: 0 auto; background: rgba(12, 12, 23, 0.9); border: 1px solid #00ff9d; border-radius: 10px; padding: 30px; }}
-            .header {{ text-align: center; margin-bottom: 30px; }}
-            .logo {{ font-size: 2.5rem; color: #00ff9d; margin-bottom: 10px; }}
-            .title {{ font-size: 1.5rem; color: #00ff9d; margin-bottom: 10px; }}
-            .course-info {{ background: rgba(0, 255, 157, 0.1); border: 2px solid #00ff9d; border-radius: 8px; padding: 20px; margin: 20px 0; }}
-            .schedule-details {{ background: rgba(0, 255, 157, 0.05); border-radius: 8px; padding: 15px; margin: 15px 0; }}
-            .detail-item {{ margin: 10px 0; }}
-            .detail-label {{ font-weight: bold; color: #00ff9d; }}
-            .footer {{ margin-top: 30px; text-align: center; font-size: 0.8rem; color: #888; }}
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <div class="header">
-                <div class="logo">🤖 AI AGENT SYSTEM</div>
-                <h1 class="title">Learning Schedule Confirmation</h1>
-            </div>
-            <p>Hello {user_name},</p>
-            <p>Congratulations! Your learning schedule has been successfully set up.</p>
-            
-            <div class="course-info">
-                <h2>{course_name}</h2>
-                <p>Your personalized learning journey is about to begin!</p>
-            </div>
-            
-            <div class="schedule-details">
-                <h3>Schedule Details:</h3>
-                {schedule_details}
-            </div>
-            
-            <p>You'll receive your first lesson according to your schedule. Make sure to check your email (and spam folder) for your lessons.</p>
-            <p>If you have any questions or need to modify your schedule, please visit your dashboard.</p>
-            
-            <div class="footer">
-                <p>&copy; 2025 AI Agent System. All rights reserved.</p>
-            </div>
-        </div>
-    </body>
-    </html>'''
+    return render_email('schedule_confirmation.html', user_name=user_name, course_name=course_name,
+                        schedule_details=schedule_details)
+
+def render_schedule_confirmation_email(user_name, course_name, schedule):
+    """
+    Generate the schedule confirmation email directly from a schedule document
+    """
+    return render_email('schedule_confirmation.html', user_name=user_name, course_name=course_name,
+                        schedule_rows=schedule_rows(schedule))
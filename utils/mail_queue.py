@@ -0,0 +1,204 @@
+"""
+Background mail dispatcher for the AI Agent System
+Hands outbound email to a bounded in-process queue served by worker threads, so requests never wait on Brevo
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from .settings import get_settings
+
+settings = get_settings()
+
+# Dispatcher configuration; MAIL_ASYNC defaults to off on Vercel, where queued mail could be lost
+MAIL_ASYNC = settings.mail_async
+MAIL_QUEUE_SIZE = settings.mail_queue_size
+MAIL_WORKERS = settings.mail_workers
+MAIL_ENQUEUE_TIMEOUT = settings.mail_enqueue_timeout
+MAIL_DRAIN_TIMEOUT = settings.mail_drain_timeout
+
+# Queue item telling a worker to exit
+_STOP = object()
+
+class MailDispatcher:
+    """A bounded queue of send jobs served by a small pool of worker threads"""
+
+    def __init__(self, max_queue_size: int = MAIL_QUEUE_SIZE, workers: int = MAIL_WORKERS,
+                 enqueue_timeout: float = MAIL_ENQUEUE_TIMEOUT):
+        self.max_queue_size = max_queue_size
+        self.worker_count = max(1, workers)
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+        # Metrics
+        self._enqueued = 0
+        self._sent = 0
+        self._failed = 0
+        self._inline = 0
+        self._rejected = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._total_send = 0.0
+        self._max_send = 0.0
+
+    def _start(self) -> None:
+        """Start the worker threads on first use"""
+        with self._lock:
+            if self._threads:
+                return
+            for index in range(self.worker_count):
+                thread = threading.Thread(target=self._work, name=f"mail-worker-{index}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, send: Callable[..., bool], *args: Any, **kwargs: Any) -> bool:
+        """
+        Queue a send job. When the queue stays full for longer than enqueue_timeout the
+        job runs on the caller's thread instead, which slows producers down rather than
+        dropping mail. Returns False only when an inline send fails or the dispatcher is closed.
+        """
+        if self._closed:
+            with self._lock:
+                self._rejected += 1
+            return False
+
+        self._start()
+        try:
+            self._queue.put((time.monotonic(), send, args, kwargs), timeout=self.enqueue_timeout)
+        except queue.Full:
+            with self._lock:
+                self._inline += 1
+            return self._run(time.monotonic(), send, args, kwargs)
+
+        with self._lock:
+            self._enqueued += 1
+        return True
+
+    def _run(self, queued_at: float, send: Callable[..., bool], args: tuple, kwargs: Dict) -> bool:
+        """Execute one send job and record its latency"""
+        started = time.monotonic()
+        try:
+            success = bool(send(*args, **kwargs))
+        except Exception as e:
+            print(f"Error sending queued email: {str(e)}")
+            success = False
+        finished = time.monotonic()
+
+        with self._lock:
+            wait, duration = started - queued_at, finished - started
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            self._total_send += duration
+            self._max_send = max(self._max_send, duration)
+            if success:
+                self._sent += 1
+            else:
+                self._failed += 1
+        return success
+
+    def _work(self) -> None:
+        """Worker loop: run queued jobs until told to stop"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._run(*item)
+            finally:
+                self._queue.task_done()
+
+    def shutdown(self, timeout: float = MAIL_DRAIN_TIMEOUT) -> bool:
+        """
+        Stop accepting mail and wait up to timeout seconds for queued jobs to finish.
+        Returns True when the queue was fully drained.
+        """
+        self._closed = True
+        deadline = time.monotonic() + timeout
+
+        for _ in self._threads:
+            try:
+                self._queue.put(_STOP, timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Full:
+                break
+        for thread in self._threads:
+            thread.join(max(0.0, deadline - time.monotonic()))
+
+        return not any(thread.is_alive() for thread in self._threads) and self._queue.empty()
+
+    def stats(self) -> Dict[str, float]:
+        """Queue depth, throughput counters and latency figures in seconds"""
+        with self._lock:
+            completed = self._sent + self._failed
+            return {
+                'queue_depth': self._queue.qsize(),
+                'queue_capacity': self.max_queue_size,
+                'enqueued': self._enqueued,
+                'sent': self._sent,
+                'failed': self._failed,
+                'inline': self._inline,
+                'rejected': self._rejected,
+                'avg_wait': self._total_wait / completed if completed else 0.0,
+                'max_wait': self._max_wait,
+                'avg_send': self._total_send / completed if completed else 0.0,
+                'max_send': self._max_send,
+            }
+
+# One dispatcher per process, created lazily on first use
+_dispatcher: Optional[MailDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+def get_mail_dispatcher() -> MailDispatcher:
+    """
+    Return the process-wide mail dispatcher, creating it on first use
+    """
+    global _dispatcher
+
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = MailDispatcher()
+    return _dispatcher
+
+def shutdown_mail_dispatcher(timeout: float = MAIL_DRAIN_TIMEOUT) -> bool:
+    """
+    Drain and stop the process-wide dispatcher, if one was started
+    """
+    global _dispatcher
+
+    with _dispatcher_lock:
+        dispatcher, _dispatcher = _dispatcher, None
+    if dispatcher is None:
+        return True
+    return dispatcher.shutdown(timeout)
+
+def _reset_dispatcher_after_fork() -> None:
+    """
+    Worker threads do not survive a fork, so a child starts with a fresh dispatcher
+    """
+    global _dispatcher, _dispatcher_lock
+
+    _dispatcher = None
+    _dispatcher_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_dispatcher_after_fork)
+
+atexit.register(shutdown_mail_dispatcher)
+
+def queue_email_brevo(to, subject, html_content, api_key, sender_email, sender_name) -> bool:
+    """
+    Send an email through Brevo without blocking the current request.
+    Takes the same arguments as send_email_brevo; sends inline when MAIL_ASYNC is off
+    (serverless platforms may freeze background threads once the response is sent).
+    """
+    from .mail import send_email_brevo
+
+    if not MAIL_ASYNC:
+        return send_email_brevo(to, subject, html_content, api_key, sender_email, sender_name)
+    return get_mail_dispatcher().submit(send_email_brevo, to, subject, html_content, api_key, sender_email, sender_name)
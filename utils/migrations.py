@@ -0,0 +1,235 @@
+"""
+Schema migration and index utilities for the AI Agent System
+Declares the indexes the controllers rely on and applies them as versioned, idempotent migrations
+"""
+
+import argparse
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+from bson.objectid import ObjectId
+from pymongo import ASCENDING
+from pymongo.collection import Collection
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+from .course_summary import SUMMARY_COLLECTION, rebuild_course_summaries
+from .database import get_db_connection, get_collection
+
+MIGRATIONS_COLLECTION = 'schema_migrations'
+
+def _drop_index_if_exists(collection: Collection, name: str) -> None:
+    """
+    Drop an index, ignoring the error raised when it does not exist
+    """
+    try:
+        collection.drop_index(name)
+    except OperationFailure as e:
+        if e.code != 27:  # IndexNotFound
+            raise
+
+def _migration_0001_base_indexes(db: Database) -> None:
+    """
+    Create the indexes described in MONGODB_SCHEMA.md
+    """
+    users = get_collection(db, 'usertable')
+    users.create_index([('email', ASCENDING)], unique=True, name='email_1')
+    users.create_index([('code', ASCENDING)], name='code_1')
+
+    enrollments = get_collection(db, 'course_enrollments')
+    enrollments.create_index([('user_id', ASCENDING), ('course_id', ASCENDING)], name='user_id_1_course_id_1')
+
+def _migration_0002_otp_lookup_index(db: Database) -> None:
+    """
+    OTP codes are now looked up per email, so replace the global code index with (email, code)
+    """
+    users = get_collection(db, 'usertable')
+    users.create_index([('email', ASCENDING), ('code', ASCENDING)], name='email_1_code_1')
+    _drop_index_if_exists(users, 'code_1')
+
+def _migration_0003_session_expiry_index(db: Database) -> None:
+    """
+    Let MongoDB delete server-side sessions once their expires_at has passed
+    """
+    sessions = get_collection(db, 'sessions')
+    sessions.create_index([('expires_at', ASCENDING)], expireAfterSeconds=0, name='expires_at_ttl')
+
+def _migration_0004_unique_enrollments(db: Database) -> None:
+    """
+    Collapse duplicate (user_id, course_id) enrollments into the most recently saved one, add created_at and
+    updated_at, and make the pair unique so enrollment writes can be upserts
+    """
+    enrollments = get_collection(db, 'course_enrollments')
+    duplicates = enrollments.aggregate([
+        {'$sort': {'_id': -1}},
+        {'$group': {'_id': {'user_id': '$user_id', 'course_id': '$course_id'},
+                    'ids': {'$push': '$_id'}, 'count': {'$sum': 1}}},
+        {'$match': {'count': {'$gt': 1}}},
+    ], allowDiskUse=True)
+    for group in duplicates:
+        newest, older = group['ids'][0], group['ids'][1:]
+        # The enrollment began when the first of its copies was saved
+        enrollments.update_one({'_id': newest, 'created_at': {'$exists': False}},
+                               {'$set': {'created_at': older[-1].generation_time,
+                                         'updated_at': newest.generation_time}})
+        enrollments.delete_many({'_id': {'$in': older}})
+
+    # Documents written before this migration were saved when their ObjectId was generated
+    enrollments.update_many({'created_at': {'$exists': False}}, [{'$set': {'created_at': {'$toDate': '$_id'}}}])
+    enrollments.update_many({'updated_at': {'$exists': False}}, [{'$set': {'updated_at': {'$toDate': '$_id'}}}])
+
+    # Same key pattern as the base index, so it has to be dropped before it can become unique
+    _drop_index_if_exists(enrollments, 'user_id_1_course_id_1')
+    enrollments.create_index([('user_id', ASCENDING), ('course_id', ASCENDING)], unique=True,
+                             name='user_id_1_course_id_1')
+
+def _migration_0005_course_summaries(db: Database) -> None:
+    """
+    Build the per-user course summaries from the existing enrollments; enrollment writes keep them up to date from here on
+    """
+    if rebuild_course_summaries(db) is None:
+        raise RuntimeError("Building the course summaries failed")
+
+# Ordered list of (version, description, migration function).
+# Append new migrations at the end; never renumber or edit an applied one.
+MIGRATIONS: List[Tuple[int, str, Callable[[Database], None]]] = [
+    (1, 'Create usertable and course_enrollments indexes', _migration_0001_base_indexes),
+    (2, 'Index OTP codes by (email, code)', _migration_0002_otp_lookup_index),
+    (3, 'Expire server-side sessions with a TTL index', _migration_0003_session_expiry_index),
+    (4, 'Deduplicate enrollments and make (user_id, course_id) unique', _migration_0004_unique_enrollments),
+    (5, 'Build the per-user course summaries', _migration_0005_course_summaries),
+]
+
+# Queries issued by the controllers on every request, checked by explain_hot_queries().
+# The values are placeholders: only the shape of the filter matters to the planner.
+HOT_QUERIES: List[Tuple[str, str, Dict]] = [
+    ('user by email', 'usertable', {'email': 'user@example.com'}),
+    ('user by id', 'usertable', {'_id': ObjectId()}),
+    ('user by email and otp code', 'usertable', {'email': 'user@example.com', 'code': 123456}),
+    ('session by id', 'sessions', {'_id': 'session-id'}),
+    ('enrollments by user', 'course_enrollments', {'user_id': '000000000000000000000000'}),
+    ('enrollment by user and course', 'course_enrollments', {'user_id': '000000000000000000000000', 'course_id': 'python'}),
+    ('course summary by user', SUMMARY_COLLECTION, {'_id': '000000000000000000000000'}),
+]
+
+# Plan stages that read through an index rather than scanning the collection
+INDEX_STAGES = {'IXSCAN', 'IDHACK', 'EXPRESS_IXSCAN', 'EXPRESS_IDHACK'}
+
+def get_applied_versions(db: Database) -> List[int]:
+    """
+    Get the versions of all migrations already applied to the database
+    """
+    collection = get_collection(db, MIGRATIONS_COLLECTION)
+    return sorted(doc['_id'] for doc in collection.find({}, {'_id': 1}))
+
+def get_pending_migrations(db: Database) -> List[Tuple[int, str, Callable[[Database], None]]]:
+    """
+    Get the migrations that have not been applied yet, in order
+    """
+    applied = set(get_applied_versions(db))
+    return [migration for migration in MIGRATIONS if migration[0] not in applied]
+
+def apply_migrations(db: Database, target: Optional[int] = None) -> List[int]:
+    """
+    Apply every pending migration up to and including the target version.
+    Migrations are idempotent, so concurrent runs from several workers are harmless.
+    """
+    applied = []
+    collection = get_collection(db, MIGRATIONS_COLLECTION)
+
+    for version, description, migrate in get_pending_migrations(db):
+        if target is not None and version > target:
+            break
+
+        migrate(db)
+        collection.update_one(
+            {'_id': version},
+            {'$set': {'description': description, 'applied_at': datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        applied.append(version)
+
+    return applied
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """
+    Flatten the stage names of an explain() plan tree
+    """
+    stages = [plan.get('stage', '')]
+    if 'inputStage' in plan:
+        stages.extend(_plan_stages(plan['inputStage']))
+    for child in plan.get('inputStages', []):
+        stages.extend(_plan_stages(child))
+    return stages
+
+def query_uses_index(explain_output: Dict) -> bool:
+    """
+    Check whether the winning plan of an explain() result reads through an index
+    """
+    winning_plan = explain_output.get('queryPlanner', {}).get('winningPlan', {})
+    # Servers using the slot-based engine nest the classic plan under 'queryPlan'
+    winning_plan = winning_plan.get('queryPlan', winning_plan)
+    return any(stage in INDEX_STAGES for stage in _plan_stages(winning_plan))
+
+def explain_hot_queries(db: Database) -> Dict[str, bool]:
+    """
+    Run explain() on every hot controller query and report whether it uses an index
+    """
+    results = {}
+    for name, collection_name, query in HOT_QUERIES:
+        collection = get_collection(db, collection_name)
+        results[name] = query_uses_index(collection.find(query).explain())
+    return results
+
+def run_startup_migrations() -> bool:
+    """
+    Apply pending migrations when the application starts
+    """
+    try:
+        db = get_db_connection()
+        if db is None:
+            return False
+
+        applied = apply_migrations(db)
+        if applied:
+            print(f"✅ Applied database migrations: {applied}")
+        return True
+
+    except Exception as e:
+        print(f"Migration failed: {str(e)}")
+        return False
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: migrate, status or explain
+    """
+    parser = argparse.ArgumentParser(description='Manage AI Agent System database migrations')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    migrate_parser = subparsers.add_parser('migrate', help='apply pending migrations')
+    migrate_parser.add_argument('--target', type=int, default=None, help='stop after this version')
+    subparsers.add_parser('status', help='list applied and pending migrations')
+    subparsers.add_parser('explain', help='check that hot queries use an index')
+    args = parser.parse_args(argv)
+
+    db = get_db_connection()
+    if db is None:
+        print("Failed to connect to database")
+        return 1
+
+    if args.command == 'migrate':
+        applied = apply_migrations(db, args.target)
+        print(f"Applied migrations: {applied}" if applied else "Database is up to date")
+        return 0
+
+    if args.command == 'status':
+        applied = set(get_applied_versions(db))
+        for version, description, _ in MIGRATIONS:
+            marker = '✓' if version in applied else ' '
+            print(f"[{marker}] {version:04d} {description}")
+        return 0
+
+    results = explain_hot_queries(db)
+    for name, uses_index in results.items():
+        print(f"{'✓' if uses_index else '✗'} {name}: {'index scan' if uses_index else 'COLLECTION SCAN'}")
+    return 0 if all(results.values()) else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
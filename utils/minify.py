@@ -0,0 +1,44 @@
+"""
+CSS and JS minification for the AI Agent System asset build
+Deliberately conservative: only comments and whitespace that can never change meaning are removed,
+so the output behaves exactly like the hand-written source in static/
+"""
+
+import re
+
+# Strings and comments in one pass, so comment markers inside strings are left alone
+_CSS_STRING = r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\''
+_CSS_COMMENTS = re.compile(r'(' + _CSS_STRING + r')|/\*.*?\*/', re.S)
+_CSS_STRINGS = re.compile(r'(' + _CSS_STRING + r')')
+_CSS_SPACE = re.compile(r'\s+')
+_CSS_PUNCTUATION = re.compile(r'\s*([{};,])\s*')
+_CSS_AFTER_COLON = re.compile(r':\s+')
+_CSS_LAST_SEMICOLON = re.compile(r';}')
+
+def _minify_css_code(code: str) -> str:
+    """Collapse the whitespace of CSS that contains no strings or comments"""
+    code = _CSS_SPACE.sub(' ', code)
+    code = _CSS_PUNCTUATION.sub(r'\1', code)
+    # Only the space after a colon is safe to drop: in ".nav :hover" the space before it is a combinator
+    code = _CSS_AFTER_COLON.sub(':', code)
+    return _CSS_LAST_SEMICOLON.sub('}', code)
+
+def minify_css(source: str) -> str:
+    """
+    Remove comments and redundant whitespace and semicolons from a stylesheet
+    """
+    # A comment becomes a space so the tokens on either side stay apart
+    source = _CSS_COMMENTS.sub(lambda match: match.group(1) or ' ', source)
+    # Split on strings: the odd items are strings, which are kept verbatim
+    parts = _CSS_STRINGS.split(source)
+    return ''.join(part if index % 2 else _minify_css_code(part) for index, part in enumerate(parts)).strip()
+
+def minify_js(source: str) -> str:
+    """
+    Strip indentation, blank lines and whole-line // comments from a script.
+    Line breaks are kept, so automatic semicolon insertion still sees the same statements.
+    """
+    lines = (line.strip() for line in source.splitlines())
+    return '\n'.join(line for line in lines if line and not line.startswith('//')) + '\n'
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
@@ -0,0 +1,136 @@
+"""
+Lightweight document models for the AI Agent System
+Slotted classes built from projection-limited queries, so a request only fetches and keeps the fields it uses
+"""
+
+from datetime import datetime
+from typing import Dict, Optional
+from bson.objectid import ObjectId
+
+# Projections used by the routes and controllers (_id is always returned)
+USER_PROFILE_PROJECTION = {'name': 1, 'email': 1, 'status': 1}
+ENROLLMENT_PROJECTION = {'user_id': 1, 'course_id': 1, 'course_name': 1, 'schedule': 1, 'status': 1}
+
+class User:
+    """A usertable document without its password hash"""
+
+    __slots__ = ('id', 'name', 'email', 'status', 'code')
+
+    def __init__(self, id: Optional[ObjectId] = None, name: Optional[str] = None, email: Optional[str] = None,
+                 status: Optional[str] = None, code: Optional[int] = None):
+        self.id = id
+        self.name = name
+        self.email = email
+        self.status = status
+        self.code = code
+
+    @classmethod
+    def from_document(cls, document: Optional[Dict]) -> Optional['User']:
+        """
+        Build a user from a (possibly projected) usertable document
+        """
+        if document is None:
+            return None
+        return cls(
+            document.get('_id'),
+            document.get('name'),
+            document.get('email'),
+            document.get('status'),
+            document.get('code')
+        )
+
+    @property
+    def is_verified(self) -> bool:
+        """Whether the user completed email verification"""
+        return self.status == 'verified'
+
+    @property
+    def has_pending_code(self) -> bool:
+        """Whether a verification or reset code is outstanding"""
+        return bool(self.code)
+
+    @property
+    def member_since(self) -> str:
+        """Account creation date, taken from the ObjectId timestamp"""
+        if isinstance(self.id, ObjectId):
+            return self.id.generation_time.strftime('%B %d, %Y')
+        return 'N/A'
+
+    def __repr__(self) -> str:
+        return f"User(id={self.id!r}, email={self.email!r}, status={self.status!r})"
+
+class Enrollment:
+    """A course_enrollments document"""
+
+    __slots__ = ('id', 'user_id', 'course_id', 'course_name', 'schedule', 'status')
+
+    def __init__(self, id: Optional[ObjectId] = None, user_id: Optional[str] = None, course_id: Optional[str] = None,
+                 course_name: Optional[str] = None, schedule: Optional[Dict] = None, status: Optional[str] = None):
+        self.id = id
+        self.user_id = user_id
+        self.course_id = course_id
+        self.course_name = course_name
+        self.schedule = schedule if schedule is not None else {}
+        self.status = status
+
+    @classmethod
+    def from_document(cls, document: Optional[Dict]) -> Optional['Enrollment']:
+        """
+        Build an enrollment from a (possibly projected) course_enrollments document
+        """
+        if document is None:
+            return None
+        return cls(
+            document.get('_id'),
+            document.get('user_id'),
+            document.get('course_id'),
+            document.get('course_name'),
+            document.get('schedule'),
+            document.get('status')
+        )
+
+    def __repr__(self) -> str:
+        return f"Enrollment(user_id={self.user_id!r}, course_id={self.course_id!r}, status={self.status!r})"
+
+class CourseSummary:
+    """One course of a user_course_summaries document"""
+
+    __slots__ = ('course_id', 'course_name', 'status', 'lesson_time', 'frequency', 'next_lesson_at')
+
+    def __init__(self, course_id: Optional[str] = None, course_name: Optional[str] = None, status: Optional[str] = None,
+                 lesson_time: Optional[str] = None, frequency: Optional[str] = None,
+                 next_lesson_at: Optional[datetime] = None):
+        self.course_id = course_id
+        self.course_name = course_name
+        self.status = status
+        self.lesson_time = lesson_time
+        self.frequency = frequency
+        self.next_lesson_at = next_lesson_at
+
+    @classmethod
+    def from_document(cls, document: Optional[Dict]) -> Optional['CourseSummary']:
+        """
+        Build a course summary from an entry of a summary document's courses map
+        """
+        if document is None:
+            return None
+        return cls(
+            document.get('course_id'),
+            document.get('course_name'),
+            document.get('status'),
+            document.get('lesson_time'),
+            document.get('frequency'),
+            document.get('next_lesson_at')
+        )
+
+    def to_dict(self) -> Dict:
+        """The JSON form used by the enrollments API"""
+        return {
+            'course_id': self.course_id,
+            'course_name': self.course_name,
+            'status': self.status,
+            'next_lesson_at': self.next_lesson_at.isoformat() if self.next_lesson_at else None
+        }
+
+    def __repr__(self) -> str:
+        return f"CourseSummary(course_id={self.course_id!r}, status={self.status!r}, next_lesson_at={self.next_lesson_at!r})"
@@ -0,0 +1,143 @@
+"""
+Password hashing for the AI Agent System
+Runs the password KDF in a pool of worker processes, so a burst of signups and logins does not
+occupy the request threads, and tells when a stored hash was made with outdated parameters
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from werkzeug.security import check_password_hash, generate_password_hash
+from .settings import get_settings
+
+settings = get_settings()
+
+# Hashing configuration: the algorithm is scrypt or pbkdf2:<digest>; iterations is the pbkdf2
+# iteration count or the scrypt cost N (0 keeps the algorithm's default below)
+PASSWORD_HASH_ALGORITHM = settings.password_hash_algorithm
+PASSWORD_HASH_ITERATIONS = settings.password_hash_iterations
+
+# Worker processes for hashing (default 2, or 0 on Vercel); 0 hashes on the calling thread
+PASSWORD_HASH_WORKERS = settings.password_hash_workers
+PASSWORD_HASH_TIMEOUT = settings.password_hash_timeout
+
+DEFAULT_ITERATIONS = {'pbkdf2': 600000, 'scrypt': 32768}
+
+def hash_method(algorithm: str = PASSWORD_HASH_ALGORITHM, iterations: int = PASSWORD_HASH_ITERATIONS) -> str:
+    """
+    Werkzeug method string for an algorithm and iteration count, e.g. pbkdf2:sha256:600000 or scrypt:32768:8:1
+    """
+    name, _, digest = algorithm.partition(':')
+    if name not in DEFAULT_ITERATIONS:
+        raise ValueError(f"Unsupported password hash algorithm: {algorithm}")
+    iterations = iterations or DEFAULT_ITERATIONS[name]
+    if name == 'scrypt':
+        return f"scrypt:{iterations}:8:1"
+    return f"pbkdf2:{digest or 'sha256'}:{iterations}"
+
+# Method used for new hashes; stored hashes made with any other method are rehashed on login
+PASSWORD_HASH_METHOD = hash_method()
+
+# One pool per process, created on first use
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_pid: Optional[int] = None
+_pool_unavailable = False
+_pool_lock = threading.Lock()
+
+def get_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Get the process-wide hashing pool, or None when hashing runs on the calling thread
+    (PASSWORD_HASH_WORKERS is 0, or the platform cannot start worker processes)
+    """
+    global _pool, _pool_pid, _pool_unavailable
+
+    if PASSWORD_HASH_WORKERS <= 0 or _pool_unavailable:
+        return None
+    pid = os.getpid()
+    if _pool is not None and _pool_pid == pid:
+        return _pool
+
+    with _pool_lock:
+        if _pool is None or _pool_pid != pid:
+            try:
+                # spawn, not fork: forking a threaded server process can deadlock the child
+                _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS,
+                                            mp_context=multiprocessing.get_context('spawn'))
+                _pool_pid = pid
+            except (OSError, NotImplementedError) as e:
+                # e.g. serverless runtimes without /dev/shm
+                print(f"Password hashing pool unavailable, hashing inline: {str(e)}")
+                _pool_unavailable = True
+                return None
+    return _pool
+
+def shutdown_pool() -> None:
+    """
+    Stop the hashing workers of this process
+    """
+    global _pool
+
+    with _pool_lock:
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+atexit.register(shutdown_pool)
+
+def _run(function: Callable, *args: Any) -> Any:
+    """Run a hashing function in the pool, falling back to the calling thread if the pool broke"""
+    pool = get_pool()
+    if pool is None:
+        return function(*args)
+    try:
+        return pool.submit(function, *args).result(timeout=PASSWORD_HASH_TIMEOUT)
+    except BrokenProcessPool as e:
+        print(f"Password hashing pool failed, hashing inline: {str(e)}")
+        shutdown_pool()
+        return function(*args)
+
+async def _run_async(function: Callable, *args: Any) -> Any:
+    """Await a hashing function in the pool (or the event loop's default threads) without blocking the loop"""
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(get_pool(), function, *args), PASSWORD_HASH_TIMEOUT)
+    except BrokenProcessPool as e:
+        print(f"Password hashing pool failed, hashing in a thread: {str(e)}")
+        shutdown_pool()
+        return await loop.run_in_executor(None, function, *args)
+
+def hash_password(password: str) -> str:
+    """
+    Hash a password with the configured method
+    """
+    return _run(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+def verify_password(password_hash: str, password: str) -> bool:
+    """
+    Check a password against a stored hash made with any supported method
+    """
+    return _run(check_password_hash, password_hash, password)
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password from a coroutine; the event loop keeps serving other requests meanwhile
+    """
+    return await _run_async(generate_password_hash, password, PASSWORD_HASH_METHOD)
+
+async def verify_password_async(password_hash: str, password: str) -> bool:
+    """
+    Check a password from a coroutine; the event loop keeps serving other requests meanwhile
+    """
+    return await _run_async(check_password_hash, password_hash, password)
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Whether a stored hash was made with a different method or parameters than the configured ones
+    """
+    return password_hash.split('$', 1)[0] != PASSWORD_HASH_METHOD
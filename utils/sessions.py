@@ -0,0 +1,248 @@
+"""
+Server-side sessions for the AI Agent System
+The session cookie carries only an opaque id; the data lives in memory or in MongoDB,
+is loaded on first access and written back only when the request changed it
+"""
+
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, Optional, Tuple
+from flask import Flask
+from flask.sessions import SessionInterface, SessionMixin
+from .database import get_db_connection, get_collection, find_one, upsert_document, delete_document
+from .settings import get_settings
+
+settings = get_settings()
+
+# Session configuration: SESSION_BACKEND is cookie (Flask's signed cookie), memory or mongo
+SESSION_BACKEND = settings.session_backend
+SESSION_LIFETIME = settings.session_lifetime
+SESSION_MEMORY_MAX_ENTRIES = settings.session_memory_max_entries
+
+SESSIONS_COLLECTION = 'sessions'
+
+# Session ids are 256-bit urlsafe tokens; anything else in the cookie is ignored
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+class MemorySessionStore:
+    """Sessions kept in this process, with expiry and LRU eviction"""
+
+    def __init__(self, lifetime: int = SESSION_LIFETIME, max_entries: int = SESSION_MEMORY_MAX_ENTRIES):
+        self.lifetime = lifetime
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, Tuple[Dict, float]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load(self, sid: str) -> Optional[Dict]:
+        """Get a copy of a live session's data"""
+        with self._lock:
+            entry = self._entries.get(sid)
+            if entry is None:
+                return None
+            data, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[sid]
+                return None
+            self._entries.move_to_end(sid)
+            return dict(data)
+
+    def save(self, sid: str, data: Dict) -> bool:
+        """Store a session's data, evicting the least recently used sessions beyond max_entries"""
+        with self._lock:
+            self._entries[sid] = (dict(data), time.monotonic() + self.lifetime)
+            self._entries.move_to_end(sid)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return True
+
+    def delete(self, sid: str) -> None:
+        """Forget a session"""
+        with self._lock:
+            self._entries.pop(sid, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class MongoSessionStore:
+    """Sessions kept in the sessions collection, expired by a TTL index on expires_at"""
+
+    def __init__(self, lifetime: int = SESSION_LIFETIME, collection_name: str = SESSIONS_COLLECTION):
+        self.lifetime = lifetime
+        self.collection_name = collection_name
+
+    def _collection(self):
+        db = get_db_connection()
+        return get_collection(db, self.collection_name) if db is not None else None
+
+    def load(self, sid: str) -> Optional[Dict]:
+        """Get a live session's data; the TTL monitor only runs once a minute, so expiry is checked here too"""
+        collection = self._collection()
+        if collection is None:
+            return None
+        document = find_one(
+            collection,
+            {'_id': sid, 'expires_at': {'$gt': datetime.now(timezone.utc)}},
+            {'data': 1}
+        )
+        return document.get('data', {}) if document else None
+
+    def save(self, sid: str, data: Dict) -> bool:
+        """Store a session's data and push back its expiry"""
+        collection = self._collection()
+        if collection is None:
+            return False
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.lifetime)
+        return upsert_document(collection, {'_id': sid}, {'$set': {'data': data, 'expires_at': expires_at}})
+
+    def delete(self, sid: str) -> None:
+        """Forget a session"""
+        collection = self._collection()
+        if collection is not None:
+            delete_document(collection, {'_id': sid})
+
+class ServerSideSession(SessionMixin):
+    """A session that fetches its data from the store on first access and tracks changes"""
+
+    def __init__(self, store, sid: Optional[str] = None):
+        self.store = store
+        self.sid = sid
+        self.stale_sid: Optional[str] = None
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+        self._data: Optional[Dict] = {} if sid is None else None
+
+    @property
+    def data(self) -> Dict:
+        """The session data, loaded from the store the first time it is needed"""
+        self.accessed = True
+        if self._data is None:
+            loaded = self.store.load(self.sid)
+            if loaded is None:
+                # Unknown or expired id: start over with a fresh one rather than reviving it
+                self.sid, self.new = None, True
+                loaded = {}
+            self._data = loaded
+        return self._data
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the store has been read during this request"""
+        return self._data is not None
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.data[key] = value
+        self.modified = True
+
+    def __delitem__(self, key: str) -> None:
+        del self.data[key]
+        self.modified = True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.data
+
+    def regenerate(self) -> None:
+        """Move the data to a new id and retire the old one, so an id planted before sign-in never becomes authenticated"""
+        self.data
+        if self.sid is not None:
+            self.stale_sid, self.sid, self.new = self.sid, None, True
+        self.modified = True
+
+    def clear(self) -> None:
+        """Empty the session and drop its id, so a new one is issued on the next write (e.g. after logout)"""
+        if self.sid is not None:
+            self.stale_sid, self.sid, self.new = self.sid, None, True
+        self._data = {}
+        self.accessed = True
+        self.modified = True
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask session interface storing session data in a MemorySessionStore or MongoSessionStore"""
+
+    def __init__(self, store):
+        self.store = store
+
+    def open_session(self, app: Flask, request) -> ServerSideSession:
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if not sid or not SESSION_ID_PATTERN.match(sid):
+            sid = None
+        return ServerSideSession(self.store, sid)
+
+    def save_session(self, app: Flask, session: ServerSideSession, response) -> None:
+        if session.accessed:
+            response.vary.add('Cookie')
+        if session.stale_sid is not None:
+            self.store.delete(session.stale_sid)
+        if not session.modified:
+            return
+
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        if not session.data:
+            if not session.new or session.stale_sid is not None:
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            if session.sid is not None:
+                self.store.delete(session.sid)
+            return
+
+        if session.sid is None:
+            session.sid = secrets.token_urlsafe(32)
+        if not self.store.save(session.sid, session.data):
+            return
+
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+def regenerate_session(session: Any) -> None:
+    """
+    Issue a new session id before the session is given a signed-in user_id.
+    Flask's cookie sessions have no id to fixate, so they are left as they are.
+    """
+    regenerate = getattr(session, 'regenerate', None)
+    if regenerate is not None:
+        regenerate()
+
+def create_session_store(backend: str = SESSION_BACKEND):
+    """
+    Build the session store for a backend name, or None for Flask's cookie sessions
+    """
+    if backend == 'memory':
+        return MemorySessionStore()
+    if backend == 'mongo':
+        return MongoSessionStore()
+    if backend != 'cookie':
+        print(f"Unknown SESSION_BACKEND '{backend}', using cookie sessions")
+    return None
+
+def init_sessions(app: Flask, backend: str = SESSION_BACKEND) -> None:
+    """
+    Install the configured session backend on a Flask app
+    """
+    store = create_session_store(backend)
+    if store is not None:
+        app.session_interface = ServerSideSessionInterface(store)
@@ -0,0 +1,194 @@
+"""
+Application settings for the AI Agent System
+Loads the .env file once per process and reads the startup settings into one cached, typed object
+"""
+
+import os
+from functools import lru_cache
+from typing import FrozenSet, NamedTuple, Optional, Tuple
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV_FILE = os.path.join(PROJECT_DIR, '.env')
+
+# Result of the first load_environment() call, None until then
+_environment_loaded: Optional[bool] = None
+
+def load_environment(path: str = ENV_FILE) -> bool:
+    """
+    Load a .env file into os.environ the first time it is called; later calls return the first result.
+    Variables already set in the environment (e.g. by the hosting platform) take precedence.
+    """
+    global _environment_loaded
+
+    if _environment_loaded is None:
+        if os.path.exists(path):
+            # Imported here: deployments that set variables directly never need python-dotenv
+            from dotenv import load_dotenv
+            _environment_loaded = load_dotenv(path)
+        else:
+            _environment_loaded = False
+    return _environment_loaded
+
+def env_str(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read a string variable"""
+    return os.environ.get(name, default)
+
+def env_int(name: str, default: int) -> int:
+    """Read an integer variable"""
+    return int(os.environ.get(name, default))
+
+def env_float(name: str, default: float) -> float:
+    """Read a decimal variable"""
+    return float(os.environ.get(name, default))
+
+def env_bool(name: str, default: bool = False) -> bool:
+    """Read a true/false variable"""
+    return os.environ.get(name, str(default)).lower() == 'true'
+
+def env_list(name: str, default: str = '') -> Tuple[str, ...]:
+    """Read a comma-separated variable, dropping blank items"""
+    return tuple(item.strip() for item in os.environ.get(name, default).split(',') if item.strip())
+
+class Settings(NamedTuple):
+    """Settings read once at startup"""
+    secret_key: Optional[str]
+    port: int
+    run_migrations_on_startup: bool
+    mongo_uri: str
+    db_name: str
+    brevo_api_key: Optional[str]
+    sender_email: Optional[str]
+    sender_name: str
+    otp_ttl_seconds: int
+    otp_max_attempts: int
+    # MongoDB connection pool
+    mongo_max_pool_size: int
+    mongo_min_pool_size: int
+    mongo_max_idle_time_ms: int
+    mongo_connect_timeout_ms: int
+    mongo_server_selection_timeout_ms: int
+    mongo_socket_timeout_ms: int
+    # Brevo API client
+    brevo_api_base_url: str
+    brevo_connect_timeout: float
+    brevo_read_timeout: float
+    brevo_max_retries: int
+    brevo_backoff_base: float
+    brevo_backoff_max: float
+    brevo_pool_size: int
+    brevo_batch_size: int
+    # Background mail queue and SMTP pool
+    mail_async: bool
+    mail_queue_size: int
+    mail_workers: int
+    mail_enqueue_timeout: float
+    mail_drain_timeout: float
+    smtp_pool_size: int
+    smtp_timeout: float
+    smtp_idle_timeout: float
+    smtp_max_recipients: int
+    smtp_max_messages_per_connection: int
+    # Sessions and caches
+    session_backend: str
+    session_lifetime: int
+    session_memory_max_entries: int
+    user_cache_ttl: float
+    user_cache_max_entries: int
+    http_cache_enabled: bool
+    page_cache_enabled: bool
+    page_cache_ttl: float
+    page_cache_max_entries: int
+    compression_enabled: bool
+    compression_min_size: int
+    # Password hashing
+    password_hash_algorithm: str
+    password_hash_iterations: int
+    password_hash_workers: int
+    password_hash_timeout: float
+    # Static assets and templates
+    asset_max_age: int
+    image_cache_dir: str
+    image_widths: Tuple[int, ...]
+    template_cache_enabled: bool
+    template_cache_dir: str
+    # Courses
+    bulk_enrollment_admins: FrozenSet[str]
+    bulk_enrollment_max_rows: int
+    lesson_timezone: str
+    summary_rebuild_batch_size: int
+    # Servers and tooling
+    async_wsgi_max_body_size: int
+    cold_import_budget_ms: float
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    """
+    Get the process-wide settings, loading .env on first use
+    """
+    load_environment()
+    return Settings(
+        secret_key=env_str('SECRET_KEY'),
+        port=env_int('PORT', 5000),
+        run_migrations_on_startup=env_bool('RUN_MIGRATIONS_ON_STARTUP'),
+        mongo_uri=env_str('MONGO_URI', 'mongodb://localhost:27017/ai_agent_system'),
+        db_name=env_str('DB_NAME', 'ai_agent_system'),
+        brevo_api_key=env_str('BREVO_API_KEY'),
+        sender_email=env_str('SENDER_EMAIL'),
+        sender_name=env_str('SENDER_NAME', 'AI Agent System'),
+        otp_ttl_seconds=env_int('OTP_TTL_SECONDS', 600),
+        otp_max_attempts=env_int('OTP_MAX_ATTEMPTS', 5),
+        mongo_max_pool_size=env_int('MONGO_MAX_POOL_SIZE', 50),
+        mongo_min_pool_size=env_int('MONGO_MIN_POOL_SIZE', 0),
+        mongo_max_idle_time_ms=env_int('MONGO_MAX_IDLE_TIME_MS', 60000),
+        mongo_connect_timeout_ms=env_int('MONGO_CONNECT_TIMEOUT_MS', 5000),
+        mongo_server_selection_timeout_ms=env_int('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000),
+        mongo_socket_timeout_ms=env_int('MONGO_SOCKET_TIMEOUT_MS', 20000),
+        brevo_api_base_url=env_str('BREVO_API_BASE_URL', 'https://api.brevo.com/v3'),
+        brevo_connect_timeout=env_float('BREVO_CONNECT_TIMEOUT', 3.05),
+        brevo_read_timeout=env_float('BREVO_READ_TIMEOUT', 10),
+        brevo_max_retries=env_int('BREVO_MAX_RETRIES', 3),
+        brevo_backoff_base=env_float('BREVO_BACKOFF_BASE', 0.5),
+        brevo_backoff_max=env_float('BREVO_BACKOFF_MAX', 8),
+        brevo_pool_size=env_int('BREVO_POOL_SIZE', 10),
+        brevo_batch_size=env_int('BREVO_BATCH_SIZE', 100),
+        # Serverless instances (Vercel sets VERCEL) can be frozen once the response is sent,
+        # which would strand queued mail, so they send inline unless MAIL_ASYNC says otherwise
+        mail_async=env_bool('MAIL_ASYNC', not env_str('VERCEL')),
+        mail_queue_size=env_int('MAIL_QUEUE_SIZE', 1000),
+        mail_workers=env_int('MAIL_WORKERS', 4),
+        mail_enqueue_timeout=env_float('MAIL_ENQUEUE_TIMEOUT', 0.05),
+        mail_drain_timeout=env_float('MAIL_DRAIN_TIMEOUT', 10),
+        smtp_pool_size=env_int('SMTP_POOL_SIZE', 4),
+        smtp_timeout=env_float('SMTP_TIMEOUT', 30),
+        smtp_idle_timeout=env_float('SMTP_IDLE_TIMEOUT', 60),
+        smtp_max_recipients=env_int('SMTP_MAX_RECIPIENTS', 100),
+        smtp_max_messages_per_connection=env_int('SMTP_MAX_MESSAGES_PER_CONNECTION', 100),
+        session_backend=env_str('SESSION_BACKEND', 'cookie').lower(),
+        session_lifetime=env_int('SESSION_LIFETIME', 86400),
+        session_memory_max_entries=env_int('SESSION_MEMORY_MAX_ENTRIES', 10000),
+        user_cache_ttl=env_float('USER_CACHE_TTL', 60),
+        user_cache_max_entries=env_int('USER_CACHE_MAX_ENTRIES', 10000),
+        http_cache_enabled=env_bool('HTTP_CACHE_ENABLED', True),
+        page_cache_enabled=env_bool('PAGE_CACHE_ENABLED'),
+        page_cache_ttl=env_float('PAGE_CACHE_TTL', 300),
+        page_cache_max_entries=env_int('PAGE_CACHE_MAX_ENTRIES', 1000),
+        compression_enabled=env_bool('COMPRESSION_ENABLED', True),
+        compression_min_size=env_int('COMPRESSION_MIN_SIZE', 500),
+        password_hash_algorithm=env_str('PASSWORD_HASH_ALGORITHM', 'pbkdf2:sha256'),
+        password_hash_iterations=env_int('PASSWORD_HASH_ITERATIONS', 0),
+        # Each worker is a spawned interpreter holding its own copy of the hashing code, so a couple are
+        # enough to keep the KDF off the request threads; serverless instances hash inline instead
+        password_hash_workers=env_int('PASSWORD_HASH_WORKERS', 0 if env_str('VERCEL') else 2),
+        password_hash_timeout=env_float('PASSWORD_HASH_TIMEOUT', 30),
+        asset_max_age=env_int('ASSET_MAX_AGE', 31536000),
+        image_cache_dir=env_str('IMAGE_CACHE_DIR', os.path.join(PROJECT_DIR, '.image_cache')),
+        image_widths=tuple(sorted(int(width) for width in env_list('IMAGE_WIDTHS', '220,350,440,700'))),
+        template_cache_enabled=env_bool('TEMPLATE_CACHE_ENABLED', True),
+        template_cache_dir=env_str('TEMPLATE_CACHE_DIR', os.path.join(PROJECT_DIR, '.jinja_cache')),
+        bulk_enrollment_admins=frozenset(email.lower() for email in env_list('BULK_ENROLLMENT_ADMINS')),
+        bulk_enrollment_max_rows=env_int('BULK_ENROLLMENT_MAX_ROWS', 1000),
+        lesson_timezone=env_str('LESSON_TIMEZONE', 'UTC'),
+        summary_rebuild_batch_size=env_int('SUMMARY_REBUILD_BATCH_SIZE', 500),
+        async_wsgi_max_body_size=env_int('ASYNC_WSGI_MAX_BODY_SIZE', 16 * 1024 * 1024),
+        cold_import_budget_ms=env_float('COLD_IMPORT_BUDGET_MS', 1500),
+    )
@@ -0,0 +1,205 @@
+"""
+SMTP connection pooling for the AI Agent System
+Keeps authenticated SMTP sessions alive so Mailer can send many messages without reconnecting and logging in each time
+"""
+
+import atexit
+import os
+import smtplib
+import ssl
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from .settings import get_settings
+
+settings = get_settings()
+
+# Pool configuration
+SMTP_POOL_SIZE = settings.smtp_pool_size
+SMTP_TIMEOUT = settings.smtp_timeout
+SMTP_IDLE_TIMEOUT = settings.smtp_idle_timeout
+SMTP_MAX_RECIPIENTS = settings.smtp_max_recipients
+SMTP_MAX_MESSAGES_PER_CONNECTION = settings.smtp_max_messages_per_connection
+
+# Errors meaning the session is gone and the transaction can be retried on a fresh connection
+RECONNECT_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+class PooledConnection:
+    """An authenticated SMTP session and its usage counters"""
+
+    __slots__ = ('smtp', 'last_used', 'messages_sent')
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.last_used = time.monotonic()
+        self.messages_sent = 0
+
+class SMTPConnectionPool:
+    """A bounded pool of authenticated SMTP sessions to one server"""
+
+    def __init__(self, host: str, port: int, username: str = '', password: str = '', secure: Optional[str] = None,
+                 max_size: int = SMTP_POOL_SIZE, timeout: float = SMTP_TIMEOUT, idle_timeout: float = SMTP_IDLE_TIMEOUT,
+                 max_recipients: int = SMTP_MAX_RECIPIENTS,
+                 max_messages_per_connection: int = SMTP_MAX_MESSAGES_PER_CONNECTION):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.secure = secure
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.max_recipients = max(1, max_recipients)
+        self.max_messages_per_connection = max_messages_per_connection
+
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max(1, max_size))
+        self.connections_opened = 0
+
+    def _connect(self) -> PooledConnection:
+        """Open, secure and authenticate a new SMTP session"""
+        if self.secure == 'ssl':
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.secure == 'tls':
+                smtp.starttls(context=ssl.create_default_context())
+        if self.username:
+            smtp.login(self.username, self.password)
+
+        with self._lock:
+            self.connections_opened += 1
+        return PooledConnection(smtp)
+
+    def _discard(self, connection: PooledConnection) -> None:
+        """Close a session without caring whether the server is still there"""
+        try:
+            connection.smtp.quit()
+        except Exception:
+            try:
+                connection.smtp.close()
+            except Exception:
+                pass
+
+    def _is_alive(self, connection: PooledConnection) -> bool:
+        """Check a session that sat idle long enough for the server to have dropped it"""
+        if time.monotonic() - connection.last_used < self.idle_timeout:
+            return True
+        try:
+            return connection.smtp.noop()[0] == 250
+        except Exception:
+            return False
+
+    def _acquire(self) -> PooledConnection:
+        """Take an idle session, or open one when none is usable"""
+        self._slots.acquire()
+        try:
+            while True:
+                with self._lock:
+                    connection = self._idle.pop() if self._idle else None
+                if connection is None:
+                    return self._connect()
+                if self._is_alive(connection):
+                    return connection
+                self._discard(connection)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, connection: PooledConnection, healthy: bool) -> None:
+        """Return a session to the pool, or close it if it is broken or worn out"""
+        try:
+            worn_out = (self.max_messages_per_connection
+                        and connection.messages_sent >= self.max_messages_per_connection)
+            if healthy and not worn_out:
+                connection.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(connection)
+            else:
+                self._discard(connection)
+        finally:
+            self._slots.release()
+
+    def _send_transaction(self, from_addr: str, recipients: List[str], message: str) -> Dict[str, Tuple[int, bytes]]:
+        """Send one SMTP transaction, reconnecting once if the server dropped the session"""
+        for attempt in range(2):
+            connection = self._acquire()
+            try:
+                refused = connection.smtp.sendmail(from_addr, recipients, message)
+            except RECONNECT_ERRORS:
+                self._release(connection, healthy=False)
+                if attempt:
+                    raise
+                continue
+            except smtplib.SMTPRecipientsRefused:
+                # Every recipient was refused but the session itself is still usable
+                self._release(connection, healthy=True)
+                raise
+            except Exception:
+                self._release(connection, healthy=False)
+                raise
+
+            connection.messages_sent += 1
+            self._release(connection, healthy=True)
+            return refused
+        return {}
+
+    def sendmail(self, from_addr: str, recipients: List[str], message: str) -> Dict[str, Tuple[int, bytes]]:
+        """
+        Send a message to any number of recipients, split into transactions of at most
+        max_recipients each. Returns the refused recipients, like smtplib.SMTP.sendmail.
+        """
+        refused = {}
+        for start in range(0, len(recipients), self.max_recipients):
+            refused.update(self._send_transaction(from_addr, recipients[start:start + self.max_recipients], message))
+        return refused
+
+    def close(self) -> None:
+        """Close every idle session"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection in idle:
+            self._discard(connection)
+
+# One pool per server and account, shared by every Mailer in the process
+_pools: Dict[tuple, SMTPConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_smtp_pool(host: str, port: int, username: str = '', password: str = '',
+                  secure: Optional[str] = None) -> SMTPConnectionPool:
+    """
+    Return the shared pool for an SMTP server and account, creating it on first use
+    """
+    key = (host, port, username, password, secure)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = SMTPConnectionPool(host, port, username, password, secure)
+    return pool
+
+def close_smtp_pools() -> None:
+    """
+    Close all pooled SMTP sessions
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+def _reset_pools_after_fork() -> None:
+    """
+    SMTP sockets must not be shared with a forked child
+    """
+    global _pools_lock
+
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
+
+atexit.register(close_smtp_pools)
@@ -0,0 +1,81 @@
+"""
+Startup profiling for the AI Agent System
+Imports the app in a fresh interpreter, as a serverless cold start does, and reports the import time of each module
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from typing import List, NamedTuple, Optional
+from .settings import get_settings
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+settings = get_settings()
+
+# Upper bound for a cold `import app`, checked by `python profile_startup.py` and the test suite
+COLD_IMPORT_BUDGET_MS = settings.cold_import_budget_ms
+
+class ImportTiming(NamedTuple):
+    """One line of `python -X importtime` output, in microseconds"""
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+def profile_imports(module: str = 'app') -> List[ImportTiming]:
+    """
+    Import a module in a new interpreter and get the timing of every module it imported, in import order
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr}")
+
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        timings.append(ImportTiming(name.strip(), int(self_us), int(cumulative_us), depth))
+    return timings
+
+def cold_import_ms(timings: List[ImportTiming], module: str = 'app') -> float:
+    """
+    Total time to import a module, including everything it imported, in milliseconds
+    """
+    return next(t.cumulative_us for t in timings if t.module == module and t.depth == 0) / 1000
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: print the slowest modules of a cold import and check the budget
+    """
+    parser = argparse.ArgumentParser(description='Profile the cold import of the application')
+    parser.add_argument('--module', default='app', help='module to import (default: app)')
+    parser.add_argument('--top', type=int, default=25, help='number of modules to list')
+    args = parser.parse_args(argv)
+
+    timings = profile_imports(args.module)
+    total = cold_import_ms(timings, args.module)
+
+    print(f"{'self ms':>8} {'total ms':>9}  module")
+    for timing in sorted(timings, key=lambda t: t.self_us, reverse=True)[:args.top]:
+        print(f"{timing.self_us / 1000:>8.1f} {timing.cumulative_us / 1000:>9.1f}  {timing.module}")
+
+    packages = defaultdict(int)
+    for timing in timings:
+        packages[timing.module.split('.')[0]] += timing.self_us
+    print(f"\n{'ms':>8}  package")
+    for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>8.1f}  {package}")
+
+    within_budget = total <= COLD_IMPORT_BUDGET_MS
+    print(f"\nimport {args.module}: {total:.1f} ms (budget {COLD_IMPORT_BUDGET_MS:.0f} ms)"
+          f"{'' if within_budget else ' - OVER BUDGET'}")
+    return 0 if within_budget else 1
+
+if __name__ == '__main__':
+    raise SystemExit(main())
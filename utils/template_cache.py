@@ -0,0 +1,116 @@
+"""
+Persistent Jinja bytecode cache for the AI Agent System
+Stores compiled templates on disk so a fresh worker or serverless instance loads them instead of
+parsing and compiling every template on its first render; precompile_templates.py fills it ahead of time
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from typing import List, Optional
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+from .settings import get_settings
+
+settings = get_settings()
+
+TEMPLATE_CACHE_ENABLED = settings.template_cache_enabled
+TEMPLATE_CACHE_DIR = settings.template_cache_dir
+
+# Templates under these prefixes are rendered by their own Jinja environment (see utils/email_templates.py)
+EXCLUDED_PREFIXES = ('email/',)
+
+class TemplateBytecodeCache(FileSystemBytecodeCache):
+    """
+    A FileSystemBytecodeCache that can be built on one machine and shipped to another,
+    and that keeps working from a read-only directory. is_async must match the Jinja environment:
+    bytecode compiled for async rendering (the Quart app) does not run in a sync environment, or the reverse.
+    """
+
+    def __init__(self, directory: Optional[str] = None, pattern: str = '__jinja2_%s.cache', is_async: bool = False):
+        super().__init__(directory, pattern)
+        self.is_async = is_async
+
+    def get_cache_key(self, name: str, filename: Optional[str] = None) -> str:
+        # Keyed by rendering mode and template name, not path, since the absolute path differs between
+        # the build and the deployment; a stale entry is still rejected because Jinja checks the source checksum
+        mode = 'async' if self.is_async else 'sync'
+        return hashlib.sha1(f"{mode}:{name}".encode('utf-8')).hexdigest()
+
+    def dump_bytecode(self, bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError as e:
+            # A read-only deployment can still use a cache precompiled at build time
+            print(f"Template bytecode not cached: {str(e)}")
+
+def init_template_cache(app: Flask, directory: str = TEMPLATE_CACHE_DIR) -> Optional[TemplateBytecodeCache]:
+    """
+    Give the app's Jinja environment a bytecode cache in directory, when TEMPLATE_CACHE_ENABLED is set.
+    The Flask and async apps can share a directory; their entries are keyed apart.
+    """
+    if not TEMPLATE_CACHE_ENABLED:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError as e:
+        print(f"Template bytecode cache directory unavailable: {str(e)}")
+    cache = TemplateBytecodeCache(directory, '%s.jinja', is_async=app.jinja_env.is_async)
+    app.jinja_env.bytecode_cache = cache
+    return cache
+
+def list_page_templates(app: Flask) -> List[str]:
+    """
+    Names of the templates the app renders with Jinja
+    """
+    return sorted(name for name in app.jinja_env.list_templates() if not name.startswith(EXCLUDED_PREFIXES))
+
+def precompile_templates(app: Flask) -> List[str]:
+    """
+    Compile every page template, writing its bytecode to the app's cache, and return their names
+    """
+    names = list_page_templates(app)
+    for name in names:
+        app.jinja_env.get_template(name)
+    return names
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Command line entry point: fill the bytecode cache for every template in templates/
+    """
+    parser = argparse.ArgumentParser(description='Precompile the Jinja templates into the bytecode cache')
+    parser.add_argument('--clear', action='store_true', help='remove cached bytecode first')
+    args = parser.parse_args(argv)
+
+    # Imported here so the templates are compiled by the app's own Jinja environment and options
+    from app import app
+
+    cache = app.jinja_env.bytecode_cache
+    if cache is None:
+        print("TEMPLATE_CACHE_ENABLED is false; nothing to precompile")
+        return 1
+    if args.clear:
+        cache.clear()
+
+    apps = [('', app)]
+    try:
+        from utils.async_app import create_async_app
+        apps.append((' (async)', create_async_app(app)))
+    except ImportError:
+        # Quart is only installed for async mode, which then has no templates to precompile
+        pass
+
+    start = time.perf_counter()
+    count = 0
+    for label, current in apps:
+        names = precompile_templates(current)
+        count += len(names)
+        for name in names:
+            print(f"compiled {name}{label}")
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Precompiled {count} templates into {cache.directory} in {elapsed:.0f} ms")
+    return 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,160 @@
+"""
+In-process user cache for the AI Agent System
+Serves the user lookups behind authenticated pages from memory, with TTL expiry, LRU eviction and explicit invalidation
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from bson.objectid import ObjectId
+from .database import get_db_connection, get_collection, find_one
+from .models import User
+from .settings import get_settings
+
+settings = get_settings()
+
+# Cache configuration. Invalidation is per process, so USER_CACHE_TTL bounds how long
+# another worker can serve a user record that was changed elsewhere. USER_CACHE_MAX_ENTRIES
+# caps the number of cached users, not their size in bytes.
+USER_CACHE_TTL = settings.user_cache_ttl
+USER_CACHE_MAX_ENTRIES = settings.user_cache_max_entries
+
+# Every field any cached caller reads; never the password hash
+USER_CACHE_PROJECTION = {'name': 1, 'email': 1, 'status': 1, 'code': 1}
+
+class UserCache:
+    """
+    A thread-safe TTL and LRU cache of User models, addressable by id and by email.
+    Holds at most max_entries users; each email alias lives and dies with its user's entry.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, max_entries: int = USER_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: 'OrderedDict[str, Tuple[User, float]]' = OrderedDict()
+        self._ids_by_email: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _remove(self, user_id: str) -> None:
+        """Drop an entry and its email alias, unless the email now belongs to another cached id (lock held)"""
+        entry = self._entries.pop(user_id, None)
+        if entry is not None and self._ids_by_email.get(entry[0].email) == user_id:
+            del self._ids_by_email[entry[0].email]
+
+    def _lookup(self, user_id: Optional[str]) -> Optional[User]:
+        """Return a fresh entry and mark it recently used (lock held)"""
+        entry = self._entries.get(user_id) if user_id is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        user, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(user_id)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def get_by_id(self, user_id: str) -> Optional[User]:
+        """Get a cached user by id"""
+        with self._lock:
+            return self._lookup(user_id)
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        """Get a cached user by email"""
+        with self._lock:
+            return self._lookup(self._ids_by_email.get(email))
+
+    def put(self, user: User) -> None:
+        """Cache a user, evicting the least recently used entries beyond max_entries"""
+        if user is None or user.id is None:
+            return
+        user_id = str(user.id)
+        with self._lock:
+            self._remove(user_id)
+            self._entries[user_id] = (user, time.monotonic() + self.ttl)
+            if user.email is not None:
+                self._ids_by_email[user.email] = user_id
+            while len(self._entries) > self.max_entries:
+                oldest_id = next(iter(self._entries))
+                self._remove(oldest_id)
+                self.evictions += 1
+
+    def invalidate(self, user_id: Optional[str] = None, email: Optional[str] = None) -> None:
+        """Forget a user by id and/or email"""
+        with self._lock:
+            if email is not None:
+                user_id_for_email = self._ids_by_email.get(email)
+                if user_id_for_email is not None:
+                    self._remove(user_id_for_email)
+            if user_id is not None:
+                self._remove(str(user_id))
+
+    def clear(self) -> None:
+        """Forget every user"""
+        with self._lock:
+            self._entries.clear()
+            self._ids_by_email.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and eviction counters and current size"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'aliases': len(self._ids_by_email),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+# Process-wide cache used by the routes and controllers
+user_cache = UserCache()
+
+def _load_user(query: Dict) -> Optional[User]:
+    """
+    Fetch a user from usertable and remember it
+    """
+    db = get_db_connection()
+    if db is None:
+        return None
+
+    user = User.from_document(find_one(get_collection(db, 'usertable'), query, USER_CACHE_PROJECTION))
+    if user is not None:
+        user_cache.put(user)
+    return user
+
+def get_user_by_email(email: str) -> Optional[User]:
+    """
+    Get a user by email, from the cache when possible
+    """
+    user = user_cache.get_by_email(email)
+    if user is None:
+        user = _load_user({'email': email})
+    return user
+
+def get_user_by_id(user_id: str) -> Optional[User]:
+    """
+    Get a user by id, from the cache when possible
+    """
+    user = user_cache.get_by_id(user_id)
+    if user is None:
+        user = _load_user({'_id': ObjectId(user_id)})
+    return user
+
+def invalidate_user(user_id: Optional[str] = None, email: Optional[str] = None) -> None:
+    """
+    Forget a user after their record changed
+    """
+    user_cache.invalidate(user_id, email)
+
+def user_cache_stats() -> Dict[str, int]:
+    """
+    Hit and miss counters of the process-wide user cache
+    """
+    return user_cache.stats()
@@ -4,21 +4,192 @@ Provides functionality equivalent to controllerUserData.php in the original PHP
 """
 
 import random
-import os
+from datetime import datetime, timedelta, timezone
 from flask import session
-from werkzeug.security import generate_password_hash, check_password_hash
 from typing import List, Dict, Optional, Tuple
-from .database import get_db_connection, get_collection, find_documents, insert_document, update_document
-from .mail import send_email_brevo, get_otp_email_template
+from .database import get_db_connection, get_collection, find_one, find_one_and_update, insert_document, update_document
+from .mail import get_otp_email_template, send_email_brevo
+from .user_cache import invalidate_user
+from .passwords import hash_password, verify_password, needs_rehash
+from .sessions import regenerate_session
+from .settings import get_settings
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+settings = get_settings()
 
 # Brevo API Configuration - Use environment variables
-BREVO_API_KEY = os.environ.get('BREVO_API_KEY')
-BREVO_SENDER_EMAIL = os.environ.get('SENDER_EMAIL')
-BREVO_SENDER_NAME = os.environ.get('SENDER_NAME', 'AI Agent System')
+BREVO_API_KEY = settings.brevo_api_key
+BREVO_SENDER_EMAIL = settings.sender_email
+BREVO_SENDER_NAME = settings.sender_name
+
+# OTP configuration: codes are valid for OTP_TTL_SECONDS and OTP_MAX_ATTEMPTS wrong guesses
+OTP_TTL_SECONDS = settings.otp_ttl_seconds
+OTP_MAX_ATTEMPTS = settings.otp_max_attempts
+
+# Subjects of the OTP emails, by purpose
+OTP_SUBJECTS = {
+    'verification': "AI Agent System - Email Verification Code",
+    'reset': "AI Agent System - Password Reset Code"
+}
+
+# Messages shown to the user, shared with async_user_controller; the *_INFO ones take the email address
+DB_UNAVAILABLE = "Unable to establish database connection. Please try again in a few moments."
+PASSWORD_MISMATCH = "Password confirmation does not match. Please ensure both password fields contain identical values."
+EMAIL_TAKEN = "This email address is already associated with an account. Please sign in or use a different email address."
+SIGNUP_EMAIL_FAILED = "Your account was created, but the verification email could not be sent. Please sign in to receive a new code."
+SIGNUP_FAILED = "Account creation failed. Please try again or contact support if the issue persists."
+SIGNUP_ERROR = "An unexpected error occurred during account creation. Please try again or contact support for assistance."
+VERIFY_SESSION_EXPIRED = "Session has expired. Please sign in again to verify your account."
+INVALID_VERIFICATION_CODE = "Invalid verification code provided. Please check the code and try again."
+VERIFY_ERROR = "An error occurred during verification. Please try again or contact support for assistance."
+INVALID_CREDENTIALS = "Invalid email or password. Please verify your credentials and try again."
+NO_ACCOUNT = "No account found with this email address. Please register for a new account."
+RESEND_FAILED = "Your email address is not verified yet and a new verification code could not be sent. Please try signing in again in a few moments."
+LOGIN_ERROR = "An error occurred during login. Please try again or contact support for assistance."
+RESET_EMAIL_FAILED = "Unable to send password reset email. Please try again in a few moments."
+RESET_REQUEST_FAILED = "Unable to process your request. Please try again or contact support for assistance."
+NO_ACCOUNT_FOR_RESET = "No account found with this email address. Please verify the email or register for a new account."
+FORGOT_PASSWORD_ERROR = "An error occurred while processing your request. Please try again or contact support for assistance."
+RESET_SESSION_EXPIRED = "Session has expired. Please initiate a new password reset process."
+INVALID_RESET_CODE = "Invalid reset code provided. Please verify the code and try again."
+RESET_ERROR = "An error occurred during password reset. Please try again or contact support for assistance."
+CHANGE_PASSWORD_FAILED = "Unable to update your password. Please try again or contact support for assistance."
+CHANGE_PASSWORD_ERROR = "An error occurred while changing your password. Please try again or contact support for assistance."
+RESET_CODE_VERIFIED_INFO = "Please create a new password for your account."
+PASSWORD_CHANGED_INFO = "Your password has been successfully updated. You may now sign in with your new credentials."
+VERIFICATION_SENT_INFO = "A verification code has been sent to {email}. Please check your inbox and enter the code to complete registration."
+VERIFICATION_REQUIRED_INFO = "Email verification required for {email}. Please complete verification to access your account."
+RESET_SENT_INFO = "A password reset code has been sent to {email}. Please check your inbox."
+
+def _new_otp_fields() -> Dict:
+    """
+    Generate a fresh OTP code together with its issue timestamp and attempt counter
+    """
+    return {
+        'code': random.randint(111111, 999999),
+        'code_issued_at': datetime.now(timezone.utc),
+        'code_attempts': 0
+    }
+
+def _live_otp_query(email: str, otp_code: str) -> Optional[Dict]:
+    """
+    Build the (email, code) lookup for an OTP that has neither expired nor been locked out
+    """
+    try:
+        code = int(otp_code)
+    except (TypeError, ValueError):
+        return None
+
+    return {
+        'email': email,
+        'code': code,
+        'code_issued_at': {'$gte': datetime.now(timezone.utc) - timedelta(seconds=OTP_TTL_SECONDS)},
+        'code_attempts': {'$lt': OTP_MAX_ATTEMPTS}
+    }
+
+def _otp_is_live(user: Dict) -> bool:
+    """
+    Check whether a user document still holds a usable OTP code
+    """
+    issued_at = user.get('code_issued_at')
+    if not user.get('code') or issued_at is None:
+        return False
+    if issued_at.tzinfo is None:
+        issued_at = issued_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - issued_at < timedelta(seconds=OTP_TTL_SECONDS)
+            and user.get('code_attempts', 0) < OTP_MAX_ATTEMPTS)
+
+def _otp_email(code: int, purpose: str) -> Tuple[str, str]:
+    """
+    Build the (subject, HTML body) of a 'verification' or 'reset' OTP email
+    """
+    return OTP_SUBJECTS[purpose], get_otp_email_template(code, purpose, OTP_TTL_SECONDS // 60)
+
+def _new_user_document(name: str, email: str, hashed_password: str, otp: Dict) -> Dict:
+    """
+    Build the document of a newly signed up, not yet verified user
+    """
+    return {
+        'name': name,
+        'email': email,
+        'password': hashed_password,
+        'status': "notverified",
+        **otp
+    }
+
+def _retire_otp(email: str) -> Tuple[Dict, Dict]:
+    """
+    Build the (query, update) that locks out a user's outstanding code
+    """
+    return {'email': email}, {'$set': {'code_attempts': OTP_MAX_ATTEMPTS}}
+
+def _failed_otp_attempt(email: str) -> Tuple[Dict, Dict]:
+    """
+    Build the (query, update) that counts a wrong guess against a user's outstanding code
+    """
+    return {'email': email, 'code': {'$ne': 0}}, {'$inc': {'code_attempts': 1}}
+
+def _verify_account_update() -> Dict:
+    """
+    Build the update that consumes a verification code and marks the account verified
+    """
+    return {'$set': {'code': 0, 'status': 'verified'}, '$unset': {'code_issued_at': '', 'code_attempts': ''}}
+
+def _rehash(email: str, old_hash: str, new_hash: str) -> Tuple[Dict, Dict]:
+    """
+    Build the (query, update) that upgrades a password hash; matching on the old hash
+    skips the write if the password changed meanwhile
+    """
+    return {'email': email, 'password': old_hash}, {'$set': {'password': new_hash}}
+
+def _reset_request_update(otp: Dict) -> Dict:
+    """
+    Build the update that stores a new password reset code, dropping any earlier verified one
+    """
+    return {'$set': otp, '$unset': {'code_verified_at': ''}}
+
+def _reset_code_verified_update() -> Dict:
+    """
+    Build the update that marks a reset code as verified, so change_password can accept the new password
+    """
+    return {'$set': {'code_verified_at': datetime.now(timezone.utc)}}
+
+def _change_password(email: str, hashed_password: str) -> Tuple[Dict, Dict]:
+    """
+    Build the (query, update) that sets a new password, only while a verified reset code is still fresh
+    """
+    return (
+        {'email': email, 'code_verified_at': {'$gte': datetime.now(timezone.utc) - timedelta(seconds=OTP_TTL_SECONDS)}},
+        {
+            '$set': {'code': 0, 'password': hashed_password},
+            '$unset': {'code_issued_at': '', 'code_attempts': '', 'code_verified_at': ''}
+        }
+    )
+
+def _sign_in(current_session, user_id) -> None:
+    """
+    Mark a session as signed in, under a new session id
+    """
+    regenerate_session(current_session)
+    current_session['user_id'] = str(user_id)
+
+def send_otp_email(email: str, subject: str, message: str) -> bool:
+    """
+    Send an OTP email before answering the request. OTP mail never goes through the background queue:
+    the user is told a code is on its way, so a failed delivery has to be reported now, not lost later.
+    """
+    return send_email_brevo(email, subject, message, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME)
+
+def _retire_undelivered_otp(collection, email: str) -> None:
+    """
+    Lock out a code whose email could not be sent, so the next sign-in issues and sends a new one
+    """
+    update_document(collection, *_retire_otp(email))
+
+def _record_failed_otp_attempt(collection, email: str) -> None:
+    """
+    Count a wrong OTP guess against the user's outstanding code
+    """
+    update_document(collection, *_failed_otp_attempt(email))
 
 def signup_user(name: str, email: str, password: str, cpassword: str) -> Tuple[bool, List[str]]:
     """
@@ -29,59 +200,46 @@ def signup_user(name: str, email: str, password: str, cpassword: str) -> Tuple[b
     
     # Validation
     if password != cpassword:
-        errors.append("Password confirmation does not match. Please ensure both password fields contain identical values.")
+        errors.append(PASSWORD_MISMATCH)
         return False, errors
     
     # Check if email already exists
     try:
         db = get_db_connection()
         if db is None:
-            errors.append("Unable to establish database connection. Please try again in a few moments.")
+            errors.append(DB_UNAVAILABLE)
             return False, errors
             
         collection = get_collection(db, 'usertable')
-        existing_user = find_documents(collection, {'email': email})
+        existing_user = find_one(collection, {'email': email}, {'_id': 1})
         if existing_user:
-            errors.append("This email address is already associated with an account. Please sign in or use a different email address.")
+            errors.append(EMAIL_TAKEN)
             return False, errors
         
-        # Hash password
-        hashed_password = generate_password_hash(password)
-        code = random.randint(111111, 999999)
-        status = "notverified"
-        
         # Create user document
-        user_document = {
-            'name': name,
-            'email': email,
-            'password': hashed_password,
-            'code': code,
-            'status': status
-        }
+        otp = _new_otp_fields()
+        user_document = _new_user_document(name, email, hash_password(password), otp)
         
         # Insert user
         result = insert_document(collection, user_document)
         
         if result:
+            invalidate_user(email=email)
             # Send verification email
-            subject = "AI Agent System - Email Verification Code"
-            message = get_otp_email_template(code, 'verification')
-            
-            if send_email_brevo(email, subject, message, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME):
-                session['info'] = f"A verification code has been sent to {email}. Please check your inbox and enter the code to complete registration."
+            if send_otp_email(email, *_otp_email(otp['code'], 'verification')):
+                session['info'] = VERIFICATION_SENT_INFO.format(email=email)
                 session['email'] = email
-                session['password'] = password
                 return True, []
             else:
-                # More specific error message for email failure
-                errors.append("Unable to send verification email. Please verify your email address is correct and try again.")
+                _retire_undelivered_otp(collection, email)
+                errors.append(SIGNUP_EMAIL_FAILED)
         else:
-            errors.append("Account creation failed. Please try again or contact support if the issue persists.")
+            errors.append(SIGNUP_FAILED)
             
         return False, errors
 
     except Exception as e:
-        errors.append("An unexpected error occurred during account creation. Please try again or contact support for assistance.")
+        errors.append(SIGNUP_ERROR)
         print(f"Database error: {str(e)}")
         return False, errors
 
@@ -95,33 +253,36 @@ def verify_otp(otp_code: str) -> Tuple[bool, List[str]]:
     try:
         db = get_db_connection()
         if db is None:
-            errors.append("Unable to establish database connection. Please try again in a few moments.")
+            errors.append(DB_UNAVAILABLE)
             return False, errors
             
+        email = session.get('email', '')
+        if not email:
+            errors.append(VERIFY_SESSION_EXPIRED)
+            return False, errors
+            
+        query = _live_otp_query(email, otp_code)
+        if query is None:
+            errors.append(INVALID_VERIFICATION_CODE)
+            return False, errors
+            
+        # Consume the code and verify the account in a single keyed round trip
         collection = get_collection(db, 'usertable')
-        user = find_documents(collection, {'code': int(otp_code)})
+        user = find_one_and_update(collection, query, _verify_account_update(), projection={'name': 1})
         
         if user:
-            # Update user status
-            success = update_document(
-                collection,
-                {'code': int(otp_code)},
-                {'$set': {'code': 0, 'status': 'verified'}}
-            )
-            
-            if success:
-                session['name'] = user[0]['name']
-                session['user_id'] = str(user[0]['_id'])
-                return True, []
-            else:
-                errors.append("Account verification failed. Please try again or contact support for assistance.")
+            invalidate_user(user['_id'], email)
+            session['name'] = user['name']
+            _sign_in(session, user['_id'])
+            return True, []
         else:
-            errors.append("Invalid verification code provided. Please check the code and try again.")
+            _record_failed_otp_attempt(collection, email)
+            errors.append(INVALID_VERIFICATION_CODE)
             
         return False, errors
         
     except Exception as e:
-        errors.append("An error occurred during verification. Please try again or contact support for assistance.")
+        errors.append(VERIFY_ERROR)
         print(f"Database error: {str(e)}")
         return False, errors
 
@@ -135,35 +296,48 @@ def login_user(email: str, password: str) -> Tuple[bool, List[str]]:
     try:
         db = get_db_connection()
         if db is None:
-            errors.append("Unable to establish database connection. Please try again in a few moments.")
+            errors.append(DB_UNAVAILABLE)
             return False, errors
             
         collection = get_collection(db, 'usertable')
-        users = find_documents(collection, {'email': email})
+        user = find_one(collection, {'email': email})
         
-        if users:
-            user = users[0]
+        if user:
             # Check password
-            if check_password_hash(user['password'], password):
+            if verify_password(user['password'], password):
+                # Upgrade hashes made with older parameters while the plain password is at hand
+                if needs_rehash(user['password']):
+                    if update_document(collection, *_rehash(email, user['password'], hash_password(password))):
+                        invalidate_user(email=email)
+
                 session['email'] = email
                 session['name'] = user['name']
                 
                 # Check verification status
                 if user['status'] == "verified":
-                    session['user_id'] = str(user['_id'])
+                    _sign_in(session, user['_id'])
                     return True, []
                 else:
-                    session['info'] = f"Email verification required for {email}. Please complete verification to access your account."
+                    # Issue a fresh code if the one sent at signup has expired or been locked out
+                    if not _otp_is_live(user):
+                        otp = _new_otp_fields()
+                        if update_document(collection, {'email': email}, {'$set': otp}):
+                            invalidate_user(email=email)
+                            if not send_otp_email(email, *_otp_email(otp['code'], 'verification')):
+                                _retire_undelivered_otp(collection, email)
+                                errors.append(RESEND_FAILED)
+                                return False, errors
+                    session['info'] = VERIFICATION_REQUIRED_INFO.format(email=email)
                     return False, ["redirect_user_otp"]
             else:
-                errors.append("Invalid email or password. Please verify your credentials and try again.")
+                errors.append(INVALID_CREDENTIALS)
         else:
-            errors.append("No account found with this email address. Please register for a new account.")
+            errors.append(NO_ACCOUNT)
             
         return False, errors
         
     except Exception as e:
-        errors.append("An error occurred during login. Please try again or contact support for assistance.")
+        errors.append(LOGIN_ERROR)
         print(f"Database error: {str(e)}")
         return False, errors
 
@@ -177,43 +351,36 @@ def forgot_password(email: str) -> Tuple[bool, List[str]]:
     try:
         db = get_db_connection()
         if db is None:
-            errors.append("Unable to establish database connection. Please try again in a few moments.")
+            errors.append(DB_UNAVAILABLE)
             return False, errors
             
         collection = get_collection(db, 'usertable')
-        users = find_documents(collection, {'email': email})
+        user = find_one(collection, {'email': email}, {'_id': 1})
         
-        if users:
-            user = users[0]
-            code = random.randint(111111, 999999)
+        if user:
+            otp = _new_otp_fields()
             
             # Update user code
-            success = update_document(
-                collection,
-                {'email': email},
-                {'$set': {'code': code}}
-            )
+            success = update_document(collection, {'email': email}, _reset_request_update(otp))
             
             if success:
+                invalidate_user(email=email)
                 # Send reset email
-                subject = "AI Agent System - Password Reset Code"
-                message = get_otp_email_template(code, 'reset')
-                
-                if send_email_brevo(email, subject, message, BREVO_API_KEY, BREVO_SENDER_EMAIL, BREVO_SENDER_NAME):
-                    session['info'] = f"A password reset code has been sent to {email}. Please check your inbox."
+                if send_otp_email(email, *_otp_email(otp['code'], 'reset')):
+                    session['info'] = RESET_SENT_INFO.format(email=email)
                     session['email'] = email
                     return True, []
                 else:
-                    errors.append("Unable to send password reset email. Please try again in a few moments.")
+                    errors.append(RESET_EMAIL_FAILED)
             else:
-                errors.append("Unable to process your request. Please try again or contact support for assistance.")
+                errors.append(RESET_REQUEST_FAILED)
         else:
-            errors.append("No account found with this email address. Please verify the email or register for a new account.")
+            errors.append(NO_ACCOUNT_FOR_RESET)
             
         return False, errors
         
     except Exception as e:
-        errors.append("An error occurred while processing your request. Please try again or contact support for assistance.")
+        errors.append(FORGOT_PASSWORD_ERROR)
         print(f"Database error: {str(e)}")
         return False, errors
 
@@ -227,24 +394,34 @@ def reset_password_otp(otp_code: str) -> Tuple[bool, List[str]]:
     try:
         db = get_db_connection()
         if db is None:
-            errors.append("Unable to establish database connection. Please try again in a few moments.")
+            errors.append(DB_UNAVAILABLE)
+            return False, errors
+            
+        email = session.get('email', '')
+        if not email:
+            errors.append(RESET_SESSION_EXPIRED)
+            return False, errors
+            
+        query = _live_otp_query(email, otp_code)
+        if query is None:
+            errors.append(INVALID_RESET_CODE)
             return False, errors
             
         collection = get_collection(db, 'usertable')
-        users = find_documents(collection, {'code': int(otp_code)})
+        user = find_one_and_update(collection, query, _reset_code_verified_update(), projection={'email': 1})
         
-        if users:
-            user = users[0]
+        if user:
             session['email'] = user['email']
-            session['info'] = "Please create a new password for your account."
+            session['info'] = RESET_CODE_VERIFIED_INFO
             return True, []
         else:
-            errors.append("Invalid reset code provided. Please verify the code and try again.")
+            _record_failed_otp_attempt(collection, email)
+            errors.append(INVALID_RESET_CODE)
             
         return False, errors
         
     except Exception as e:
-        errors.append("An error occurred during password reset. Please try again or contact support for assistance.")
+        errors.append(RESET_ERROR)
         print(f"Database error: {str(e)}")
         return False, errors
 
@@ -256,39 +433,36 @@ def change_password(password: str, cpassword: str) -> Tuple[bool, List[str]]:
     errors = []
     
     if password != cpassword:
-        errors.append("Password confirmation does not match. Please ensure both password fields contain identical values.")
+        errors.append(PASSWORD_MISMATCH)
         return False, errors
     else:
         try:
             email = session.get('email', '')
             if not email:
-                errors.append("Session has expired. Please initiate a new password reset process.")
+                errors.append(RESET_SESSION_EXPIRED)
                 return False, errors
                 
-            hashed_password = generate_password_hash(password)
+            hashed_password = hash_password(password)
             
             db = get_db_connection()
             if db is None:
-                errors.append("Unable to establish database connection. Please try again in a few moments.")
+                errors.append(DB_UNAVAILABLE)
                 return False, errors
                 
             collection = get_collection(db, 'usertable')
-            success = update_document(
-                collection,
-                {'email': email},
-                {'$set': {'code': 0, 'password': hashed_password}}
-            )
+            success = update_document(collection, *_change_password(email, hashed_password))
             
             if success:
-                session['info'] = "Your password has been successfully updated. You may now sign in with your new credentials."
+                invalidate_user(email=email)
+                session['info'] = PASSWORD_CHANGED_INFO
                 return True, []
             else:
-                errors.append("Unable to update your password. Please try again or contact support for assistance.")
+                errors.append(CHANGE_PASSWORD_FAILED)
                 
             return False, errors
             
         except Exception as e:
-            errors.append("An error occurred while changing your password. Please try again or contact support for assistance.")
+            errors.append(CHANGE_PASSWORD_ERROR)
             print(f"Database error: {str(e)}")
             return False, errors
 
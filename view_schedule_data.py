@@ -2,7 +2,7 @@
 Script to view schedule data stored in MongoDB
 """
 import os
-from utils.database import get_db_connection, get_collection, find_documents
+from utils.database import get_db_connection, get_collection, iter_documents
 
 # Load environment variables
 from dotenv import load_dotenv
@@ -19,39 +19,41 @@ def view_schedule_data():
             
         # Get course enrollments collection
         collection = get_collection(db, 'course_enrollments')
-        enrollments = find_documents(collection, {})
+        enrollments = iter_documents(collection, {}, batch_size=500)
         
-        if enrollments:
-            print("Course Enrollments:")
-            print("=" * 50)
-            for enrollment in enrollments:
-                print(f"User ID: {enrollment.get('user_id', 'N/A')}")
-                print(f"Course ID: {enrollment.get('course_id', 'N/A')}")
-                print(f"Course Name: {enrollment.get('course_name', 'N/A')}")
-                print(f"Status: {enrollment.get('status', 'N/A')}")
-                
-                # Print schedule details
-                schedule = enrollment.get('schedule', {})
-                print("Schedule:")
-                for key, value in schedule.items():
-                    print(f"  {key}: {value}")
-                print("-" * 30)
-        else:
+        print("Course Enrollments:")
+        print("=" * 50)
+        enrollment_count = 0
+        for enrollment in enrollments:
+            enrollment_count += 1
+            print(f"User ID: {enrollment.get('user_id', 'N/A')}")
+            print(f"Course ID: {enrollment.get('course_id', 'N/A')}")
+            print(f"Course Name: {enrollment.get('course_name', 'N/A')}")
+            print(f"Status: {enrollment.get('status', 'N/A')}")
+            
+            # Print schedule details
+            schedule = enrollment.get('schedule', {})
+            print("Schedule:")
+            for key, value in schedule.items():
+                print(f"  {key}: {value}")
+            print("-" * 30)
+        if not enrollment_count:
             print("No course enrollments found")
             
         # Also check users
         print("\nUsers:")
         print("=" * 50)
         user_collection = get_collection(db, 'usertable')
-        users = find_documents(user_collection, {})
+        users = iter_documents(user_collection, {}, projection={'name': 1, 'email': 1, 'status': 1}, batch_size=500)
         
-        if users:
-            for user in users:
-                print(f"Name: {user.get('name', 'N/A')}")
-                print(f"Email: {user.get('email', 'N/A')}")
-                print(f"Status: {user.get('status', 'N/A')}")
-                print("-" * 30)
-        else:
+        user_count = 0
+        for user in users:
+            user_count += 1
+            print(f"Name: {user.get('name', 'N/A')}")
+            print(f"Email: {user.get('email', 'N/A')}")
+            print(f"Status: {user.get('status', 'N/A')}")
+            print("-" * 30)
+        if not user_count:
             print("No users found")
             
     except Exception as e: